@@ -0,0 +1,110 @@
+# bench_spell_checker.py
+"""
+spell_checker_v2 마이크로벤치마크.
+
+사용법:
+    python benchmarks/bench_spell_checker.py [--words PATH --freq PATH | --synthetic N]
+                                             [--typos N] [--brute-typos N] [--seed S] [--output result.json]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import (CHAT_DIR, summarize, make_typo_corpus, make_sentences, make_synthetic_dictionary,
+                    environment_info, write_results)
+import spell_checker_v2 as sc
+
+def measure(func, inputs, repeat=1):
+    """inputs의 각 항목에 대해 func를 실행하고 호출별 소요 시간(초) 목록을 반환합니다."""
+    samples = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            func(item)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+def measure_once(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def run_benchmarks(dict_path, freq_path, typo_count, brute_typo_count, seed, repeat):
+    results = {}
+
+    word_set, elapsed = measure_once(lambda: sc.load_words(dict_path))
+    results['load_words'] = {'seconds': round(elapsed, 4), 'words': len(word_set)}
+    freq_map, elapsed = measure_once(lambda: sc.load_frequency_map(freq_path))
+    results['load_frequency_map'] = {'seconds': round(elapsed, 4), 'entries': len(freq_map)}
+
+    typos = make_typo_corpus(word_set, typo_count, seed)
+    sentences = make_sentences(word_set, max(1, typo_count // 4), seed=seed)
+    rng_words = sorted(word_set)
+    pairs = list(zip(typos, (rng_words[(i * 7919) % len(rng_words)] for i in range(len(typos)))))
+
+    results['check_text'] = summarize(measure(lambda t: sc.check_text(t, word_set), sentences, repeat))
+    results['levenshtein_distance'] = summarize(
+        measure(lambda p: sc.levenshtein_distance(*p), pairs, repeat))
+    results['bounded_levenshtein_distance'] = summarize(
+        measure(lambda p: sc.bounded_levenshtein_distance(p[0], p[1], 2), pairs, repeat))
+
+    # 전체 사전 순회는 느리므로 일부 오타만 측정합니다.
+    brute_typos = typos[:brute_typo_count]
+    results['get_suggestions_brute_force'] = summarize(
+        measure(lambda w: sc.get_suggestions(w, word_set, freq_map), brute_typos))
+
+    index, elapsed = measure_once(lambda: sc.build_suggestion_index(word_set, freq_map))
+    results['build_suggestion_index'] = {'seconds': round(elapsed, 4), 'deletes': len(index.deletes)}
+    results['get_suggestions_symspell'] = summarize(
+        measure(lambda w: sc.get_suggestions(w, word_set, freq_map, index=index), typos, repeat))
+
+    array_dictionary, elapsed = measure_once(lambda: sc.build_array_dictionary(word_set, freq_map))
+    if array_dictionary is not None:
+        results['build_array_dictionary'] = {'seconds': round(elapsed, 4)}
+        results['get_suggestions_array'] = summarize(
+            measure(lambda w: sc.get_suggestions(w, word_set, freq_map, index=array_dictionary), brute_typos))
+
+    results['correct_text'] = summarize(
+        measure(lambda t: sc.correct_text(t, word_set, freq_map, index=index), sentences, repeat))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="맞춤법 검사기 마이크로벤치마크")
+    parser.add_argument('--words', default=os.path.join(CHAT_DIR, 'spell_checker', 'words.txt'))
+    parser.add_argument('--freq', default=os.path.join(CHAT_DIR, 'spell_checker', 'en_full.txt'))
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help="N개 단어의 합성 사전을 만들어 사용합니다. (사전 파일이 없을 때도 자동 사용)")
+    parser.add_argument('--typos', type=int, default=2000, help="합성 오타 수")
+    parser.add_argument('--brute-typos', type=int, default=20, help="전체 사전 순회로 측정할 오타 수")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="결과 JSON 파일 경로 (없으면 표준 출력)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dict_path, freq_path = args.words, args.freq
+        source = dict_path
+        if args.synthetic or not (os.path.exists(dict_path) and os.path.exists(freq_path)):
+            size = args.synthetic or 50000
+            dict_path, freq_path = make_synthetic_dictionary(tmp_dir, size, args.seed)
+            source = f'synthetic:{size}'
+
+        results = {
+            'benchmark': 'spell_checker',
+            'environment': environment_info(),
+            'parameters': {
+                'dictionary': source,
+                'typos': args.typos,
+                'brute_typos': args.brute_typos,
+                'repeat': args.repeat,
+                'seed': args.seed,
+                'numpy': sc.NUMPY_AVAILABLE,
+            },
+            'results': run_benchmarks(dict_path, freq_path, args.typos, args.brute_typos,
+                                      args.seed, args.repeat),
+        }
+    write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
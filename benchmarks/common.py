@@ -0,0 +1,111 @@
+# common.py
+"""벤치마크 스크립트가 함께 쓰는 도구: 경로 설정, 합성 말뭉치 생성, 통계 요약, JSON 결과 저장."""
+import json
+import os
+import platform
+import random
+import string
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHAT_DIR = os.path.join(ROOT_DIR, 'chat')
+if CHAT_DIR not in sys.path:
+    sys.path.insert(0, CHAT_DIR)
+
+def percentile(sorted_values, p):
+    """정렬된 값 목록에서 p(0~100) 백분위수를 반환합니다. (최근접 순위 방식)"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+def summarize(samples):
+    """초 단위 측정값 목록을 밀리초 단위 요약 통계로 변환합니다."""
+    values = sorted(samples)
+    if not values:
+        return {'count': 0}
+    to_ms = lambda v: round(v * 1000, 4)
+    return {
+        'count': len(values),
+        'mean_ms': to_ms(sum(values) / len(values)),
+        'min_ms': to_ms(values[0]),
+        'p50_ms': to_ms(percentile(values, 50)),
+        'p95_ms': to_ms(percentile(values, 95)),
+        'p99_ms': to_ms(percentile(values, 99)),
+        'max_ms': to_ms(values[-1]),
+    }
+
+def make_typo(word, rng, edits=1):
+    """단어에 삽입/삭제/치환/인접 교환 편집을 edits번 적용한 오타를 만듭니다."""
+    letters = string.ascii_lowercase
+    for _ in range(edits):
+        op = rng.randrange(4)
+        i = rng.randrange(len(word) + 1)
+        if op == 0:
+            word = word[:i] + rng.choice(letters) + word[i:]
+        elif op == 1 and len(word) > 1 and i < len(word):
+            word = word[:i] + word[i + 1:]
+        elif op == 2 and i < len(word):
+            word = word[:i] + rng.choice(letters) + word[i + 1:]
+        elif len(word) > 1 and i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+def make_typo_corpus(words, count, seed=0, max_edits=2):
+    """사전 단어에서 무작위로 오타 count개를 만듭니다. 같은 seed는 같은 말뭉치를 만듭니다."""
+    rng = random.Random(seed)
+    words = sorted(w for w in words if w.isalpha() and w.islower() and len(w) > 2)
+    return [make_typo(rng.choice(words), rng, rng.randint(1, max_edits)) for _ in range(count)]
+
+def make_sentences(words, count, typo_rate=0.2, length=12, seed=0):
+    """사전 단어와 오타를 섞은 합성 문장 count개를 만듭니다."""
+    rng = random.Random(seed)
+    words = sorted(w for w in words if w.isalpha() and w.islower() and len(w) > 2)
+    sentences = []
+    for _ in range(count):
+        tokens = []
+        for _ in range(length):
+            word = rng.choice(words)
+            tokens.append(make_typo(word, rng) if rng.random() < typo_rate else word)
+        sentences.append(' '.join(tokens).capitalize() + '.')
+    return sentences
+
+def make_synthetic_dictionary(directory, size, seed=0):
+    """
+    실제 사전 파일이 없을 때 사용할 합성 words.txt / en_full.txt를 생성하고 경로를 반환합니다.
+    """
+    rng = random.Random(seed)
+    syllables = ['ba', 'ce', 'di', 'fo', 'gu', 'ka', 'le', 'mi', 'no', 'pu', 'ra', 'se', 'ti',
+                 'vo', 'th', 'st', 'ing', 'er', 'ed', 'an', 'ou', 'ch', 'sh', 're']
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(1, 5))))
+    os.makedirs(directory, exist_ok=True)
+    dict_path = os.path.join(directory, 'words.txt')
+    freq_path = os.path.join(directory, 'en_full.txt')
+    with open(dict_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(sorted(words)) + '\n')
+    with open(freq_path, 'w', encoding='utf-8') as f:
+        for word in sorted(words):
+            f.write(f"{word} {int(rng.paretovariate(1.2) * 10)}\n")
+    return dict_path, freq_path
+
+def environment_info():
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def write_results(results, output_path):
+    """결과를 JSON으로 저장합니다. output_path가 없으면 표준 출력에 씁니다."""
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"결과 저장 완료: {output_path}", file=sys.stderr)
+    else:
+        print(text)
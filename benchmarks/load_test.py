@@ -0,0 +1,282 @@
+# load_test.py
+"""
+chat_server 부하 테스트.
+
+chat_client와 같은 프로토콜로 N개의 가상 클라이언트를 접속시켜 LOGIN, ROOM_MSG, P_MSG, QUIZ,
+SPELL_CHECK 트래픽을 섞어 보내고, 명령별 처리량과 p50/p95/p99 지연 시간을 JSON으로 기록합니다.
+
+사용법:
+    python benchmarks/load_test.py [--host H] [--port P] [--clients N] [--duration S] [--rate R]
+                                   [--mix room=4,pmsg=3,quiz=1,spell=2] [--spell-pipeline N] [--binary]
+                                   [--start-server] [--output result.json]
+
+ROOM_MSG / P_MSG / QUIZ는 보낸 시각을 메시지에 담아 받은 클라이언트에서 전달 지연을 측정하고,
+SPELL_CHECK와 LOGIN은 요청부터 응답까지의 왕복 시간을 측정합니다.
+SPELL_CHECK에는 요청 ID를 붙여 클라이언트마다 결과를 기다리지 않고 최대 --spell-pipeline개까지 이어서 보냅니다.
+--binary를 지정하면 LOGIN에서 바이너리 프레임(프로토콜 버전 2)을 협상해 사용합니다.
+"""
+import argparse
+import itertools
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from threading import Thread, Event, Lock, Semaphore
+
+from common import CHAT_DIR, summarize, make_sentences, environment_info, write_results
+from protocol import Message, MessageReader, PROTOCOL_BINARY
+
+ROOM_NAME = 'bench_room'
+MARKER = 'bench@'
+DEFAULT_MIX = 'room=4,pmsg=3,quiz=1,spell=2'
+SAMPLE_WORDS = ("this is a sample text to check for misspelled words like receive hello world "
+                "chat server client spell checker quiz answer room teacher english").split()
+
+class Recorder:
+    """여러 클라이언트 스레드가 측정값을 기록하는 공용 저장소."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.latencies = {}  # { 'command': [초, ...] }
+        self.sent = {}
+        self.received = {}
+        self.errors = 0
+
+    def add_latency(self, command, seconds):
+        with self.lock:
+            self.latencies.setdefault(command, []).append(seconds)
+
+    def count(self, table, command):
+        with self.lock:
+            table[command] = table.get(command, 0) + 1
+
+    def add_error(self):
+        with self.lock:
+            self.errors += 1
+
+class SimulatedClient:
+    """chat_client 프로토콜을 말하는 가상 클라이언트 하나."""
+
+    def __init__(self, number, args, recorder, peers, texts, stop):
+        self.user_id = f"bench{number}"
+        self.args = args
+        self.recorder = recorder
+        self.peers = peers
+        self.texts = texts
+        self.stop = stop
+        self.rng = random.Random(args.seed + number)
+        self.sock = None
+        self.logged_in = Event()
+        self.login_sent_at = 0.0
+        self.request_ids = itertools.count(1)
+        self.spell_sent_at = {}  # { 요청 ID: 보낸 시각 } 결과를 기다리는 SPELL_CHECK
+        self.spell_slots = Semaphore(args.spell_pipeline)
+
+    def connect(self):
+        self.sock = socket.create_connection((self.args.host, self.args.port), timeout=10)
+        self.sock.settimeout(None)
+        Thread(target=self.listen, daemon=True).start()
+        self.login_sent_at = time.perf_counter()
+        if self.args.binary:
+            self.send('LOGIN', self.user_id, str(PROTOCOL_BINARY))
+        else:
+            self.send('LOGIN', self.user_id)
+        self.recorder.count(self.recorder.sent, 'LOGIN')
+
+    def send(self, command, *params, trailing=None):
+        # 로그인 응답 전에는 텍스트로 보내고, 바이너리를 협상했으면 이후는 프레임으로 보냅니다.
+        binary = self.args.binary and self.logged_in.is_set()
+        self.sock.sendall(Message(command, *params, trailing=trailing).encode(binary))
+
+    def listen(self):
+        reader = MessageReader(16 * 1024 * 1024)
+        if self.args.binary:
+            reader.switch_to_binary()
+        try:
+            while not self.stop.is_set():
+                if not reader.recv_from(self.sock):
+                    break
+                while (message := reader.next_message()) is not None:
+                    command, params, trailing, _ = message
+                    self.on_message(command, params, trailing or '')
+        except OSError:
+            pass
+
+    def on_message(self, command, params, trailing):
+        now = time.perf_counter()
+        self.recorder.count(self.recorder.received, command)
+        if command == 'LOGIN_SUCCESS':
+            self.recorder.add_latency('LOGIN', now - self.login_sent_at)
+            self.logged_in.set()
+        elif command == 'LOGIN_FAIL':
+            self.recorder.add_error()
+            self.logged_in.set()
+        elif command == 'SPELL_RESULT':
+            self.finish_spell_check('SPELL_CHECK', params[0] if params else None, now)
+        elif command == 'SPELL_BUSY':
+            # 서버가 입장 제어로 거절한 검사. 거절 응답까지의 시간을 따로 기록합니다.
+            self.finish_spell_check('SPELL_BUSY', params[1] if len(params) > 1 else None, now)
+        elif MARKER in trailing:
+            # 형식: ... :bench@<명령>@<보낸 시각> ...
+            _, _, tail = trailing.partition(MARKER)
+            kind, _, sent_at = tail.partition('@')
+            try:
+                self.recorder.add_latency(kind, now - float(sent_at.split(' ', 1)[0]))
+            except ValueError:
+                self.recorder.add_error()
+
+    def finish_spell_check(self, kind, request_id, now):
+        sent_at = self.spell_sent_at.pop(request_id, None)
+        if sent_at is None:
+            self.recorder.add_error()  # 보낸 적 없거나 이미 받은 요청 ID
+            return
+        self.recorder.add_latency(kind, now - sent_at)
+        self.spell_slots.release()
+
+    def run(self, weights):
+        self.logged_in.wait(10)
+        self.send('JOIN_ROOM', ROOM_NAME)
+        kinds, cumulative = zip(*weights)
+        interval = 1.0 / self.args.rate if self.args.rate > 0 else 0
+        next_at = time.perf_counter()
+        while not self.stop.is_set():
+            kind = self.rng.choices(kinds, cum_weights=cumulative)[0]
+            stamp = f"{MARKER}{kind}@{time.perf_counter():.6f}"
+            try:
+                if kind == 'ROOM_MSG':
+                    self.send('ROOM_MSG', ROOM_NAME, trailing=f"{stamp} hello room")
+                elif kind == 'P_MSG':
+                    target = self.rng.choice(self.peers)
+                    self.send('P_MSG', target, trailing=f"{stamp} hello")
+                elif kind == 'QUIZ':
+                    self.send('QUIZ', trailing=f"{stamp} what is the opposite of hot?")
+                elif kind == 'SPELL_CHECK':
+                    # 결과를 기다리는 검사가 --spell-pipeline개이면 하나가 끝날 때까지 기다립니다.
+                    if not self.spell_slots.acquire(timeout=30):
+                        self.recorder.add_error()
+                        continue
+                    request_id = str(next(self.request_ids))
+                    self.spell_sent_at[request_id] = time.perf_counter()
+                    self.send('SPELL_CHECK', request_id, trailing=self.rng.choice(self.texts))
+                self.recorder.count(self.recorder.sent, kind)
+            except OSError:
+                self.recorder.add_error()
+                break
+            if interval:
+                next_at += interval
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def close(self):
+        try:
+            self.send('QUIT', trailing="bench done")
+            self.sock.close()
+        except OSError:
+            pass
+
+def parse_mix(mix):
+    names = {'room': 'ROOM_MSG', 'pmsg': 'P_MSG', 'quiz': 'QUIZ', 'spell': 'SPELL_CHECK'}
+    weights, total = [], 0
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        total += float(weight)
+        weights.append((names[name.strip()], total))
+    return weights
+
+def start_server(port):
+    """
+    chat 디렉토리에서 로컬 서버를 띄우고 포트가 열릴 때까지 기다립니다.
+    사전을 다 준비한 뒤에 포트를 열도록(SPELL_WARMUP=blocking) 해서 준비 중인 서버를 측정하지 않습니다.
+    """
+    env = dict(os.environ, CHAT_PORT=str(port))
+    env.setdefault('SPELL_WARMUP', 'blocking')
+    server = subprocess.Popen([sys.executable, 'chat_server.py'], cwd=CHAT_DIR, env=env,
+                              stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("서버가 시작되지 않았습니다.")
+
+def run_load_test(args):
+    recorder = Recorder()
+    stop = Event()
+    peers = [f"bench{i}" for i in range(args.clients)]
+    texts = make_sentences(SAMPLE_WORDS, 200, seed=args.seed)
+    weights = parse_mix(args.mix)
+
+    clients = [SimulatedClient(i, args, recorder, peers, texts, stop) for i in range(args.clients)]
+    for client in clients:
+        client.connect()
+    for client in clients:
+        client.logged_in.wait(10)
+
+    started = time.perf_counter()
+    threads = [Thread(target=client.run, args=(weights,), daemon=True) for client in clients]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    elapsed = time.perf_counter() - started
+    time.sleep(0.5)  # 전송 중인 메시지를 잠시 더 받습니다.
+    for client in clients:
+        client.close()
+
+    with recorder.lock:
+        commands = {}
+        for command in sorted(set(recorder.sent) | set(recorder.latencies)):
+            sent = recorder.sent.get(command, 0)
+            commands[command] = {
+                'sent': sent,
+                'sent_per_sec': round(sent / elapsed, 2),
+                'latency': summarize(recorder.latencies.get(command, [])),
+            }
+        return {
+            'elapsed_seconds': round(elapsed, 3),
+            'total_sent': sum(recorder.sent.values()),
+            'total_received': sum(recorder.received.values()),
+            'sent_per_sec': round(sum(recorder.sent.values()) / elapsed, 2),
+            'received_per_sec': round(sum(recorder.received.values()) / elapsed, 2),
+            'errors': recorder.errors,
+            'commands': commands,
+            'received_by_command': dict(sorted(recorder.received.items())),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="chat_server 부하 테스트")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=10.0, help="측정 시간(초)")
+    parser.add_argument('--rate', type=float, default=5.0, help="클라이언트당 초당 메시지 수 (0이면 최대 속도)")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="명령 비율 (room, pmsg, quiz, spell)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--spell-pipeline', type=int, default=4,
+                        help="클라이언트마다 결과를 기다리지 않고 보낼 수 있는 SPELL_CHECK 수 (1이면 하나씩)")
+    parser.add_argument('--binary', action='store_true', help="바이너리 프레임 프로토콜(버전 2)을 사용합니다.")
+    parser.add_argument('--start-server', action='store_true', help="chat 디렉토리에서 로컬 서버를 직접 실행합니다.")
+    parser.add_argument('--output', help="결과 JSON 파일 경로 (없으면 표준 출력)")
+    args = parser.parse_args()
+
+    server = start_server(args.port) if args.start_server else None
+    try:
+        results = {
+            'benchmark': 'chat_load',
+            'environment': environment_info(),
+            'parameters': {k: v for k, v in vars(args).items() if k != 'output'},
+            'results': run_load_test(args),
+        }
+    finally:
+        if server:
+            server.communicate(b'q\n', timeout=10)
+    write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,61 @@
 # chat_client.py
 import socket
-from threading import Thread, Event
+from threading import Thread, Event, Lock
 import sys
+import os
+import json
+import itertools
+
+from protocol import Message, MessageReader, PROTOCOL_BINARY
+
+# --- 로컬 맞춤법 검사 모듈 로드 ---
+try:
+    from spell_checker_v2 import (load_words, load_frequency_map, build_suggestion_index, unknown_words,
+                                  apply_corrections, WORD_PATTERN)
+    from suggestion_cache import SuggestionCache
+    LOCAL_SPELL_AVAILABLE = True
+except ImportError:
+    LOCAL_SPELL_AVAILABLE = False
 
 # --- 클라이언트 설정 ---
 SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 5001
-BUFSIZE = 1024
+STREAM_THRESHOLD = 500  # 이 길이 이상의 텍스트는 SPELL_CHECK_STREAM으로 요청합니다.
+USE_BINARY_PROTOCOL = True  # LOGIN에서 바이너리 프레임을 제안합니다. (서버가 모르면 텍스트로 계속합니다)
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+# 로컬 맞춤법 검사에 쓸 작은 사전 (빈도 상위 단어만 담은 스냅샷, dict_snapshot.py --top으로 생성)
+# 파일이 있으면 로컬 검사를 켠 상태로 시작합니다. (메뉴에서 /local로 켜고 끌 수 있습니다)
+LOCAL_SPELL_DICTIONARY = 'spell_checker/client_dictionary.snap'
+LOCAL_MAX_DISTANCE = 2
+LOCAL_CACHE_SIZE = 10000  # 서버에 물어본 단어의 교정 결과를 기억할 개수
+# 로컬 사전에서 거리 1 후보가 하나뿐이고 그 빈도가 이 값 이상이면 서버에 묻지 않고 그 후보로 고칩니다.
+LOCAL_RESOLVE_DISTANCE = 1
+LOCAL_RESOLVE_MIN_FREQUENCY = 10000
 
 # --- 전역 변수 ---
 event = Event()
+login_done = Event()  # LOGIN_SUCCESS 또는 LOGIN_FAIL을 받으면 설정됩니다.
+binary_mode = False  # 서버가 바이너리 프레임을 받아들였는지 여부
 my_id = None
 current_mode = 'main'  # 'main' or 'room'
 current_room = ''
+streaming_request = None  # SPELL_RESULT_PART를 이어 쓰고 있는 줄의 요청 ID
+online_users = set()  # 현재 접속자 (로그인 시 USER_LIST로 받고 USER_JOIN/USER_LEAVE로 갱신)
+# 결과를 기다리는 맞춤법 검사 { 요청 ID: (검사한 텍스트, 로컬 검사면 (서버에 물어본 단어 목록, 로컬에서 정한 교정)) }
+# 결과를 기다리지 않고 여러 검사를 이어서 보낼 수 있습니다.
+pending_spell_checks = {}
+pending_lock = Lock()
+request_ids = itertools.count(1)
+local_dictionary = None  # (단어 집합, 빈도 맵, 추천 인덱스) 로컬 맞춤법 검사 사전
+local_cache = None       # 서버에 물어본 단어의 교정 결과 (SuggestionCache)
+local_mode = False       # 로컬 맞춤법 검사 사용 여부
 
 def clear_line():
-    """현재 줄을 지웁니다."""
+    """현재 줄을 지웁니다. 스트리밍 결과를 이어 쓰던 줄이면 지우지 않고 줄을 바꿉니다."""
+    global streaming_request
+    if streaming_request is not None:
+        sys.stdout.write('\n')
+        streaming_request = None
     sys.stdout.write('\r' + ' ' * 80 + '\r')
     sys.stdout.flush()
 
@@ -28,31 +68,175 @@ def show_prompt():
     sys.stdout.write(prompt)
     sys.stdout.flush()
 
-def parse_message(msg_str):
-    """프로토콜 메시지 파싱: CMD param1 ... :trailing"""
-    msg_str = msg_str.strip()
-    if ' :' in msg_str:
-        parts, trailing = msg_str.split(' :', 1)
+def send_command(sock, command, *params, trailing=None):
+    """서버와 협상한 프로토콜(텍스트 또는 바이너리 프레임)로 명령을 보냅니다."""
+    sock.sendall(Message(command, *params, trailing=trailing).encode(binary_mode))
+
+def send_spell_check(sock, command, text, local_check=None):
+    """
+    요청 ID를 붙여 맞춤법 검사를 보내고, 결과가 올 때까지 pending_spell_checks에 기록합니다.
+    local_check (물어볼 단어 목록, 로컬에서 정한 교정)이 있으면 text 대신 그 단어들만 SPELL_CHECK_BATCH로 물어봅니다.
+    """
+    request_id = str(next(request_ids))
+    with pending_lock:
+        pending_spell_checks[request_id] = (text, local_check)
+    if local_check is None:
+        send_command(sock, command, request_id, trailing=text)
+    else:
+        send_command(sock, 'SPELL_CHECK_BATCH', request_id, trailing=json.dumps(local_check[0]))
+
+def pending_request_id(params):
+    """
+    결과에 해당하는 요청 ID. (pending_lock을 잡고 호출)
+    요청 ID를 돌려주지 않는 서버면 가장 오래된 요청의 결과로 봅니다. (그런 서버는 요청 순서대로 답합니다)
+    """
+    if params and params[0] in pending_spell_checks:
+        return params[0]
+    return next(iter(pending_spell_checks), None)
+
+def stream_request_id(params):
+    """SPELL_RESULT_PART가 속한 요청 ID (요청은 SPELL_RESULT_END까지 pending_spell_checks에 남겨 둡니다)"""
+    with pending_lock:
+        return pending_request_id(params)
+
+def finish_spell_check(params):
+    """결과에 해당하는 요청을 pending_spell_checks에서 지우고 (요청 ID, 텍스트, 로컬 검사 정보)를 반환합니다."""
+    with pending_lock:
+        request_id = pending_request_id(params)
+        text, words = pending_spell_checks.pop(request_id, (None, None))
+    return request_id, text, words
+
+def load_local_dictionary():
+    """로컬 맞춤법 검사 사전을 엽니다. 검사기 모듈이나 사전 파일이 없으면 None을 반환합니다."""
+    if not LOCAL_SPELL_AVAILABLE or not os.path.exists(LOCAL_SPELL_DICTIONARY):
+        return None
+    words = load_words(LOCAL_SPELL_DICTIONARY)
+    freqs = load_frequency_map(LOCAL_SPELL_DICTIONARY)
+    if not words or not freqs:
+        return None
+    # 스냅샷에 인덱스가 없으면(--index 없이 컴파일) 거리 1 인덱스만 만듭니다. (빈도 상위 단어만이라 금방 만들어집니다)
+    index = words.suggestion_index if hasattr(words, 'suggestion_index') else None
+    if index is None or not index.supports(LOCAL_RESOLVE_DISTANCE):
+        index = build_suggestion_index(words, freqs, LOCAL_RESOLVE_DISTANCE)
+    return words, freqs, index
+
+def local_cache_key(word):
+    return SuggestionCache.make_key(word, LOCAL_MAX_DISTANCE, 1)
+
+def resolve_locally(word):
+    """
+    로컬 사전만으로 고칠 수 있는 오타면 추천 단어를, 아니면 None을 반환합니다.
+    거리 1 후보가 하나뿐이고 자주 쓰이는 단어일 때만 고칩니다. 후보가 여럿이거나 드문 단어면
+    전체 사전에 더 가까운 단어가 있거나 그 자체로 올바른 단어일 수 있으므로 서버에 물어봅니다.
+    """
+    _, freqs, index = local_dictionary
+    candidates = index.suggest(word, LOCAL_RESOLVE_DISTANCE, limit=2)
+    if len(candidates) == 1 and freqs.get(candidates[0], 0) >= LOCAL_RESOLVE_MIN_FREQUENCY:
+        return candidates[0]
+    return None
+
+def local_corrections(text):
+    """
+    로컬 사전에 없는 단어를 서버에 물어본 적이 있으면 기억해 둔 교정으로, 아니면 로컬 사전으로 고칠 수 있을 때 고칩니다.
+    (로컬에서 정한 교정 { 소문자 단어: 추천 단어 또는 None }, 서버에 물어볼 단어 목록(정렬))을 반환합니다.
+    """
+    words, _, _ = local_dictionary
+    corrections = {}
+    unresolved = []
+    for word in sorted(unknown_words([text], words)):
+        cached = local_cache.get(local_cache_key(word))
+        if cached is not None:
+            corrections[word] = cached[0] if cached else None
+        elif (resolved := resolve_locally(word)) is not None:
+            corrections[word] = resolved
+        else:
+            unresolved.append(word)
+    return corrections, unresolved
+
+def remember_corrections(words, corrected_words, corrections):
+    """
+    서버가 교정한 단어를 이 요청의 교정에 넣고 캐시에도 기억합니다.
+    바뀌지 않은 단어는 '추천 없음'으로 넣어 다시 묻지 않습니다.
+    """
+    for word, corrected in zip(words, corrected_words):
+        corrections[word] = corrected if corrected != word else None
+        local_cache.put(local_cache_key(word), [corrected] if corrected != word else [])
+
+def local_correct(text, corrections):
+    """
+    요청마다 정한 교정만으로 텍스트를 교정합니다. 교정이 없는 단어는 그대로 둡니다.
+    (빈도 상위 단어만 담은 사전으로 직접 추천하면 드물지만 올바른 단어를 잘못 고칠 수 있기 때문입니다.
+     캐시에서 밀려난 단어도 결과를 받을 때까지 이 요청의 교정에 남아 있습니다)
+    """
+    return apply_corrections(WORD_PATTERN.split(text), corrections)
+
+def local_spell_check(sock, text):
+    """
+    로컬 사전으로 맞춤법을 검사합니다. 모든 단어를 로컬에서 판단할 수 있으면 서버에 보내지 않고,
+    그렇지 않으면 판단할 수 없는 단어만 서버에 물어본 뒤 결과가 오면 로컬에서 교정합니다.
+    """
+    corrections, words = local_corrections(text)
+    if words:
+        send_spell_check(sock, 'SPELL_CHECK_BATCH', text, (words, corrections))
     else:
-        parts, trailing = msg_str, None
-    tokens = parts.split()
-    command = tokens[0].upper()
-    params = tokens[1:]
-    return command, params, trailing
+        print(f"[맞춤법 검사 결과 (로컬)] {local_correct(text, corrections)}")
 
 def listen_for_messages(sock):
     """서버로부터 오는 메시지를 수신하고 처리하는 스레드"""
+    global binary_mode, streaming_request
+    reader = MessageReader(MAX_MESSAGE_BYTES)
+    if USE_BINARY_PROTOCOL:
+        # 바이너리 프레임은 첫 바이트(길이의 최상위 바이트)가 0이고, 텍스트 응답은 명령 이름으로 시작합니다.
+        try:
+            if sock.recv(1, socket.MSG_PEEK) == b'\0':
+                reader.switch_to_binary()
+                binary_mode = True
+        except OSError:
+            pass
     while not event.is_set():
         try:
-            raw_msg = sock.recv(BUFSIZE).decode()
-            if not raw_msg:
+            if not reader.recv_from(sock):
                 break
             
-            for msg in raw_msg.strip().split('\n'):
-                if not msg:
+            while (message := reader.next_message()) is not None:
+                command, params, trailing, raw = message
+
+                # 스트리밍 결과는 도착하는 대로 같은 줄에 이어서 출력합니다.
+                # 요청 ID를 붙인 스트리밍 검사는 서버에서 동시에 실행되어 조각이 섞여 올 수 있으므로
+                # 다른 요청의 조각이 오면 그 요청 ID를 붙인 새 줄에서 이어 씁니다.
+                if command == 'SPELL_RESULT_PART':
+                    request_id = stream_request_id(params)
+                    if streaming_request == request_id:
+                        sys.stdout.write(trailing or '')
+                    else:
+                        clear_line()
+                        sys.stdout.write(f"[#{request_id}] {(trailing or '').lstrip()}")
+                        streaming_request = request_id
+                    sys.stdout.flush()
+                    continue
+                if command == 'SPELL_RESULT_END':
+                    finish_spell_check(params)
+                    clear_line()
+                    show_prompt()
+                    continue
+
+                # 접속자 변경분은 실제로 바뀐 사용자만 출력합니다. (이미 아는 접속/퇴장은 무시)
+                if command in ('USER_JOIN', 'USER_LEAVE'):
+                    user_ids = [u for u in (trailing or '').split(',') if u and u != my_id]
+                    if command == 'USER_JOIN':
+                        changed = [u for u in user_ids if u not in online_users]
+                        online_users.update(changed)
+                    else:
+                        changed = [u for u in user_ids if u in online_users]
+                        online_users.difference_update(changed)
+                    if not changed:
+                        continue
+                    clear_line()
+                    action = "접속" if command == 'USER_JOIN' else "퇴장"
+                    print(f"[SYSTEM] {', '.join(changed)}님이 {action}했습니다. (현재 {len(online_users) + 1}명)")
+                    show_prompt()
                     continue
 
-                command, params, trailing = parse_message(msg)
                 clear_line()
 
                 if command == 'MSG_RECV':
@@ -65,11 +249,35 @@ def listen_for_messages(sock):
                     print(f"[{room_name}|{sender}] {content}")
 
                 elif command == 'USER_LIST':
-                    users = trailing.split(',')
+                    users = [u for u in trailing.split(',') if u]
+                    online_users.clear()
+                    online_users.update(u for u in users if u != my_id)
                     print(f"[SYSTEM] 현재 접속자: {', '.join(users)}")
                 
                 elif command == 'SPELL_RESULT':
-                    print(f"[맞춤법 검사 결과] {trailing}")
+                    request_id, _, _ = finish_spell_check(params)
+                    print(f"[맞춤법 검사 결과 #{request_id}] {trailing}")
+
+                elif command == 'SPELL_BUSY':
+                    request_id, _, _ = finish_spell_check(params[1:])
+                    print(f"[맞춤법 검사 거절 #{request_id}] {trailing}")
+
+                elif command == 'SPELL_RESULT_BATCH':
+                    request_id, text, local_check = finish_spell_check(params)
+                    if local_check is not None:
+                        # 로컬 검사에서 물어본 단어들의 결과
+                        words, corrections = local_check
+                        remember_corrections(words, json.loads(trailing), corrections)
+                        print(f"[맞춤법 검사 결과 #{request_id}] {local_correct(text, corrections)}")
+                    else:
+                        for i, corrected in enumerate(json.loads(trailing), 1):
+                            print(f"[맞춤법 검사 결과 #{request_id}-{i}] {corrected}")
+
+                elif command == 'STATS_RESULT':
+                    print(f"[서버 지표]\n{json.dumps(json.loads(trailing), ensure_ascii=False, indent=2)}")
+
+                elif command == 'PROFILE_RESULT':
+                    print(f"[프로파일 결과]\n{json.dumps(json.loads(trailing), ensure_ascii=False, indent=2)}")
 
                 elif command == 'JOIN_SUCCESS':
                     global current_mode, current_room
@@ -81,9 +289,10 @@ def listen_for_messages(sock):
                     print(f"[SYSTEM] {trailing}")
                     if command == 'LOGIN_FAIL':
                         event.set() # 로그인 실패 시 프로그램 종료
+                    login_done.set()
                 
                 else:
-                    print(f"[SERVER] {msg}")
+                    print(f"[SERVER] {raw if raw is not None else Message(command, *params, trailing=trailing)}")
                 
                 show_prompt()
 
@@ -93,6 +302,7 @@ def listen_for_messages(sock):
     clear_line()
     print("서버와의 연결이 끊어졌습니다. Enter를 눌러 종료하세요.")
     event.set()
+    login_done.set()
 
 def show_main_menu():
     print("\n--- 메뉴 ---")
@@ -105,7 +315,7 @@ def show_main_menu():
 
 def main():
     """메인 함수"""
-    global my_id, current_mode, current_room
+    global my_id, current_mode, current_room, local_dictionary, local_cache, local_mode
 
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     try:
@@ -121,19 +331,27 @@ def main():
             print("아이디는 공백, ':', ',' 문자를 포함할 수 없습니다.")
             my_id = None
 
-    s.send(f"LOGIN {my_id}\n".encode())
+    if USE_BINARY_PROTOCOL:
+        send_command(s, 'LOGIN', my_id, str(PROTOCOL_BINARY))
+    else:
+        send_command(s, 'LOGIN', my_id)
 
     listener_thread = Thread(target=listen_for_messages, args=(s,))
     listener_thread.daemon = True
     listener_thread.start()
 
-    # 로그인 성공/실패 기다리기
-    while not my_id and not event.is_set():
-        time.sleep(0.1)
+    # 로그인 성공/실패 기다리기 (바이너리 프레임 사용 여부도 이 응답으로 정해집니다)
+    login_done.wait()
     if event.is_set(): # 로그인 실패
         s.close()
         return
 
+    local_dictionary = load_local_dictionary()
+    if local_dictionary:
+        local_cache = SuggestionCache(LOCAL_CACHE_SIZE)
+        local_mode = True
+        print(f"[SYSTEM] 로컬 맞춤법 검사 사전({len(local_dictionary[0]):,}단어)을 사용합니다. (/local로 켜고 끄기)")
+
     show_main_menu()
 
     try:
@@ -152,46 +370,64 @@ def main():
             # --- 채팅방 모드 ---
             if current_mode == 'room':
                 if msg.lower() == '/exit':
-                    s.send(f"LEAVE_ROOM {current_room}\n".encode())
+                    send_command(s, 'LEAVE_ROOM', current_room)
                     current_mode = 'main'
                     current_room = ''
                     clear_line()
                     print(f"[SYSTEM] 채팅방에서 퇴장했습니다.")
                     show_main_menu()
                 else:
-                    s.send(f"ROOM_MSG {current_room} :{msg}\n".encode())
+                    send_command(s, 'ROOM_MSG', current_room, trailing=msg)
                 continue
 
             # --- 메인 메뉴 모드 ---
             if msg.lower() == '/quit':
                 break
+            if msg.lower() == '/stats':
+                send_command(s, 'STATS')
+                continue
+            if msg.lower().split(' ', 1)[0] == '/profile':
+                send_command(s, 'PROFILE', *msg.split()[1:])
+                continue
+            if msg.lower() == '/local':
+                if not local_dictionary:
+                    print(f"[SYSTEM] 로컬 맞춤법 검사 사전이 없습니다: {LOCAL_SPELL_DICTIONARY}")
+                else:
+                    local_mode = not local_mode
+                    print(f"[SYSTEM] 로컬 맞춤법 검사를 {'켰' if local_mode else '껐'}습니다.")
+                continue
             
             if msg == '1':
                 text = input("맞춤법을 검사할 영어 문장을 입력하세요: ")
-                s.send(f"SPELL_CHECK :{text}\n".encode())
+                # 결과를 기다리지 않으므로 앞선 검사가 끝나기 전에 다음 검사를 보낼 수 있습니다.
+                if local_mode:
+                    local_spell_check(s, text)
+                elif len(text) >= STREAM_THRESHOLD:
+                    send_spell_check(s, 'SPELL_CHECK_STREAM', text)
+                else:
+                    send_spell_check(s, 'SPELL_CHECK', text)
             elif msg == '2':
                 quiz = input("전체에게 보낼 퀴즈를 입력하세요: ")
-                s.send(f"QUIZ :{quiz}\n".encode())
+                send_command(s, 'QUIZ', trailing=quiz)
             elif msg == '3':
                 answer = input("퀴즈의 정답을 입력하세요: ")
-                s.send(f"QUIZ_ANSWER :{answer}\n".encode())
+                send_command(s, 'QUIZ_ANSWER', trailing=answer)
             elif msg == '4':
                 target_id = input("메시지를 보낼 상대방의 ID를 입력하세요: ")
                 p_msg = input(f"{target_id}님에게 보낼 메시지: ")
-                s.send(f"P_MSG {target_id} :{p_msg}\n".encode())
+                send_command(s, 'P_MSG', target_id, trailing=p_msg)
             elif msg == '5':
-                s.send(f"JOIN_ROOM english_teacher_room\n".encode())
+                send_command(s, 'JOIN_ROOM', 'english_teacher_room')
             else:
                 print("잘못된 메뉴 선택입니다. 메시지를 보내려면 메뉴를 선택하세요.")
 
     finally:
         if not event.is_set():
             print("\n프로그램을 종료합니다...")
-            s.send(f"QUIT :Leaving\n".encode())
+            send_command(s, 'QUIT', trailing="Leaving")
         
         event.set()
         s.close()
 
 if __name__ == "__main__":
-    import time
     main()
@@ -1,238 +1,630 @@
 # chat_server.py
 import socket
-from threading import Thread, Event
+import asyncio
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, Event, Lock, get_ident
 import sys
-import re
+import os
+import json
+import time
 
 # --- 맞춤법 검사기 모듈 로드 ---
 try:
-    from spell_checker_v2 import load_words, load_frequency_map, check_text, get_suggestions
+    from spell_checker_v2 import (load_words, load_frequency_map, SpellDictionary,
+                                  build_suggestion_index, build_array_dictionary)
+    import spell_checker_v2
+    from dict_snapshot import open_snapshot
     SPELL_CHECKER_LOADED = True
 except ImportError:
     SPELL_CHECKER_LOADED = False
     print("[SERVER-ERROR] 'spell_checker_v2' 모듈을 찾을 수 없습니다. 맞춤법 검사 기능이 비활성화됩니다.")
+from suggestion_cache import SuggestionCache
+from dawg_dictionary import DawgDictionary, build_dawg_dictionary
+from spell_worker_pool import SpellWorkerPool
+from spell_admission import SpellAdmission, SpellRejected
+from dictionary_warmup import WarmupProgress
+from line_buffer import LineTooLongError
+from session_registry import SessionRegistry
+from presence import PresenceNotifier
+from cluster_bus import BusHub, BusClient, CLAIM_TIMEOUT
+from server_log import get_logger, SampledLogger, setup_logging, shutdown_logging, dropped_records
+from server_metrics import Metrics
+from server_profiler import SamplingProfiler, ProfilerBusy
+import protocol
+from protocol import Message, MessageReader, PROTOCOL_BINARY
 
 # --- 서버 설정 ---
 HOST = ''
-PORT = 5001
+PORT = int(os.environ.get('CHAT_PORT', '5001'))
 ADDR = (HOST, PORT)
-BUFSIZE = 1024
+LISTEN_BACKLOG = 1024
+# 한 줄(메시지 하나)의 최대 바이트 수. 넘으면 연결을 끊습니다.
+MAX_LINE_BYTES = int(os.environ.get('CHAT_MAX_LINE_BYTES', str(1024 * 1024)))
+# 연결마다 아직 보내지 못한 메시지를 쌓아 둘 수 있는 최대 바이트 수와, 넘쳤을 때의 처리 방식
+# ('disconnect': 연결을 끊음, 'drop_oldest': 오래된 메시지부터 버림)
+OUTBOUND_MAX_BYTES = int(os.environ.get('CHAT_OUTBOUND_MAX_BYTES', str(1024 * 1024)))
+OUTBOUND_OVERFLOW = os.environ.get('CHAT_OUTBOUND_OVERFLOW', 'disconnect')
+# LOGIN에서 클라이언트가 제안하면 바이너리 프레임(프로토콜 버전 2)을 사용할지 여부와,
+# 프레임 본문을 zlib으로 압축하기 시작하는 크기(바이트, 0이면 압축하지 않음)
+BINARY_PROTOCOL = os.environ.get('CHAT_BINARY_PROTOCOL', '1') != '0'
+COMPRESS_THRESHOLD = int(os.environ.get('CHAT_COMPRESS_THRESHOLD', '1024'))
+# 접속/퇴장 알림(USER_JOIN/USER_LEAVE)을 모아 보내는 시간(초). 0이면 바로 보냅니다.
+PRESENCE_WINDOW = float(os.environ.get('CHAT_PRESENCE_WINDOW', '0'))
+# asyncio 모드에서 한 연결에 밀려 있는 맞춤법 검사가 이 수에 이르면 그 연결의 읽기를 멈춥니다.
+MAX_PENDING_SPELL_JOBS = 8
+# 서버 실행 방식: 'thread'(연결마다 스레드) 또는 'asyncio'(단일 이벤트 루프)
+CHAT_SERVER_MODE = os.environ.get('CHAT_SERVER_MODE', 'thread')
+# 연결을 받는 서버 워커 프로세스 수. 2 이상이면 각 프로세스가 SO_REUSEPORT로 같은 포트에서 연결을 받습니다.
+CHAT_PROCESSES = int(os.environ.get('CHAT_PROCESSES', '1'))
+# 로그 설정: 최소 레벨, 콘솔 출력 여부, JSON Lines 로그 파일 경로(비어 있으면 파일에 남기지 않음)와 교체 기준
+LOG_LEVEL = os.environ.get('CHAT_LOG_LEVEL', 'INFO')
+LOG_CONSOLE = os.environ.get('CHAT_LOG_CONSOLE', '1') != '0'
+LOG_FILE = os.environ.get('CHAT_LOG_FILE', '')
+LOG_FILE_MAX_BYTES = int(os.environ.get('CHAT_LOG_FILE_MAX_BYTES', str(10 * 1024 * 1024)))
+LOG_FILE_BACKUPS = int(os.environ.get('CHAT_LOG_FILE_BACKUPS', '5'))
+# 수신 메시지 로그([RECV])는 N개 중 하나만, 초당 최대 개수(0이면 제한 없음)까지만 남깁니다.
+LOG_RECV_SAMPLE = int(os.environ.get('CHAT_LOG_RECV_SAMPLE', '1'))
+LOG_RECV_RATE = int(os.environ.get('CHAT_LOG_RECV_RATE', '100'))
+# STATS 명령을 쓸 수 있는 관리자 ID (쉼표로 구분)
+ADMIN_IDS = frozenset(filter(None, (user_id.strip() for user_id in os.environ.get('CHAT_ADMIN_IDS', '').split(','))))
+# 지표를 JSON 한 줄씩 덧붙여 기록할 파일 경로(비어 있으면 기록하지 않음)와 기록 간격(초)
+STATS_FILE = os.environ.get('CHAT_STATS_FILE', '')
+STATS_INTERVAL = float(os.environ.get('CHAT_STATS_INTERVAL', '60'))
+# PROFILE 명령 허용 여부. 관리자 ID는 로그인 이름으로만 확인하므로 기본으로 꺼 둡니다.
+PROFILE_ENABLED = os.environ.get('CHAT_PROFILE', '0') != '0'
+# PROFILE 명령의 결과 파일을 쓸 디렉토리와 보관할 최근 실행 수
+PROFILE_DIR = os.environ.get('CHAT_PROFILE_DIR', 'profiles')
+PROFILE_KEEP = int(os.environ.get('CHAT_PROFILE_KEEP', '10'))
+DEFAULT_PROFILE_SECONDS = 10
+MAX_PROFILE_SECONDS = 300
+MAX_PROFILE_MEMORY_SECONDS = 30  # tracemalloc은 서버의 모든 메모리 할당을 느리게 하므로 더 짧게 제한합니다.
+# asyncio 모드에서 맞춤법 검사를 실행할 스레드 수 (이벤트 루프가 검사 때문에 멈추지 않도록 합니다)
+ASYNC_SPELL_THREADS = int(os.environ.get('ASYNC_SPELL_THREADS', '4'))
+# 추천 단어 검색 방식: 'symspell'(삭제 인덱스), 'array'(NumPy 벡터화 검색),
+# 'dawg'(압축 트라이 사전), 'none'(전체 사전 순회)
+SPELL_INDEX = os.environ.get('SPELL_INDEX', 'symspell')
+# 미리 생성한 DAWG 사전 경로 (dawg_dictionary.py로 생성). SPELL_INDEX가 'dawg'일 때 파일이 있으면 사용합니다.
+SPELL_DAWG = os.environ.get('SPELL_DAWG', 'spell_checker/dictionary.dawg')
+# 미리 컴파일된 사전 스냅샷 경로 (dict_snapshot.py로 생성). 파일이 있으면 텍스트 사전 대신 사용합니다.
+SPELL_SNAPSHOT = os.environ.get('SPELL_SNAPSHOT', 'spell_checker/dictionary.snap')
+# 추천 단어 캐시 크기와 유효 시간(초, 0이면 만료 없음)
+SPELL_CACHE_SIZE = int(os.environ.get('SPELL_CACHE_SIZE', '10000'))
+SPELL_CACHE_TTL = float(os.environ.get('SPELL_CACHE_TTL', '0'))
+# 맞춤법 검사 워커 프로세스 수(0이면 연결 스레드에서 직접 실행)와 최대 대기 작업 수
+SPELL_WORKERS = int(os.environ.get('SPELL_WORKERS', '0'))
+SPELL_QUEUE_DEPTH = int(os.environ.get('SPELL_QUEUE_DEPTH', '64'))
+# 맞춤법 검사 입장 제어 (넘으면 기다리게 하지 않고 바로 SPELL_BUSY로 거절합니다)
+# - 서버 전체에서 동시에 실행하는 검사 수 (0이면 워커 풀을 쓸 때 SPELL_QUEUE_DEPTH, 아니면 4)
+# - 세션별 초당 요청 수와 연속으로 보낼 수 있는 요청 수 (0이면 제한 없음)
+# - 요청 하나의 텍스트 크기(바이트)와 사전에 없는 서로 다른 단어 수 (0이면 제한 없음)
+SPELL_MAX_CONCURRENT = int(os.environ.get('SPELL_MAX_CONCURRENT', '0')) or (SPELL_QUEUE_DEPTH if SPELL_WORKERS else 4)
+SPELL_RATE = float(os.environ.get('SPELL_RATE', '5'))
+SPELL_BURST = int(os.environ.get('SPELL_BURST', '10'))
+SPELL_MAX_TEXT_BYTES = int(os.environ.get('SPELL_MAX_TEXT_BYTES', str(64 * 1024)))
+SPELL_MAX_UNKNOWN_WORDS = int(os.environ.get('SPELL_MAX_UNKNOWN_WORDS', '200'))
+# 맞춤법 검사 요청 ID의 최대 길이 (SPELL_CHECK <request_id> :text)
+MAX_REQUEST_ID_LENGTH = 64
+# 사전 준비 방식. background: 연결을 바로 받고 사전은 백그라운드에서 준비합니다. (그동안 검사는 SPELL_BUSY not_ready)
+# blocking: 사전을 다 준비한 뒤에 연결을 받습니다. 맞춤법 워커/서버 워커 프로세스가 부모의 사전을 fork로 공유하도록
+# SPELL_WORKERS나 CHAT_PROCESSES를 쓰면 기본값입니다.
+SPELL_WARMUP = os.environ.get('SPELL_WARMUP') or ('blocking' if SPELL_WORKERS > 0 or CHAT_PROCESSES > 1 else 'background')
+# SPELL_CHECK_STREAM에서 한 번에 교정해 보내는 단어 수
+SPELL_STREAM_CHUNK_WORDS = int(os.environ.get('SPELL_STREAM_CHUNK_WORDS', '50'))
 
 # --- 전역 변수 ---
 event = Event()
-client_sockets = {}  # { 'id': socket }
-rooms = {}  # { 'room_name': {socket1, socket2, ...} }
-word_set = None
-freq_map = None
-
-def parse_message(msg_str):
-    """프로토콜 메시지 파싱: CMD param1 ... :trailing"""
-    msg_str = msg_str.strip()
-    if ' :' in msg_str:
-        parts, trailing = msg_str.split(' :', 1)
-    else:
-        parts, trailing = msg_str, None
-    tokens = parts.split()
-    command = tokens[0].upper()
-    params = tokens[1:]
-    return command, params, trailing
-
-def get_user_id(cs):
-    """소켓 객체로 사용자 ID 찾기"""
-    for user_id, sock in client_sockets.items():
-        if sock == cs:
-            return user_id
-    return None
-
-def broadcast(message, sender_socket=None):
-    """모든 클라이언트에게 메시지 전송 (특정 소켓 제외 가능)"""
-    for sock in client_sockets.values():
-        if sock != sender_socket:
-            try:
-                sock.send(message.encode())
-            except Exception as e:
-                print(f"[SYSTEM] 브로드캐스트 오류: {e}")
+sessions = SessionRegistry(OUTBOUND_MAX_BYTES, OUTBOUND_OVERFLOW)  # 접속 중인 세션과 채팅방 멤버
+spell_dictionary = None  # SpellDictionary, 다시 로드할 때 통째로 교체됩니다.
+dictionary_lock = Lock()  # 사전 교체/수정 작업을 한 번에 하나씩 실행합니다.
+warmup = WarmupProgress()  # 서버 시작 시 사전 준비 진행 상황
+suggestion_cache = SuggestionCache(SPELL_CACHE_SIZE, SPELL_CACHE_TTL or None)
+spell_pool = None
+spell_executor = None  # 스레드 모드에서 요청 ID가 있는 맞춤법 검사를 연결 스레드 밖에서 실행하는 ThreadPoolExecutor
+spell_admission = SpellAdmission(SPELL_MAX_CONCURRENT, SPELL_RATE, SPELL_BURST,
+                                 SPELL_MAX_TEXT_BYTES, SPELL_MAX_UNKNOWN_WORDS)
+bus = None  # 멀티 프로세스 모드에서 다른 워커와 메시지를 주고받는 BusClient
+log = get_logger('system')
+recv_log = SampledLogger('recv', LOG_RECV_SAMPLE, LOG_RECV_RATE)
+metrics = Metrics()
+profiler = SamplingProfiler(PROFILE_DIR, PROFILE_KEEP)  # PROFILE 명령을 받았을 때만 샘플링 스레드를 띄웁니다.
+protocol.compress_threshold = COMPRESS_THRESHOLD
+if SPELL_CHECKER_LOADED:
+    spell_checker_v2.suggestion_timer = metrics.histogram('get_suggestions').observe
+
+# 지표에 명령별로 기록할 명령어. 그 밖의 명령은 모두 OTHER로 셉니다.
+KNOWN_COMMANDS = frozenset({
+    'LOGIN', 'SPELL_CHECK', 'SPELL_CHECK_BATCH', 'SPELL_CHECK_STREAM', 'QUIZ', 'QUIZ_ANSWER',
+    'P_MSG', 'JOIN_ROOM', 'LEAVE_ROOM', 'ROOM_MSG', 'QUIT', 'STATS', 'PROFILE',
+})
+
+def broadcast_local(message, sender=None):
+    """이 프로세스에 접속한 모든 클라이언트에게 메시지(Message) 전송 (특정 세션 제외 가능)"""
+    for session in sessions.sessions():
+        if session is not sender:
+            session.send(message)
+
+def broadcast(message, sender=None):
+    """모든 클라이언트에게 메시지 전송. 멀티 프로세스 모드에서는 다른 워커의 클라이언트에게도 보냅니다."""
+    broadcast_local(message, sender)
+    if bus:
+        bus.send({'type': 'broadcast', 'data': message.to_fields()})
 
-def update_user_list():
-    """모든 클라이언트에게 현재 사용자 목록 브로드캐스트"""
-    user_list = ",".join(client_sockets.keys())
-    broadcast(f"USER_LIST :{user_list}\n")
+def send_to_room(room_name, message, sender=None):
+    """채팅방 멤버에게 메시지 전송. 멀티 프로세스 모드에서는 다른 워커의 멤버에게도 보냅니다."""
+    for member in sessions.room_members(room_name):
+        if member is not sender:
+            member.send(message)
+    if bus:
+        bus.send({'type': 'room', 'room': room_name, 'data': message.to_fields()})
+
+# 접속/퇴장 알림은 워커마다 자기 클라이언트에게만 보냅니다. (다른 워커의 변화는 버스의 join/leave로 받습니다)
+presence = PresenceNotifier(broadcast_local, PRESENCE_WINDOW)
+
+def send_user_list(session, user_ids=None):
+    """방금 로그인한 클라이언트에게 현재 사용자 목록 전체를 보냅니다. 이후 변화는 presence가 알립니다."""
+    user_list = ",".join(sessions.user_ids() if user_ids is None else user_ids)
+    session.send(Message('USER_LIST', trailing=user_list))
 
 def run_spell_check_on_server(text):
     """서버에서 맞춤법 검사를 실행하고, 수정 제안 메시지를 반환합니다."""
-    if not SPELL_CHECKER_LOADED or not word_set or not freq_map:
+    # 검사 도중 사전이 교체되더라도 이 검사는 시작할 때의 사전으로 끝까지 실행됩니다.
+    dictionary = spell_dictionary
+    if not SPELL_CHECKER_LOADED or not dictionary:
         return text # 검사기 비활성화 시 원문 반환
 
-    # re.sub와 콜백 함수를 사용하여 한 번에 모든 단어를 검사하고 수정합니다.
-    def replace_word(match):
-        original_word = match.group(0)
-        # 단어의 소문자 버전이 사전에 있는지 확인합니다.
-        if original_word.lower() in word_set:
-            return original_word # 올바른 단어이므로 그대로 반환합니다.
-
-        # 철자가 틀린 단어이므로, 제안을 받습니다.
-        suggestions = get_suggestions(original_word.lower(), word_set, freq_map, limit=1)
-        if not suggestions:
-            return original_word # 제안이 없으면 그대로 반환합니다.
-
-        suggestion = suggestions[0]
-
-        # 원래 대소문자를 보존합니다.
-        if original_word.isupper():
-            return suggestion.upper()
-        if original_word.istitle():
-            return suggestion.title()
-        
-        # 일반적인 단어는 소문자로 반환합니다.
-        return suggestion.lower()
+    # 사전에 없는 단어만 (캐시된) 추천 단어로 바꾸고, 원래 대소문자를 보존합니다.
+    start = time.perf_counter()
+    corrected_text = dictionary.correct_text(text, cache=suggestion_cache)
+    metrics.observe('spell_check', time.perf_counter() - start)
+    return corrected_text
+
+def run_batch_spell_check_on_server(texts):
+    """여러 텍스트를 한 번에 검사합니다. 배치 전체에서 같은 오타는 한 번만 추천을 계산합니다."""
+    dictionary = spell_dictionary
+    if not SPELL_CHECKER_LOADED or not dictionary:
+        return list(texts)
+    start = time.perf_counter()
+    corrected_texts = dictionary.correct_texts(texts, cache=suggestion_cache)
+    metrics.observe('spell_check_batch', time.perf_counter() - start)
+    return corrected_texts
 
-    # 정규식을 사용하여 텍스트의 모든 단어에 대해 replace_word 콜백을 실행합니다.
-    return re.sub(r'[a-zA-Z]+', replace_word, text)
+def submit_spell_job(texts, callback):
+    """워커 풀에 맞춤법 검사를 보냅니다. 결과가 돌아올 때까지 걸린 시간을 spell_pool 지표로 기록합니다."""
+    start = time.perf_counter()
+
+    def on_done(results):
+        metrics.observe('spell_pool', time.perf_counter() - start)
+        callback(results)
+
+    spell_pool.submit(texts, on_done)
+
+def iter_spell_check_on_server(text):
+    """긴 텍스트를 조각 단위로 교정하여 차례로 내보냅니다."""
+    dictionary = spell_dictionary
+    if not SPELL_CHECKER_LOADED or not dictionary:
+        yield text
+        return
+    yield from dictionary.iter_corrected_chunks(text, SPELL_STREAM_CHUNK_WORDS, cache=suggestion_cache)
 
 # --- Command Handlers ---
 
-def handle_login(cs, params):
+def register_login(session, user_id, user_ids=None):
+    """세션을 로그인 상태로 등록하고 로그인 성공 메시지와 접속자 목록을 보냅니다."""
+    if not sessions.login(session, user_id):
+        return False
+    session.send(Message('LOGIN_SUCCESS', trailing="서버에 성공적으로 접속했습니다."))
+    send_user_list(session, user_ids)
+    return True
+
+def login_user_id(session, params):
+    """LOGIN으로 로그인할 ID. 빈 ID이거나 이미 로그인한 세션이면 None."""
     user_id = params[0]
-    if user_id in client_sockets or not user_id:
-        cs.send("LOGIN_FAIL :이미 사용 중이거나 잘못된 ID입니다.\n".encode())
+    if session.user_id is None and BINARY_PROTOCOL and params[1:2] == [str(PROTOCOL_BINARY)]:
+        # 클라이언트가 바이너리 프레임을 제안했으면 로그인 응답부터 프레임으로 보냅니다.
+        # (다른 연결이 이 세션으로 메시지를 보내기 전, 즉 로그인 등록 전에 바꿔야 순서가 섞이지 않습니다)
+        session.binary = True
+    if not user_id or session.user_id is not None:
+        return None
+    return user_id
+
+def finish_login(session, user_id, logged_in):
+    """로그인 결과를 처리합니다. 실패했으면 LOGIN_FAIL을 보내고 False를 반환합니다. (연결을 닫아야 함)"""
+    if not logged_in:
+        session.send(Message('LOGIN_FAIL', trailing="이미 사용 중이거나 잘못된 ID입니다."))
         return False
     
-    client_sockets[user_id] = cs
-    print(f"[SYSTEM] 로그인: {user_id}님이 접속했습니다.")
-    cs.send("LOGIN_SUCCESS :서버에 성공적으로 접속했습니다.\n".encode())
-    update_user_list()
+    log.info("로그인: %s님이 접속했습니다.", user_id)
+    presence.joined(user_id, session)
     return True
 
-def handle_spell_check(cs, trailing):
-    corrected_text = run_spell_check_on_server(trailing)
-    cs.send(f"SPELL_RESULT :{corrected_text}\n".encode())
+def handle_login(session, params):
+    user_id = login_user_id(session, params)
+    if user_id is None:
+        logged_in = False
+    elif bus:
+        # 다른 워커에 같은 ID가 접속해 있을 수 있으므로 허브에서 먼저 ID를 선점합니다.
+        # (asyncio 모드에서는 이벤트 루프를 막지 않도록 AsyncClientConnection이 응답을 기다리지 않고 처리합니다)
+        logged_in = bus.claim(user_id, lambda user_ids: register_login(session, user_id, user_ids))
+    else:
+        logged_in = register_login(session, user_id)
+    return finish_login(session, user_id, logged_in)
+
+def spell_result_message(command, request_id, corrected_texts):
+    """SPELL_CHECK/SPELL_CHECK_BATCH 결과 메시지. 요청 ID가 있으면 첫 번째 인자로 돌려줍니다."""
+    params = () if request_id is None else (request_id,)
+    if command == 'SPELL_CHECK':
+        return Message('SPELL_RESULT', *params, trailing=corrected_texts[0])
+    return Message('SPELL_RESULT_BATCH', *params, trailing=json.dumps(corrected_texts, ensure_ascii=False))
 
-def handle_quiz(cs, trailing):
-    sender_id = get_user_id(cs)
-    broadcast(f"MSG_RECV 퀴즈-{sender_id} :{trailing}\n", sender_socket=cs)
+def handle_spell_check(session, request_id, texts):
+    corrected_text = run_spell_check_on_server(texts[0])
+    session.send(spell_result_message('SPELL_CHECK', request_id, [corrected_text]))
 
-def handle_quiz_answer(cs, trailing):
-    sender_id = get_user_id(cs)
-    broadcast(f"MSG_RECV 퀴즈정답-{sender_id} :{trailing}\n", sender_socket=cs)
+def handle_spell_check_batch(session, request_id, texts):
+    corrected_texts = run_batch_spell_check_on_server(texts)
+    session.send(spell_result_message('SPELL_CHECK_BATCH', request_id, corrected_texts))
+
+def handle_spell_check_stream(session, request_id, texts):
+    params = () if request_id is None else (request_id,)
+    # 조각이 교정되는 대로 바로 보내므로 첫 결과까지의 시간이 텍스트 길이와 무관합니다.
+    for chunk in iter_spell_check_on_server(texts[0]):
+        session.send(Message('SPELL_RESULT_PART', *params, trailing=chunk))
+    session.send(Message('SPELL_RESULT_END', *params))
+
+# 맞춤법 검사 명령은 입장 제어를 거친 뒤 실행합니다. (asyncio 모드에서는 이벤트 루프 밖의 실행기에서 처리합니다)
+SPELL_HANDLERS = {
+    'SPELL_CHECK': handle_spell_check,
+    'SPELL_CHECK_BATCH': handle_spell_check_batch,
+    'SPELL_CHECK_STREAM': handle_spell_check_stream,
+}
+
+def spell_request_texts(command, trailing):
+    """맞춤법 검사 요청의 텍스트 목록. SPELL_CHECK_BATCH가 문자열의 JSON 배열이 아니면 ValueError."""
+    if command != 'SPELL_CHECK_BATCH':
+        return [trailing or '']
+    texts = json.loads(trailing or '')
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        raise ValueError
+    return texts
+
+def admit_spell_request(session, command, request_id, trailing):
+    """
+    맞춤법 검사 요청을 받아들일지 정합니다. 받아들이면 텍스트 목록을 반환하고 (실행이 끝나면 자리를 반납해야 함),
+    아니면 오류 또는 SPELL_BUSY를 바로 보내고 None을 반환합니다.
+    """
+    if request_id is not None and len(request_id) > MAX_REQUEST_ID_LENGTH:
+        session.send(Message('MSG_RECV', '[SYSTEM]', trailing=f"요청 ID는 {MAX_REQUEST_ID_LENGTH}자를 넘을 수 없습니다."))
+        return None
+    try:
+        texts = spell_request_texts(command, trailing)
+    except ValueError:
+        session.send(Message('MSG_RECV', '[SYSTEM]', trailing="SPELL_CHECK_BATCH에는 문자열의 JSON 배열이 필요합니다."))
+        return None
+    try:
+        if not warmup.finished:
+            raise SpellRejected('not_ready', warmup.describe())
+        spell_admission.admit(session, texts, spell_dictionary)
+    except SpellRejected as e:
+        metrics.incr(f'spell_rejected.{e.reason}')
+        params = (e.reason,) if request_id is None else (e.reason, request_id)
+        session.send(Message('SPELL_BUSY', *params, trailing=str(e)))
+        return None
+    return texts
+
+def uses_spell_pool(command):
+    """워커 풀로 보내는 명령인지 여부. (스트리밍 검사는 조각마다 보내야 하므로 직접 실행합니다)"""
+    return spell_pool is not None and command != 'SPELL_CHECK_STREAM'
+
+def run_spell_request(session, command, request_id, texts, done=None):
+    """
+    받아들인 맞춤법 검사 요청을 실행합니다. 워커 풀을 쓰면 보내기만 하고 바로 돌아갑니다.
+    결과를 모두 보내면 자리를 반납하고 done()을 호출합니다. (워커 풀이면 결과 처리 스레드에서)
+    """
+    if uses_spell_pool(command):
+        def on_done(results):
+            spell_admission.release()
+            session.send(spell_result_message(command, request_id, results or texts))  # 워커 오류 시 원문
+            if done:
+                done()
 
-def handle_private_message(cs, params, trailing):
-    sender_id = get_user_id(cs)
-    target_id = params[0]
-    target_socket = client_sockets.get(target_id)
-    if target_socket:
         try:
-            target_socket.send(f"MSG_RECV 1:1-{sender_id} :{trailing}\n".encode())
-        except Exception as e:
-            print(f"[SYSTEM] 1:1 메시지 전송 실패: {e}")
+            submit_spell_job(texts, on_done)
+        except Exception:
+            # 풀이 이미 닫힘 (서버 종료 중)
+            spell_admission.release()
+            if done:
+                done()
+            raise
+        return
+    try:
+        SPELL_HANDLERS[command](session, request_id, texts)
+    finally:
+        spell_admission.release()
+        if done:
+            done()
+
+def log_spell_error(future):
+    if not future.cancelled() and future.exception():
+        log.error("맞춤법 검사 오류: %s", future.exception())
+
+def handle_spell_request(session, command, params, trailing):
+    request_id = params[0] if params else None
+    texts = admit_spell_request(session, command, request_id, trailing)
+    if texts is None:
+        return
+    if request_id is None:
+        # 요청 ID가 없으면 결과를 요청 순서대로 보내야 하므로, 워커 풀에 보냈더라도 결과가 나갈 때까지 다음 요청을 읽지 않습니다.
+        finished = Event()
+        run_spell_request(session, command, None, texts, finished.set)
+        finished.wait()
+    elif uses_spell_pool(command):
+        run_spell_request(session, command, request_id, texts)
+    else:
+        # 요청 ID가 있으면 끝나는 순서대로 보내도 되므로, 연결 스레드는 기다리지 않고 다음 요청을 읽습니다.
+        spell_executor.submit(run_spell_request, session, command, request_id, texts).add_done_callback(log_spell_error)
+
+def handle_quiz(session, trailing):
+    broadcast(Message('MSG_RECV', f"퀴즈-{session.user_id}", trailing=trailing), sender=session)
+
+def handle_quiz_answer(session, trailing):
+    broadcast(Message('MSG_RECV', f"퀴즈정답-{session.user_id}", trailing=trailing), sender=session)
+
+def handle_private_message(session, params, trailing):
+    target_id = params[0]
+    target = sessions.find(target_id)
+    message = Message('MSG_RECV', f"1:1-{session.user_id}", trailing=trailing)
+    if target:
+        target.send(message)
+    elif bus and bus.has_user(target_id):
+        bus.send({'type': 'user', 'to': target_id, 'data': message.to_fields()})
     else:
-        cs.send(f"MSG_RECV [SYSTEM] :{target_id}님을 찾을 수 없습니다.\n".encode())
+        session.send(Message('MSG_RECV', '[SYSTEM]', trailing=f"{target_id}님을 찾을 수 없습니다."))
 
-def handle_join_room(cs, params):
-    sender_id = get_user_id(cs)
+def handle_join_room(session, params):
     room_name = params[0]
-    if room_name not in rooms:
-        rooms[room_name] = set()
-    rooms[room_name].add(cs)
     
     # 방에 있는 다른 사람들에게 입장 알림
-    for client_socket in rooms[room_name]:
-        if client_socket != cs:
-            try:
-                client_socket.send(f"ROOM_MSG_RECV {room_name} [SYSTEM] :{sender_id}님이 입장했습니다.\n".encode())
-            except Exception as e:
-                print(f"[SYSTEM] 채팅방 입장 알림 오류: {e}")
+    sessions.join(session, room_name)
+    send_to_room(room_name, Message('ROOM_MSG_RECV', room_name, '[SYSTEM]', trailing=f"{session.user_id}님이 입장했습니다."),
+                 sender=session)
 
-    cs.send(f"JOIN_SUCCESS {room_name} :' {room_name}' 채팅방에 입장했습니다.\n".encode())
+    session.send(Message('JOIN_SUCCESS', room_name, trailing=f"' {room_name}' 채팅방에 입장했습니다."))
 
-def handle_leave_room(cs, params):
-    sender_id = get_user_id(cs)
+def handle_leave_room(session, params):
     room_name = params[0]
-    if room_name in rooms and cs in rooms[room_name]:
-        rooms[room_name].remove(cs)
+    if sessions.leave(session, room_name):
         # 방에 남아있는 사람들에게 퇴장 알림
-        for client_socket in rooms[room_name]:
-            try:
-                client_socket.send(f"ROOM_MSG_RECV {room_name} [SYSTEM] :{sender_id}님이 퇴장했습니다.\n".encode())
-            except Exception as e:
-                print(f"[SYSTEM] 채팅방 퇴장 알림 오류: {e}")
+        send_to_room(room_name, Message('ROOM_MSG_RECV', room_name, '[SYSTEM]', trailing=f"{session.user_id}님이 퇴장했습니다."))
 
-def handle_room_message(cs, params, trailing):
-    sender_id = get_user_id(cs)
+def handle_room_message(session, params, trailing):
     room_name = params[0]
-    if room_name in rooms and cs in rooms[room_name]:
-        for client_socket in rooms[room_name]:
-            if client_socket != cs:
-                try:
-                    client_socket.send(f"ROOM_MSG_RECV {room_name} {sender_id} :{trailing}\n".encode())
-                except Exception as e:
-                    print(f"[SYSTEM] 채팅방 메시지 전송 오류: {e}")
+    if room_name in session.rooms:
+        send_to_room(room_name, Message('ROOM_MSG_RECV', room_name, session.user_id, trailing=trailing), sender=session)
 
 # --- Main Communication Logic ---
 
-def handle_message(cs, msg):
-    """클라이언트로부터 받은 메시지를 처리"""
-    command, params, trailing = parse_message(msg)
-    
+def collect_stats():
+    """STATS 명령과 지표 파일에 쓰는 현재 지표. 멀티 프로세스 모드에서는 이 워커의 지표입니다."""
+    stats = metrics.snapshot()
+    outbound = [len(session.outbox) for session in sessions.sessions()]
+    stats.update({
+        'pid': os.getpid(),
+        'mode': CHAT_SERVER_MODE,
+        'sessions': len(sessions),
+        'connections': len(sessions.connections()),
+        'remote_users': len(bus.remote_users) if bus else 0,
+        'rooms': sessions.room_sizes(),
+        'outbound_queued_bytes': sum(outbound),
+        'outbound_max_queued_bytes': max(outbound, default=0),
+        'spell_pool_pending': spell_pool.pending if spell_pool else 0,
+        'spell_active': spell_admission.active,
+        'spell_warmup': warmup.snapshot(),
+        'suggestion_cache': suggestion_cache.stats(),
+        'log_dropped': dropped_records(),
+    })
+    return stats
+
+def stats_dump_thread(path):
+    """STATS_INTERVAL초마다 지표를 path에 JSON 한 줄로 덧붙입니다."""
+    while not event.wait(STATS_INTERVAL):
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(collect_stats(), ensure_ascii=False) + '\n')
+        except OSError as e:
+            log.error("지표 파일 기록 실패: %s", e)
+
+def start_stats_dump(path):
+    if path:
+        Thread(target=stats_dump_thread, args=(path,), daemon=True).start()
+
+def check_admin(session):
+    """관리자가 아니면 안내를 보내고 False를 반환합니다."""
+    if session.user_id in ADMIN_IDS:
+        return True
+    session.send(Message('MSG_RECV', '[SYSTEM]', trailing="관리자만 사용할 수 있는 명령입니다."))
+    return False
+
+def handle_stats(session):
+    if not check_admin(session):
+        return
+    session.send(Message('STATS_RESULT', trailing=json.dumps(collect_stats(), ensure_ascii=False)))
+
+def handle_profile(session, params):
+    """
+    PROFILE [초] [mem]: 이 서버 프로세스의 모든 스레드를 정해진 시간 동안 샘플링 프로파일링합니다.
+    mem이면 메모리 할당도 추적합니다. 끝나면 결과 파일 경로와 상위 함수를 PROFILE_RESULT로 보냅니다.
+    """
+    if not check_admin(session):
+        return
+    if not PROFILE_ENABLED:
+        session.send(Message('MSG_RECV', '[SYSTEM]', trailing="프로파일링이 꺼져 있습니다. (서버 설정 CHAT_PROFILE=1)"))
+        return
+    durations = [param for param in params if param.lower() != 'mem']
+    trace_memory = len(durations) < len(params)
+    max_seconds = MAX_PROFILE_MEMORY_SECONDS if trace_memory else MAX_PROFILE_SECONDS
+    try:
+        seconds = float(durations[0]) if durations else DEFAULT_PROFILE_SECONDS
+    except ValueError:
+        seconds = 0
+    if len(durations) > 1 or not 0 < seconds <= max_seconds:
+        session.send(Message('MSG_RECV', '[SYSTEM]', trailing=f"사용법: PROFILE [초 (최대 {MAX_PROFILE_SECONDS}, "
+                                                              f"mem이면 {MAX_PROFILE_MEMORY_SECONDS})] [mem]"))
+        return
+
+    def finished(result):
+        session.send(Message('PROFILE_RESULT', trailing=json.dumps(result, ensure_ascii=False)))
+
+    try:
+        profiler.start(seconds, trace_memory, finished)
+    except ProfilerBusy as e:
+        session.send(Message('MSG_RECV', '[SYSTEM]', trailing=str(e)))
+        return
+    session.send(Message('MSG_RECV', '[SYSTEM]', trailing=f"{seconds:g}초 동안 프로파일링합니다."
+                         + (" (메모리 할당 추적 포함)" if trace_memory else "")))
+
+def observe_command(command, seconds):
+    """명령 처리 시간을 command.<명령> 지표로 기록합니다. (횟수는 히스토그램의 count)"""
+    metrics.observe(f"command.{command if command in KNOWN_COMMANDS else 'OTHER'}", seconds)
+
+def run_timed_command(command, handler, *args):
+    """handler를 실행하고 처리 시간을 기록합니다. asyncio 모드에서 실행기로 넘긴 명령에 사용합니다."""
+    start = time.perf_counter()
+    try:
+        return handler(*args)
+    finally:
+        observe_command(command, time.perf_counter() - start)
+
+def handle_message(session, command, params, trailing, raw=None):
+    """
+    클라이언트로부터 받은 메시지를 처리하고 처리 시간을 기록합니다.
+    raw는 받은 텍스트 줄이며, 바이너리 프레임으로 받았으면 None입니다. (로그에만 사용)
+    """
+    start = time.perf_counter()
+    try:
+        return dispatch_message(session, command, params, trailing, raw)
+    finally:
+        observe_command(command, time.perf_counter() - start)
+
+def log_received(session, command, params, trailing, raw):
+    if raw is None:
+        raw = Message(command, *params, trailing=trailing)  # 로그를 남길 때만 텍스트로 바뀝니다.
+    recv_log.info("%s: %s", session.user_id, raw, fields={'user': session.user_id, 'command': command})
+
+def dispatch_message(session, command, params, trailing, raw):
     if command == 'LOGIN':
-        return handle_login(cs, params)
+        return handle_login(session, params)
 
     # --- 로그인 이후 명령어 ---
-    sender_id = get_user_id(cs)
+    sender_id = session.user_id
     if not sender_id:
-        print("[SYSTEM] 비로그인 사용자로부터 메시지 수신, 무시함")
+        log.info("비로그인 사용자로부터 메시지 수신, 무시함")
         return False
         
-    print(f"[RECV] {sender_id}: {msg.strip()}")
+    log_received(session, command, params, trailing, raw)
 
-    if command == 'SPELL_CHECK':
-        handle_spell_check(cs, trailing)
+    if command in SPELL_HANDLERS:
+        handle_spell_request(session, command, params, trailing)
     elif command == 'QUIZ':
-        handle_quiz(cs, trailing)
+        handle_quiz(session, trailing)
     elif command == 'QUIZ_ANSWER':
-        handle_quiz_answer(cs, trailing)
+        handle_quiz_answer(session, trailing)
     elif command == 'P_MSG':
-        handle_private_message(cs, params, trailing)
+        handle_private_message(session, params, trailing)
     elif command == 'JOIN_ROOM':
-        handle_join_room(cs, params)
+        handle_join_room(session, params)
     elif command == 'LEAVE_ROOM':
-        handle_leave_room(cs, params)
+        handle_leave_room(session, params)
     elif command == 'ROOM_MSG':
-        handle_room_message(cs, params, trailing)
+        handle_room_message(session, params, trailing)
+    elif command == 'STATS':
+        handle_stats(session)
+    elif command == 'PROFILE':
+        handle_profile(session, params)
     elif command == 'QUIT':
         return False
     
     return True
 
+def disconnect_client(cs):
+    """연결이 끊긴 클라이언트를 사용자 목록과 입장해 있던 채팅방에서 제거합니다."""
+    session = sessions.remove(cs)
+    if session:
+        metrics.incr('connections_closed')
+    if session and session.user_id:
+        log.info("연결 종료: %s (%s)", session.user_id, session.addr)
+        presence.left(session.user_id)
+        if bus:
+            bus.send({'type': 'leave', 'user': session.user_id})
+
+def handle_bus_message(message):
+    """다른 워커에서 버스로 전달된 메시지를 이 프로세스의 클라이언트에게 보냅니다."""
+    kind = message['type']
+    if kind == 'join':
+        presence.joined(message['user'])
+    elif kind == 'leave':
+        presence.left(message['user'])
+    elif kind == 'user':
+        target = sessions.find(message['to'])
+        if target:
+            target.send(Message.from_fields(message['data']))
+    elif kind == 'broadcast':
+        broadcast_local(Message.from_fields(message['data']))
+    elif kind == 'room':
+        data = Message.from_fields(message['data'])
+        for member in sessions.room_members(message['room']):
+            member.send(data)
+    elif kind == 'console':
+        handle_console_command(message['cmd'])
+    elif kind == 'shutdown':
+        event.set()
+
+def client_writer_thread(session):
+    """세션의 송신 큐를 비우는 스레드. 그동안 쌓인 메시지를 한 번의 sendall로 묶어 보냅니다."""
+    while True:
+        data = session.outbox.get()
+        if not data:
+            break
+        try:
+            session.sock.sendall(data)
+        except OSError:
+            break
+        metrics.incr('bytes_out', len(data))
+    session.outbox.close()
+
 def client_communication_thread(cs, addr):
     """개별 클라이언트와의 통신을 처리하는 스레드"""
-    print(f"[SYSTEM] 연결 수락: {addr} 에서 새로운 클라이언트가 연결되었습니다.")
+    log.info("연결 수락: %s 에서 새로운 클라이언트가 연결되었습니다.", addr)
+    metrics.incr('connections_accepted')
     
+    session = sessions.add(cs, addr)
+    # 받는 쪽이 느려도 이 연결의 읽기와 다른 연결로의 전송이 멈추지 않도록 쓰기는 별도 스레드가 맡습니다.
+    writer = Thread(target=client_writer_thread, args=(session,), daemon=True)
+    writer.start()
     is_running = True
+    reader = MessageReader(MAX_LINE_BYTES)
     try:
+        # 받은 메시지를 모두 처리한 뒤에야 다음 데이터를 읽으므로, 처리가 밀리면 읽기도 멈춥니다.
         while is_running and not event.is_set():
-            msg = cs.recv(BUFSIZE).decode()
-            if not msg:
+            nbytes = reader.recv_from(cs)
+            if not nbytes:
                 break
-            for line in msg.strip().split('\n'):
-                if line:
-                    is_running = handle_message(cs, line)
-                    if not is_running:
-                        break
+            metrics.incr('bytes_in', nbytes)
+            while is_running and (message := reader.next_message()) is not None:
+                is_running = handle_message(session, *message)
+                if session.binary:
+                    reader.switch_to_binary()
+    except LineTooLongError as e:
+        log.warning("%s: %s", addr, e)
+        session.send(Message('MSG_RECV', '[SYSTEM]', trailing=str(e)))
     except Exception:
         pass # 클라이언트 강제 종료 등
     
     # --- 스레드 종료 처리 ---
-    disconnected_user = get_user_id(cs)
-    if disconnected_user:
-        print(f"[SYSTEM] 연결 종료: {disconnected_user} ({addr})")
-        
-        # 모든 채팅방에서 해당 유저 제거
-        for room in rooms.values():
-            room.discard(cs)
-
-        del client_sockets[disconnected_user]
-        update_user_list()
-
+    disconnect_client(cs)
+    session.outbox.close()
+    writer.join(5)  # 남은 메시지를 보낼 시간을 줍니다.
     cs.close()
 
 def accept_thread(server_socket):
@@ -245,48 +637,557 @@ def accept_thread(server_socket):
             thread.start()
         except Exception:
             break
-    print("[SYSTEM] Accept thread 종료.")
+    log.info("Accept thread 종료.")
 
-def main():
-    global word_set, freq_map
-    # --- 맞춤법 검사기 초기화 ---
-    if SPELL_CHECKER_LOADED:
-        print("[SYSTEM] 맞춤법 검사 사전을 로드하는 중...")
-        # chat/ 디렉토리 기준으로 경로 설정
-        word_set = load_words('spell_checker/words.txt')
-        freq_map = load_frequency_map('spell_checker/en_full.txt')
-        if not word_set or not freq_map:
-            print("[SYSTEM] 경고: 사전 파일 로드에 실패했습니다. 맞춤법 검사 기능이 비활성화됩니다.")
+# --- asyncio 서버 ---
+
+class AsyncClientConnection(asyncio.BufferedProtocol):
+    """
+    asyncio 모드의 클라이언트 연결 하나. 세션에 소켓 대신 저장되며
+    세션의 송신 큐는 이벤트 루프가 비우며, 한 번의 루프 반복 동안 쌓인 메시지를 transport 쓰기 한 번으로 보냅니다.
+    연결마다 스레드나 태스크를 만들지 않으므로 대기 중인 연결은 버퍼 몇 개만 차지합니다.
+    """
+
+    def __init__(self, connections, executor):
+        self.connections = connections
+        self.executor = executor
+        self.transport = None
+        self.addr = None
+        self.session = None
+        self.loop = None
+        self._loop_thread = None
+        self._reader = MessageReader(MAX_LINE_BYTES)
+        self._reading_paused = False
+        self._writing_paused = False
+        self._flush_scheduled = False
+        self._spell_jobs = deque()  # 요청 ID가 없는 맞춤법 검사는 요청 순서대로 하나씩 실행합니다.
+        self._spell_ordered_running = False
+        self._spell_in_flight = 0  # 실행 중인 검사 수 (요청 ID가 있는 검사는 동시에 여러 개 실행됩니다)
+        self._login = None  # 버스 응답을 기다리는 로그인 (claim 번호, 사용자 ID, 시작 시각, 시간 초과 타이머)
+        self._lost = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.addr = transport.get_extra_info('peername')
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread = get_ident()
+        self.connections.add(self)
+        self.session = sessions.add(self, self.addr, on_ready=self._schedule_flush)
+        log.info("연결 수락: %s 에서 새로운 클라이언트가 연결되었습니다.", self.addr)
+        metrics.incr('connections_accepted')
+
+    def get_buffer(self, sizehint):
+        # 소켓이 수신 버퍼의 빈 공간에 바로 기록합니다.
+        return self._reader.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes):
+        self._reader.buffer_updated(nbytes)
+        metrics.incr('bytes_in', nbytes)
+        self._process_messages()
+
+    def _process_messages(self):
+        """
+        버퍼에 쌓인 메시지를 처리합니다. 맞춤법 검사가 밀려 있거나 로그인 응답을 기다리는 중이면
+        남은 메시지는 두고 읽기를 멈춥니다.
+        """
+        try:
+            while not self.transport.is_closing():
+                if self._login is not None or len(self._spell_jobs) + self._spell_in_flight >= MAX_PENDING_SPELL_JOBS:
+                    if not self._reading_paused:
+                        self.transport.pause_reading()
+                        self._reading_paused = True
+                    return
+                message = self._reader.next_message()
+                if message is None:
+                    break
+                if not self.message_received(*message):
+                    self._close_after_flush()
+                if self.session.binary:
+                    self._reader.switch_to_binary()
+        except LineTooLongError as e:
+            log.warning("%s: %s", self.addr, e)
+            self.session.send(Message('MSG_RECV', '[SYSTEM]', trailing=str(e)))
+            self._close_after_flush()
+            return
+        if self._reading_paused and not self.transport.is_closing():
+            self.transport.resume_reading()
+            self._reading_paused = False
+
+    def message_received(self, command, params, trailing, raw):
+        if command == 'LOGIN' and bus:
+            return self._start_login(params)
+        # 맞춤법 검사 명령은 CPU를 오래 쓰므로 이벤트 루프 밖(실행기)에서 처리합니다.
+        if command not in SPELL_HANDLERS:
+            return handle_message(self.session, command, params, trailing, raw)
+        if not self.session.user_id:
+            log.info("비로그인 사용자로부터 메시지 수신, 무시함")
+            return False
+        log_received(self.session, command, params, trailing, raw)
+        # 입장 제어는 대기열에 넣기 전에 이벤트 루프에서 합니다. (거절하면 SPELL_BUSY가 바로 나갑니다)
+        request_id = params[0] if params else None
+        texts = admit_spell_request(self.session, command, request_id, trailing)
+        if texts is None:
+            return True
+        if request_id is not None:
+            # 요청 ID가 있으면 끝나는 순서대로 보내도 되므로 앞선 검사를 기다리지 않고 바로 실행합니다.
+            self._start_spell(command, request_id, texts, self._spell_finished)
+            return True
+        self._spell_jobs.append((command, texts))
+        if not self._spell_ordered_running:
+            self._run_next_spell()
+        return True
+
+    def _start_login(self, params):
+        """
+        허브에 ID 선점을 요청하고 응답은 기다리지 않습니다. 응답이 오면 루프에서 _login_finished()로 로그인을 마치며,
+        그때까지 이 연결의 다음 메시지는 읽지 않습니다. (다른 연결은 그동안에도 처리됩니다)
+        """
+        start = time.perf_counter()
+        user_id = login_user_id(self.session, params)
+        if user_id is None:
+            observe_command('LOGIN', time.perf_counter() - start)
+            return finish_login(self.session, user_id, False)
+
+        def done(ok):
+            try:
+                self.loop.call_soon_threadsafe(self._login_finished, ok)
+            except RuntimeError:
+                pass  # 이벤트 루프가 이미 종료됨
+
+        session = self.session
+        seq = bus.start_claim(user_id, lambda user_ids: register_login(session, user_id, user_ids), done)
+        self._login = (seq, user_id, start, self.loop.call_later(CLAIM_TIMEOUT, self._login_timed_out))
+        return True
+
+    def _login_timed_out(self):
+        if self._login is not None and bus.cancel_claim(self._login[0]):
+            self._login_finished(False)
+        # 취소하지 못했으면 수신 스레드가 응답을 처리하는 중이므로 곧 _login_finished()가 호출됩니다.
+
+    def _login_finished(self, logged_in):
+        _, user_id, start, timer = self._login
+        self._login = None
+        timer.cancel()
+        observe_command('LOGIN', time.perf_counter() - start)
+        if self._lost:
+            # 응답을 기다리는 동안 연결이 끊겼습니다. 그 사이에 등록되었으면 여기서 정리합니다.
+            disconnect_client(self)
+            return
+        if not finish_login(self.session, user_id, logged_in):
+            self._close_after_flush()
+            return
+        self._process_messages()
+
+    def _start_spell(self, command, request_id, texts, on_finished):
+        """검사를 실행기에서 실행합니다. 결과를 모두 보내면 (워커 풀이면 결과가 돌아온 뒤) 루프에서 on_finished를 호출합니다."""
+        self._spell_in_flight += 1
+
+        def done():
+            try:
+                self.loop.call_soon_threadsafe(on_finished)
+            except RuntimeError:
+                pass  # 이벤트 루프가 이미 종료됨
+
+        future = self.loop.run_in_executor(self.executor, run_timed_command, command, run_spell_request,
+                                           self.session, command, request_id, texts, done)
+        future.add_done_callback(log_spell_error)
+
+    def _run_next_spell(self):
+        if not self._spell_jobs or self.transport.is_closing():
+            self._spell_ordered_running = False
+            return
+        self._spell_ordered_running = True
+        command, texts = self._spell_jobs.popleft()
+        self._start_spell(command, None, texts, self._ordered_spell_finished)
+
+    def _ordered_spell_finished(self):
+        self._spell_finished()
+        self._run_next_spell()
+
+    def _spell_finished(self):
+        self._spell_in_flight -= 1
+        if self._reading_paused:
+            self._process_messages()
+
+    def connection_lost(self, exc):
+        self.connections.discard(self)
+        for _ in self._spell_jobs:
+            spell_admission.release()  # 실행하지 못한 검사가 차지한 자리
+        self._spell_jobs.clear()
+        self.session.outbox.close()
+        self._lost = True
+        if self._login is None:  # 로그인 응답을 기다리는 중이면 응답을 받은 뒤 정리합니다.
+            disconnect_client(self)
+
+    def _schedule_flush(self):
+        """송신 큐에 메시지가 생겼을 때 호출됩니다. 다른 스레드(실행기, 워커 풀)에서 호출해도 안전합니다."""
+        if get_ident() == self._loop_thread:
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                self.loop.call_soon(self._flush)
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self._flush)
+            except RuntimeError:
+                pass  # 이벤트 루프가 이미 종료됨
+
+    def _flush(self):
+        self._flush_scheduled = False
+        if self._writing_paused or self.transport.is_closing():
+            return
+        data = self.session.outbox.take()
+        if data:
+            self.transport.write(data)
+            metrics.incr('bytes_out', len(data))
+
+    def _close_after_flush(self):
+        data = self.session.outbox.take()
+        if data:
+            self.transport.write(data)
+            metrics.incr('bytes_out', len(data))
+        self.transport.close()
+
+    def pause_writing(self):
+        # transport의 쓰기 버퍼가 가득 차면 송신 큐에 그대로 두어 OUTBOUND_MAX_BYTES 제한을 받게 합니다.
+        self._writing_paused = True
+
+    def resume_writing(self):
+        self._writing_paused = False
+        self._flush()
+
+    def shutdown(self, how):
+        """송신 큐가 넘쳤을 때 호출됩니다. 쌓인 데이터를 버리고 연결을 바로 끊습니다."""
+        if get_ident() == self._loop_thread:
+            self.transport.abort()
         else:
-            print("[SYSTEM] 맞춤법 검사기 로드 완료.")
+            try:
+                self.loop.call_soon_threadsafe(self.transport.abort)
+            except RuntimeError:
+                pass
+
+    def close(self):
+        if get_ident() == self._loop_thread:
+            self.transport.close()
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self.transport.close)
+            except RuntimeError:
+                pass
+
+async def serve_asyncio(server_socket):
+    """이미 bind된 server_socket으로 asyncio 서버를 실행하고, event가 설정되면 모든 연결을 닫습니다."""
+    loop = asyncio.get_running_loop()
+    connections = set()
+    executor = ThreadPoolExecutor(ASYNC_SPELL_THREADS, thread_name_prefix='spell')
+    server = await loop.create_server(lambda: AsyncClientConnection(connections, executor),
+                                      sock=server_socket, backlog=LISTEN_BACKLOG)
+    # 콘솔 스레드가 event를 설정할 때까지 기다립니다.
+    await loop.run_in_executor(None, event.wait)
+    server.close()
+    for connection in list(connections):
+        connection.transport.close()
+    await server.wait_closed()
+    await asyncio.sleep(0)  # connection_lost 콜백이 실행되도록 한 번 양보합니다.
+    executor.shutdown(wait=False, cancel_futures=True)
+    log.info("asyncio 서버 종료.")
+
+def build_index(words, freqs):
+    """SPELL_INDEX 설정에 맞는 추천 단어 인덱스를 생성합니다."""
+    if SPELL_INDEX == 'array':
+        index = build_array_dictionary(words, freqs)
+        if index is not None:
+            log.info("NumPy 배열 사전을 사용합니다.")
+            return index
+        log.warning("경고: NumPy를 찾을 수 없어 삭제 인덱스를 대신 사용합니다.")
+    elif SPELL_INDEX == 'none':
+        return None
+    prebuilt = getattr(words, 'suggestion_index', None)
+    if prebuilt is not None:
+        log.info("스냅샷에 저장된 추천 단어 인덱스를 사용합니다.")
+        return prebuilt
+    log.info("추천 단어 인덱스를 생성하는 중...")
+    return build_suggestion_index(words, freqs)
+
+def spell_dictionary_source():
+    """load_spell_dictionary가 읽을 사전 파일 (로그용)"""
+    if SPELL_INDEX == 'dawg' and os.path.exists(SPELL_DAWG):
+        return f"DAWG 사전 {SPELL_DAWG}"
+    if os.path.exists(SPELL_SNAPSHOT):
+        return f"사전 스냅샷 {SPELL_SNAPSHOT}"
+    return "spell_checker/words.txt, spell_checker/en_full.txt"
+
+def load_spell_dictionary(progress=None, fresh=False):
+    """
+    맞춤법 검사 사전을 로드하고 SpellDictionary를 반환합니다. 워커 프로세스에서도 사용합니다.
+    progress: 단계가 바뀔 때마다 단계 이름으로 호출할 함수 (WarmupProgress.begin_stage)
+    fresh: 이미 매핑한 스냅샷도 파일에서 다시 엽니다. (사전 다시 로드)
+    """
+    if not SPELL_CHECKER_LOADED:
+        return None
+    progress = progress or (lambda stage: None)
+    log.info("맞춤법 검사 사전을 로드하는 중...")
+    # chat/ 디렉토리 기준으로 경로 설정
+    if SPELL_INDEX == 'dawg' and os.path.exists(SPELL_DAWG):
+        log.info("DAWG 사전 '%s'을(를) 사용합니다.", SPELL_DAWG)
+        progress('dawg')
+        dawg = DawgDictionary.load(SPELL_DAWG)
+        log.info("맞춤법 검사기 로드 완료.")
+        return SpellDictionary(dawg, dawg, dawg)
+    if os.path.exists(SPELL_SNAPSHOT):
+        log.info("사전 스냅샷 '%s'을(를) 사용합니다.", SPELL_SNAPSHOT)
+        if fresh:
+            open_snapshot(SPELL_SNAPSHOT, fresh=True)
+        progress('words')
+        words = load_words(SPELL_SNAPSHOT)
+        progress('frequencies')
+        freqs = load_frequency_map(SPELL_SNAPSHOT)
+    else:
+        progress('words')
+        words = load_words('spell_checker/words.txt')
+        progress('frequencies')
+        freqs = load_frequency_map('spell_checker/en_full.txt')
+    if not words or not freqs:
+        log.warning("경고: 사전 파일 로드에 실패했습니다. 맞춤법 검사 기능이 비활성화됩니다.")
+        return None
+    if SPELL_INDEX == 'dawg':
+        # 압축 트라이가 단어 집합, 빈도, 추천 인덱스를 모두 대신하므로 원래 set/dict는 버립니다.
+        log.info("DAWG 사전을 생성하는 중...")
+        progress('dawg')
+        dawg = build_dawg_dictionary(words, freqs)
+        log.info("맞춤법 검사기 로드 완료.")
+        return SpellDictionary(dawg, dawg, dawg)
+    progress('index')
+    index = build_index(words, freqs)
+    log.info("맞춤법 검사기 로드 완료.")
+    return SpellDictionary(words, freqs, index)
 
+def start_spell_pool(dictionary):
+    """맞춤법 검사 워커 풀을 시작합니다. 다른 스레드를 시작하기 전에 호출해야 fork가 안전합니다."""
+    global spell_pool
+    if not dictionary or SPELL_WORKERS <= 0:
+        return
+    spell_pool = SpellWorkerPool(SPELL_WORKERS, SPELL_QUEUE_DEPTH, dictionary, load_spell_dictionary)
+    log.info("맞춤법 검사 워커 %d개를 시작했습니다.", SPELL_WORKERS)
+
+def warm_up_spell_dictionary():
+    """서버 시작 시 사전을 로드하고 인덱스를 만든 뒤 사용하기 시작합니다. 진행 상황은 warmup에 기록됩니다."""
+    global spell_dictionary
+    warmup.start()
+    try:
+        dictionary = load_spell_dictionary(warmup.begin_stage)
+    except Exception:
+        log.exception("맞춤법 검사 사전 준비 중 오류")
+        dictionary = None
+    with dictionary_lock:
+        spell_dictionary = dictionary
+        suggestion_cache.invalidate()
+    warmup.finish(dictionary is not None)
+
+def start_warmup():
+    """사전이 아직 준비되지 않았으면 백그라운드 스레드에서 준비를 시작합니다. (연결은 그동안에도 받습니다)"""
+    if warmup.state == 'pending':
+        Thread(target=warm_up_spell_dictionary, name='warmup', daemon=True).start()
+
+def reload_spell_dictionary():
+    """사전을 백그라운드에서 새로 로드한 뒤 한 번에 교체합니다. 진행 중인 검사는 이전 사전으로 끝납니다."""
+    global spell_dictionary
+    if not warmup.finished:
+        log.warning("사전을 처음 준비하는 중이므로 다시 로드하지 않습니다.")
+        return
+    with dictionary_lock:
+        dictionary = load_spell_dictionary(fresh=True)
+        if not dictionary:
+            log.error("사전 다시 로드 실패: 기존 사전을 계속 사용합니다.")
+            return
+        spell_dictionary = dictionary
+        suggestion_cache.invalidate()
+        if spell_pool:
+            # 워커를 새 사전으로 다시 fork해 부모와 함께 쓰게 합니다. (워커마다 사전을 따로 만들지 않습니다)
+            spell_pool.reload(dictionary)
+    log.info("사전을 다시 로드했습니다: %s", spell_dictionary_source())
+
+def update_spell_dictionary(action, word, frequency=None):
+    """단어 추가/삭제, 빈도 변경을 현재 사전과 인덱스에 바로 적용합니다."""
+    with dictionary_lock:
+        dictionary = spell_dictionary
+        if not dictionary:
+            log.warning("맞춤법 검사 사전이 로드되지 않았습니다.")
+            return
+        try:
+            if not dictionary.apply_edit(action, word, frequency):
+                log.warning("사전에 없는 단어입니다: %s", word)
+                return
+        except ValueError as e:
+            log.error("사전 수정 실패: %s", e)
+            return
+        suggestion_cache.invalidate()
+        if spell_pool:
+            spell_pool.record_edit(action, word, frequency)
+    log.info("사전 수정 완료: %s %s", action, word)
+
+CONSOLE_HELP = ("[SYSTEM] 명령어: q(종료) | reload(사전 다시 로드) | add <단어> [빈도] | "
+                "remove <단어> | freq <단어> <빈도>")
+
+def handle_console_command(cmd):
+    """서버 콘솔(관리자) 명령 처리"""
+    tokens = cmd.split()
+    if not tokens:
+        return
+    action = tokens[0].lower()
+    try:
+        if action == 'reload':
+            Thread(target=reload_spell_dictionary, daemon=True).start()
+            log.info("사전을 백그라운드에서 다시 로드합니다...")
+        elif action == 'add' and len(tokens) in (2, 3):
+            update_spell_dictionary('add', tokens[1].lower(), int(tokens[2]) if len(tokens) == 3 else None)
+        elif action == 'remove' and len(tokens) == 2:
+            update_spell_dictionary('remove', tokens[1].lower())
+        elif action == 'freq' and len(tokens) == 3:
+            update_spell_dictionary('freq', tokens[1].lower(), int(tokens[2]))
+        else:
+            print(CONSOLE_HELP)
+    except ValueError:
+        print(CONSOLE_HELP)
+
+def create_server_socket(reuse_port=False):
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        # 여러 워커 프로세스가 같은 포트에 각자 bind하면 커널이 새 연결을 나눠 줍니다.
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
     server_socket.bind(ADDR)
-    server_socket.listen(10)
-    print(f"[SYSTEM] 서버가 {PORT} 포트에서 시작되었습니다.")
+    server_socket.listen(LISTEN_BACKLOG)
+    return server_socket
 
-    accept_th = Thread(target=accept_thread, args=(server_socket,))
-    accept_th.daemon = True
-    accept_th.start()
+def start_server_thread(server_socket):
+    """CHAT_SERVER_MODE에 맞게 연결을 받는 스레드를 시작합니다."""
+    global spell_executor
+    if CHAT_SERVER_MODE == 'asyncio':
+        log.info("asyncio 모드로 실행합니다.")
+        server_th = Thread(target=asyncio.run, args=(serve_asyncio(server_socket),))
+    else:
+        # 동시에 실행되는 검사 수는 입장 제어가 SPELL_MAX_CONCURRENT로 제한하므로 그만큼만 스레드를 둡니다.
+        spell_executor = ThreadPoolExecutor(SPELL_MAX_CONCURRENT, thread_name_prefix='spell')
+        server_th = Thread(target=accept_thread, args=(server_socket,))
+    server_th.daemon = True
+    server_th.start()
+    return server_th
+
+def stop_server(server_socket, server_th):
+    event.set()
+    if CHAT_SERVER_MODE == 'asyncio':
+        server_th.join(5)
+    
+    for sock in sessions.connections():
+        sock.close()
+    
+    server_socket.close()
+    if spell_executor:
+        spell_executor.shutdown(wait=False, cancel_futures=True)
+    if spell_pool:
+        spell_pool.close()
+
+def worker_file(path, worker):
+    """워커별 로그/지표 파일 경로 (chat.log -> chat.1.log). 여러 프로세스가 한 파일에 쓰면 충돌하기 때문입니다."""
+    if not path:
+        return None
+    root, ext = os.path.splitext(path)
+    return f"{root}.{worker}{ext}"
+
+def run_worker_process(worker, bus_socket, server_socket):
+    """
+    멀티 프로세스 모드의 서버 워커. 부모가 로드한 사전을 fork로 물려받아 읽기 전용으로 함께 씁니다.
+    (SPELL_WARMUP=background를 지정하면 부모는 사전을 로드하지 않고 워커마다 연결을 받으면서 따로 준비합니다)
+    """
+    global bus
+    # 부모의 로그 기록 스레드는 fork로 넘어오지 않으므로 워커마다 새로 시작하고, 파일도 워커별로 따로 씁니다.
+    setup_logging(LOG_LEVEL, LOG_CONSOLE, worker_file(LOG_FILE, worker), LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS)
+    start_spell_pool(spell_dictionary)
+    if server_socket is None:
+        server_socket = create_server_socket(reuse_port=True)
+    bus = BusClient(bus_socket, handle_bus_message)
+    bus.start()
+    server_th = start_server_thread(server_socket)
+    start_stats_dump(worker_file(STATS_FILE, worker))
+    log.info("서버 워커 %d (PID %d) 시작.", worker, os.getpid())
+    start_warmup()
+    try:
+        event.wait()  # 부모의 shutdown 메시지를 받거나 버스가 끊기면 설정됩니다.
+    except KeyboardInterrupt:
+        pass
+    stop_server(server_socket, server_th)
+    shutdown_logging()
+
+def start_worker_processes(count):
+    """서버 워커 프로세스들을 fork하고, 워커 사이를 중계하는 BusHub를 반환합니다."""
+    context = multiprocessing.get_context('fork')
+    shared_socket = None
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        # SO_REUSEPORT가 없으면 부모가 만든 소켓 하나를 모든 워커가 물려받아 함께 accept합니다.
+        log.warning("경고: SO_REUSEPORT를 지원하지 않아 하나의 소켓을 공유합니다.")
+        shared_socket = create_server_socket()
+    hub_sockets, processes = [], []
+    for worker in range(count):
+        hub_socket, worker_socket = socket.socketpair()
+        # 워커가 맞춤법 검사 풀을 만들 수 있도록 daemon 프로세스로 만들지 않습니다.
+        process = context.Process(target=run_worker_process, args=(worker, worker_socket, shared_socket))
+        process.start()
+        worker_socket.close()
+        hub_sockets.append(hub_socket)
+        processes.append(process)
+    if shared_socket:
+        shared_socket.close()
+    hub = BusHub(hub_sockets)
+    hub.start()
+    return hub, processes
+
+def main():
+    setup_logging(LOG_LEVEL, LOG_CONSOLE, LOG_FILE, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS)
+    # --- 맞춤법 검사기 초기화 ---
+    if SPELL_WARMUP == 'blocking' or SPELL_WORKERS > 0:
+        # fork하기 전에 사전을 준비해 워커 프로세스들이 copy-on-write로 함께 씁니다.
+        # (맞춤법 워커 풀은 fork 뒤에 사전을 받을 수 없고, 워커가 각자 로드하면 준비되기 전의 검사가 멈춰 기다립니다)
+        if SPELL_WARMUP != 'blocking':
+            log.warning("SPELL_WORKERS를 사용하므로 사전을 다 준비한 뒤에 연결을 받습니다. (SPELL_WARMUP=blocking)")
+        warm_up_spell_dictionary()
+
+    if CHAT_PROCESSES > 1:
+        # 콘솔 입력을 기다리는 스레드가 생기기 전에 워커를 fork합니다.
+        hub, processes = start_worker_processes(CHAT_PROCESSES)
+        log.info("서버가 %d 포트에서 워커 프로세스 %d개로 시작되었습니다.", PORT, CHAT_PROCESSES)
+    else:
+        # 다른 스레드를 시작하기 전에 워커를 fork해야 안전합니다.
+        start_spell_pool(spell_dictionary)
+        server_socket = create_server_socket()
+        log.info("서버가 %d 포트에서 시작되었습니다.", PORT)
+        server_th = start_server_thread(server_socket)
+        start_stats_dump(STATS_FILE)
+        start_warmup()
 
     print("[SYSTEM] 서버를 종료하려면 'q'를 입력하세요.")
+    print(CONSOLE_HELP)
     try:
         while True:
             cmd = input()
             if cmd.lower() == 'q':
                 break
+            if CHAT_PROCESSES > 1:
+                # 사전은 워커마다 따로 갖고 있으므로 콘솔 명령을 모든 워커에 전달합니다.
+                hub.send_all({'type': 'console', 'cmd': cmd})
+            else:
+                handle_console_command(cmd)
     except (KeyboardInterrupt, EOFError):
         pass
 
-    print("[SYSTEM] 서버를 종료합니다...")
-    event.set()
-    
-    for sock in client_sockets.values():
-        sock.close()
-    
-    server_socket.close()
-    print("[SYSTEM] 서버가 종료되었습니다.")
+    log.info("서버를 종료합니다...")
+    if CHAT_PROCESSES > 1:
+        hub.send_all({'type': 'shutdown'})
+        for process in processes:
+            process.join(10)
+    else:
+        stop_server(server_socket, server_th)
+    log.info("서버가 종료되었습니다.")
+    shutdown_logging()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,202 @@
+# cluster_bus.py
+"""
+멀티 프로세스 모드에서 서버 워커 프로세스들을 잇는 로컬 메시지 버스.
+
+부모 프로세스의 BusHub가 워커마다 Unix 도메인 소켓 쌍(socketpair) 하나로 연결되어 중계를 맡고,
+전체 접속자 목록(어떤 ID가 어느 워커에 있는지)을 관리합니다. 메시지는 한 줄에 JSON 하나입니다.
+
+워커 -> 허브
+    {"type": "claim", "user": id, "seq": 번호}        로그인 ID 선점 요청 (응답: claimed)
+    {"type": "leave", "user": id}                     연결 종료
+    {"type": "user", "to": id, "data": 메시지}         다른 워커에 있는 사용자에게 전달 (1:1 메시지)
+    {"type": "broadcast", "data": 메시지}              모든 워커의 모든 사용자에게 전달
+    {"type": "room", "room": 이름, "data": 메시지}      모든 워커의 채팅방 멤버에게 전달
+허브 -> 워커
+    {"type": "claimed", "ok": bool, "user": id, "seq": 번호, "users": [...]}
+                                                       claim 응답과 그 시점의 전체 접속자 목록 (user, seq는 요청 그대로)
+    {"type": "join" | "leave", "user": id}             다른 워커의 접속/퇴장
+    user, broadcast, room                              다른 워커가 보낸 메시지
+    {"type": "console", "cmd": 명령}                   서버 콘솔 명령 (사전 다시 로드 등)
+    {"type": "shutdown"}                               서버 종료
+
+"data"는 클라이언트에게 보낼 메시지의 [command, params, trailing]입니다. (protocol.Message.to_fields)
+"""
+import json
+from threading import Thread, Lock, Event
+
+from line_buffer import LineBuffer
+from server_log import get_logger
+
+log = get_logger('system')
+
+CLAIM_TIMEOUT = 5
+# 버스 메시지 한 줄의 최대 크기. 클라이언트 메시지를 JSON으로 감싸면 길어질 수 있으므로 넉넉하게 둡니다.
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+def _encode(message):
+    return (json.dumps(message, ensure_ascii=False) + '\n').encode()
+
+def _read_messages(sock):
+    """소켓에서 JSON 메시지를 차례로 읽습니다. 연결이 끊기면 끝납니다."""
+    lines = LineBuffer(MAX_MESSAGE_BYTES)
+    try:
+        while lines.recv_from(sock):
+            for line in lines.lines():
+                yield json.loads(line)
+    except OSError:
+        pass
+
+class BusHub:
+    """부모 프로세스에서 워커 사이의 메시지를 중계합니다."""
+
+    def __init__(self, sockets):
+        self._sockets = list(sockets)  # 워커 번호 순서
+        self._send_locks = [Lock() for _ in self._sockets]
+        self._users = {}  # { 'id': 워커 번호 }
+        self._lock = Lock()
+
+    def start(self):
+        for worker, sock in enumerate(self._sockets):
+            Thread(target=self._relay, args=(worker, sock), daemon=True).start()
+
+    def _send(self, worker, message):
+        try:
+            with self._send_locks[worker]:
+                self._sockets[worker].sendall(_encode(message))
+        except OSError:
+            pass  # 종료된 워커
+
+    def _send_others(self, worker, message):
+        for other in range(len(self._sockets)):
+            if other != worker:
+                self._send(other, message)
+
+    def send_all(self, message):
+        for worker in range(len(self._sockets)):
+            self._send(worker, message)
+
+    def _relay(self, worker, sock):
+        for message in _read_messages(sock):
+            kind = message['type']
+            if kind == 'claim':
+                user_id = message['user']
+                with self._lock:
+                    ok = user_id not in self._users
+                    if ok:
+                        self._users[user_id] = worker
+                    users = list(self._users)
+                self._send(worker, {'type': 'claimed', 'ok': ok, 'user': user_id, 'seq': message.get('seq'),
+                                    'users': users})
+                if ok:
+                    self._send_others(worker, {'type': 'join', 'user': user_id})
+            elif kind == 'leave':
+                self._release(worker, message['user'])
+            elif kind == 'user':
+                target = self._users.get(message['to'])
+                if target is not None:
+                    self._send(target, message)
+            else:
+                self._send_others(worker, message)
+        # 워커가 종료되었으면 그 워커의 사용자를 모두 퇴장 처리합니다.
+        with self._lock:
+            orphans = [user_id for user_id, owner in self._users.items() if owner == worker]
+        for user_id in orphans:
+            self._release(worker, user_id)
+
+    def _release(self, worker, user_id):
+        with self._lock:
+            if self._users.get(user_id) != worker:
+                return
+            del self._users[user_id]
+        self._send_others(worker, {'type': 'leave', 'user': user_id})
+
+class BusClient:
+    """
+    워커 프로세스 쪽 버스 연결. 허브에서 온 메시지는 수신 스레드에서 handler(message)로 전달합니다.
+    다른 워커에 접속한 사용자 ID는 remote_users에 유지합니다.
+    """
+
+    def __init__(self, sock, handler):
+        self._sock = sock
+        self._handler = handler
+        self._send_lock = Lock()
+        self._claims = {}  # 응답을 기다리는 claim { 번호: (register, on_done) } (응답을 받았거나 포기하면 지웁니다)
+        self._claim_seq = 0  # 마지막으로 보낸 claim 번호
+        self._claim_lock = Lock()
+        self.remote_users = set()
+
+    def start(self):
+        Thread(target=self._receive, daemon=True).start()
+
+    def send(self, message):
+        try:
+            with self._send_lock:
+                self._sock.sendall(_encode(message))
+        except OSError as e:
+            log.error("메시지 버스 전송 실패: %s", e)
+
+    def start_claim(self, user_id, register, on_done):
+        """
+        모든 워커에서 user_id를 선점하도록 요청하고 응답을 기다리지 않고 claim 번호를 반환합니다.
+        선점에 성공하면 응답을 받은 수신 스레드에서 바로 register(전체 접속자 목록)를 호출해 로컬 세션에 등록하므로,
+        그 뒤에 도착하는 접속/퇴장 알림은 항상 register()가 보낸 메시지 다음에 전달됩니다.
+        이어서 수신 스레드에서 on_done(로그인 성공 여부)를 호출합니다. (이미 사용 중이거나 register()가 실패하면 False)
+        응답을 기다리는 claim은 번호로 구분하므로 여러 로그인을 동시에 진행할 수 있습니다.
+        """
+        with self._claim_lock:
+            self._claim_seq += 1
+            seq = self._claim_seq
+            self._claims[seq] = (register, on_done)
+        self.send({'type': 'claim', 'user': user_id, 'seq': seq})
+        return seq
+
+    def cancel_claim(self, seq):
+        """
+        응답을 기다리는 claim을 포기합니다. 포기했으면 True이며 on_done은 호출되지 않습니다.
+        수신 스레드가 이미 응답을 처리하기 시작했으면 False이며 곧 on_done이 호출됩니다.
+        포기한 claim의 응답이 늦게 오면 허브가 선점해 둔 ID를 돌려줍니다.
+        """
+        with self._claim_lock:
+            return self._claims.pop(seq, None) is not None
+
+    def claim(self, user_id, register):
+        """start_claim()의 응답을 CLAIM_TIMEOUT초까지 기다립니다. 허브가 응답하지 않으면 False를 반환합니다."""
+        done = Event()
+        result = []
+
+        def on_done(ok):
+            result.append(ok)
+            done.set()
+
+        seq = self.start_claim(user_id, register, on_done)
+        if not done.wait(CLAIM_TIMEOUT) and self.cancel_claim(seq):
+            return False
+        done.wait()  # 수신 스레드가 막 응답을 처리하기 시작했으면 끝날 때까지 기다립니다.
+        return result[0]
+
+    def has_user(self, user_id):
+        return user_id in self.remote_users
+
+    def _receive(self):
+        for message in _read_messages(self._sock):
+            kind = message['type']
+            if kind == 'claimed':
+                with self._claim_lock:
+                    pending = self._claims.pop(message.get('seq'), None)
+                if pending is None:
+                    # 시간 초과 등으로 포기한 claim의 늦은 응답. 허브가 선점해 둔 ID는 돌려줍니다.
+                    if message['ok']:
+                        self.send({'type': 'leave', 'user': message['user']})
+                    continue
+                register, on_done = pending
+                ok = message['ok'] and register(message['users'])
+                if message['ok'] and not ok:
+                    self.send({'type': 'leave', 'user': message['user']})
+                on_done(ok)
+                continue
+            if kind == 'join':
+                self.remote_users.add(message['user'])
+            elif kind == 'leave':
+                self.remote_users.discard(message['user'])
+            self._handler(message)
+        self._handler({'type': 'shutdown'})
@@ -0,0 +1,271 @@
+# dawg_dictionary.py
+"""
+사전 단어를 최소화된 트라이(DAWG)로 압축해 평평한 배열에 저장하는 사전 백엔드.
+
+공통 접두사와 공통 접미사를 모두 공유하므로 Python set/dict보다 메모리를 훨씬 적게 쓰고,
+추천 단어는 레벤슈타인 오토마톤(DP 행)을 따라 트라이를 탐색하면서 거리가 max_distance를 넘는
+하위 트리를 통째로 건너뛰어 찾습니다.
+빈도는 각 노드 아래의 단어 수로 계산한 단어 번호(사전순 순위)에 연결됩니다.
+
+사용법: python dawg_dictionary.py <words.txt> <en_full.txt> <출력 파일>
+"""
+import struct
+import sys
+from array import array
+
+from spell_checker_v2 import load_words, load_frequency_map
+
+MAGIC = b'SPELLDG1'
+# magic, 노드 수, 간선 수, 단어 수
+HEADER = struct.Struct('<8sQQQ')
+NO_FREQUENCY = -1
+
+class _BuildNode:
+    __slots__ = ('edges', 'final')
+
+    def __init__(self):
+        self.edges = {}
+        self.final = False
+
+    def signature(self):
+        return (self.final, tuple((ch, id(child)) for ch, child in sorted(self.edges.items())))
+
+def _build_minimal_trie(sorted_words):
+    """정렬된 단어 목록으로 최소화된 트라이를 만듭니다. (Daciuk의 점진적 알고리즘)"""
+    root = _BuildNode()
+    register = {}
+    unchecked = []  # [(부모, 문자, 자식), ...] 아직 최소화하지 않은 마지막 단어의 경로
+    previous = ''
+
+    def minimize(down_to):
+        while len(unchecked) > down_to:
+            parent, ch, child = unchecked.pop()
+            signature = child.signature()
+            if signature in register:
+                parent.edges[ch] = register[signature]
+            else:
+                register[signature] = child
+
+    for word in sorted_words:
+        common = 0
+        while common < min(len(word), len(previous)) and word[common] == previous[common]:
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else root
+        for ch in word[common:]:
+            child = _BuildNode()
+            node.edges[ch] = child
+            unchecked.append((node, ch, child))
+            node = child
+        node.final = True
+        previous = word
+    minimize(0)
+    return root
+
+class DawgDictionary:
+    """
+    배열 기반 DAWG 사전. word_set(in, 순회, len), freq_map(get)과
+    추천 인덱스(supports, suggest)를 모두 대신할 수 있습니다.
+    """
+
+    def __init__(self, edge_start, edge_labels, edge_targets, finals, counts, freqs):
+        self._edge_start = edge_start      # 노드별 첫 간선 위치 (노드 수 + 1)
+        self._edge_labels = edge_labels    # 간선 문자 코드 포인트 (노드 안에서 오름차순)
+        self._edge_targets = edge_targets  # 간선이 가리키는 노드
+        self._finals = finals              # 노드가 단어의 끝인지 여부
+        self._counts = counts              # 노드 아래(자신 포함)에서 끝나는 단어 수
+        self._freqs = freqs                # 단어 번호(사전순 순위)별 빈도, 없으면 -1
+
+    @classmethod
+    def build(cls, word_set, freq_map):
+        words = sorted(word_set)
+        root = _build_minimal_trie(words)
+
+        # 루트부터 번호를 매기며 평평한 배열로 옮깁니다.
+        node_ids = {id(root): 0}
+        order = [root]
+        for node in order:
+            for _, child in sorted(node.edges.items()):
+                if id(child) not in node_ids:
+                    node_ids[id(child)] = len(order)
+                    order.append(child)
+
+        edge_start, edge_labels, edge_targets = array('I', [0]), array('I'), array('I')
+        finals = bytearray(len(order))
+        for node_id, node in enumerate(order):
+            finals[node_id] = node.final
+            for ch, child in sorted(node.edges.items()):
+                edge_labels.append(ord(ch))
+                edge_targets.append(node_ids[id(child)])
+            edge_start.append(len(edge_labels))
+
+        # 자식이 항상 부모보다 뒤에 오지는 않으므로 깊이 우선 후위 순서로 단어 수를 셉니다.
+        counts = array('I', [0]) * len(order)
+        done = bytearray(len(order))
+        stack = [0]
+        while stack:
+            node_id = stack[-1]
+            pending = [t for t in edge_targets[edge_start[node_id]:edge_start[node_id + 1]] if not done[t]]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            if not done[node_id]:
+                counts[node_id] = finals[node_id] + sum(
+                    counts[t] for t in edge_targets[edge_start[node_id]:edge_start[node_id + 1]])
+                done[node_id] = 1
+
+        freqs = array('q', (freq_map.get(word, NO_FREQUENCY) for word in words))
+        return cls(edge_start, edge_labels, edge_targets, finals, counts, freqs)
+
+    # --- 파일 저장 / 로드 ---
+
+    def save(self, file_path):
+        with open(file_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(self._finals), len(self._edge_labels), len(self._freqs)))
+            for values in (self._edge_start, self._edge_labels, self._edge_targets, self._counts, self._freqs):
+                values = array(values.typecode, values)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                values.tofile(f)
+            f.write(self._finals)
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, 'rb') as f:
+            magic, node_count, edge_count, word_count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"DAWG 사전 형식이 올바르지 않습니다: {file_path}")
+            arrays = []
+            for typecode, size in (('I', node_count + 1), ('I', edge_count), ('I', edge_count),
+                                   ('I', node_count), ('q', word_count)):
+                values = array(typecode)
+                values.fromfile(f, size)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                arrays.append(values)
+            finals = bytearray(f.read(node_count))
+        edge_start, edge_labels, edge_targets, counts, freqs = arrays
+        return cls(edge_start, edge_labels, edge_targets, finals, counts, freqs)
+
+    # --- 조회 ---
+
+    def _child(self, node_id, code):
+        """node_id에서 code 문자로 나가는 간선의 위치를 이진 탐색으로 찾습니다. 없으면 -1."""
+        lo, hi = self._edge_start[node_id], self._edge_start[node_id + 1]
+        labels = self._edge_labels
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if labels[mid] < code:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._edge_start[node_id + 1] and labels[lo] == code:
+            return lo
+        return -1
+
+    def word_number(self, word):
+        """단어의 사전순 번호를 반환합니다. 사전에 없으면 -1."""
+        node_id, number = 0, 0
+        for ch in word:
+            edge = self._child(node_id, ord(ch))
+            if edge < 0:
+                return -1
+            number += self._finals[node_id]
+            for previous in range(self._edge_start[node_id], edge):
+                number += self._counts[self._edge_targets[previous]]
+            node_id = self._edge_targets[edge]
+        return number if self._finals[node_id] else -1
+
+    def __contains__(self, word):
+        return self.word_number(word) >= 0
+
+    def __len__(self):
+        return self._counts[0] if self._counts else 0
+
+    def __iter__(self):
+        stack = [(0, '')]
+        while stack:
+            node_id, prefix = stack.pop()
+            if self._finals[node_id]:
+                yield prefix
+            start, end = self._edge_start[node_id], self._edge_start[node_id + 1]
+            for edge in range(end - 1, start - 1, -1):
+                stack.append((self._edge_targets[edge], prefix + chr(self._edge_labels[edge])))
+
+    def get(self, word, default=None):
+        """단어 빈도를 반환합니다. (freq_map.get과 같은 인터페이스)"""
+        number = self.word_number(word)
+        if number < 0 or self._freqs[number] == NO_FREQUENCY:
+            return default
+        return self._freqs[number]
+
+    def set_frequency(self, word, frequency):
+        """사전에 있는 단어의 빈도를 그 자리에서 바꿉니다. (트라이 구조는 바뀌지 않습니다)"""
+        number = self.word_number(word)
+        if number < 0:
+            raise ValueError(f"DAWG 사전에 없는 단어입니다: {word}")
+        self._freqs[number] = frequency
+
+    # --- 추천 인덱스 인터페이스 ---
+
+    @property
+    def suggestion_index(self):
+        return self
+
+    def supports(self, max_distance):
+        return True
+
+    def suggest(self, word, max_distance=2, limit=3):
+        """
+        레벤슈타인 DP 행을 따라 트라이를 탐색해 get_suggestions와 같은 (거리, -빈도) 순서로 추천 단어를 반환합니다.
+        행의 최솟값이 max_distance를 넘으면 그 아래 하위 트리 전체를 건너뜁니다.
+        """
+        suggestions = []
+        edge_start, labels, targets = self._edge_start, self._edge_labels, self._edge_targets
+        finals, counts, freqs = self._finals, self._counts, self._freqs
+        codes = [ord(ch) for ch in word]
+        columns = len(codes) + 1
+
+        # (노드, 접두사, 이 노드까지의 DP 행, 이 노드의 첫 단어 번호)
+        stack = [(0, '', list(range(columns)), 0)]
+        while stack:
+            node_id, prefix, previous_row, number = stack.pop()
+            number += finals[node_id]
+            for edge in range(edge_start[node_id], edge_start[node_id + 1]):
+                code, child = labels[edge], targets[edge]
+                row = [previous_row[0] + 1]
+                for j in range(1, columns):
+                    row.append(min(row[j - 1] + 1,
+                                   previous_row[j] + 1,
+                                   previous_row[j - 1] + (codes[j - 1] != code)))
+                if row[-1] <= max_distance and finals[child]:
+                    frequency = freqs[number]
+                    suggestions.append((prefix + chr(code), row[-1], frequency if frequency > 0 else 0))
+                if min(row) <= max_distance:
+                    stack.append((child, prefix + chr(code), row, number))
+                number += counts[child]
+
+        suggestions.sort(key=lambda x: (x[1], -x[2], x[0]))
+        return [s[0] for s in suggestions[:limit]]
+
+def build_dawg_dictionary(word_set, freq_map):
+    """단어 집합과 빈도 정보로 DAWG 사전을 생성합니다."""
+    return DawgDictionary.build(word_set, freq_map)
+
+def main():
+    if len(sys.argv) != 4:
+        print("사용법: python dawg_dictionary.py <words.txt> <en_full.txt> <출력 파일>")
+        sys.exit(1)
+    dict_path, freq_path, out_path = sys.argv[1:]
+    word_set = load_words(dict_path)
+    freq_map = load_frequency_map(freq_path)
+    if not word_set or not freq_map:
+        sys.exit(1)
+    print(f"{len(word_set):,}개의 단어로 DAWG를 생성하는 중...")
+    dawg = build_dawg_dictionary(word_set, freq_map)
+    dawg.save(out_path)
+    print(f"DAWG 저장 완료: {out_path} (노드 {len(dawg._finals):,}개)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+# dict_snapshot.py
+"""
+사전 파일(words.txt)과 단어 빈도 파일(en_full.txt)을 하나의 바이너리 스냅샷으로 미리 컴파일하고,
+mmap으로 열어 set/dict처럼 사용할 수 있게 합니다.
+
+사용법: python dict_snapshot.py <words.txt> <en_full.txt> <출력 파일> [--index] [--max-distance N] [--top N]
+
+--top N을 지정하면 사전에 있는 단어 중 빈도가 가장 높은 N개만 담은 작은 스냅샷을 만듭니다. (클라이언트 로컬 검사용)
+
+파일 구성 (리틀 엔디언, 각 구역은 8바이트 경계에 정렬):
+    헤더 | 단어 오프셋(Q, N+1) | 빈도(q, N) | 플래그(B, N) | 정렬된 단어 UTF-8 blob
+    [--index 사용 시] 삭제 변형 오프셋(Q, K+1) | 후보 목록 오프셋(Q, K+1) | 후보 단어 번호(I, P) | 삭제 변형 blob
+"""
+import argparse
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from spell_checker_v2 import load_words, load_frequency_map, build_suggestion_index, SuggestionIndex
+
+MAGIC = b'SPELLSN1'
+VERSION = 1
+# magic, version, flags, 항목 수, 사전 단어 수, 빈도 단어 수, blob 길이,
+# 인덱스 최대 거리, 삭제 변형 수, 후보 번호 수, 삭제 변형 blob 길이
+HEADER = struct.Struct('<8sIIQQQQQQQQ')
+
+FLAG_HAS_INDEX = 0x1
+ENTRY_IN_WORDS = 0x1
+ENTRY_HAS_FREQ = 0x2
+
+def is_snapshot(file_path):
+    """파일이 사전 스냅샷인지 확인합니다."""
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+def _padding(size):
+    return -size % 8
+
+def _write_section(f, data):
+    f.write(data)
+    f.write(b'\0' * _padding(len(data)))
+
+def _array_bytes(typecode, values):
+    values = array(typecode, values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+def _blob_with_offsets(byte_strings):
+    offsets = [0]
+    for item in byte_strings:
+        offsets.append(offsets[-1] + len(item))
+    return b''.join(byte_strings), offsets
+
+def write_snapshot(out_path, word_set, freq_map, index=None):
+    """
+    단어 집합과 빈도 정보(및 선택적으로 추천 단어 인덱스)를 스냅샷 파일로 저장합니다.
+    실행 중인 서버가 mmap한 파일을 덮어쓰지 않도록 같은 디렉토리의 임시 파일에 쓴 뒤 os.replace()로 바꿉니다.
+    (기존 매핑은 이전 파일(inode)을 계속 보므로, 파일이 줄어들어 SIGBUS가 나거나 새 데이터가 섞이지 않습니다)
+    """
+    entries = sorted({w.encode('utf-8') for w in word_set} | {w.encode('utf-8') for w in freq_map})
+    words = [e.decode('utf-8') for e in entries]
+    ids = {word: i for i, word in enumerate(words)}
+    freqs = [freq_map.get(word, 0) for word in words]
+    flags = bytes((ENTRY_IN_WORDS if word in word_set else 0) | (ENTRY_HAS_FREQ if word in freq_map else 0)
+                  for word in words)
+    blob, offsets = _blob_with_offsets(entries)
+
+    header_flags = 0
+    max_distance = key_count = posting_count = key_blob_len = 0
+    if index is not None:
+        header_flags |= FLAG_HAS_INDEX
+        max_distance = index.max_distance
+        keys = sorted((deleted.encode('utf-8'), bucket) for deleted, bucket in index.deletes.items())
+        key_blob, key_offsets = _blob_with_offsets([key for key, _ in keys])
+        postings = []
+        posting_offsets = [0]
+        for _, bucket in keys:
+            postings.extend(sorted(ids[word] for word in bucket))
+            posting_offsets.append(len(postings))
+        key_count, posting_count, key_blob_len = len(keys), len(postings), len(key_blob)
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.snapshot-', dir=os.path.dirname(os.path.abspath(out_path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, header_flags, len(words),
+                                sum(1 for flag in flags if flag & ENTRY_IN_WORDS),
+                                sum(1 for flag in flags if flag & ENTRY_HAS_FREQ),
+                                len(blob), max_distance, key_count, posting_count, key_blob_len))
+            _write_section(f, _array_bytes('Q', offsets))
+            _write_section(f, _array_bytes('q', freqs))
+            _write_section(f, flags)
+            _write_section(f, blob)
+            if index is not None:
+                _write_section(f, _array_bytes('Q', key_offsets))
+                _write_section(f, _array_bytes('Q', posting_offsets))
+                _write_section(f, _array_bytes('I', postings))
+                _write_section(f, key_blob)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)  # mkstemp는 0600으로 만들므로 open()과 같은 권한으로 맞춥니다.
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def top_words(word_set, freq_map, count):
+    """사전(word_set)에 있는 단어 중 빈도가 가장 높은 count개만 남긴 (단어 집합, 빈도 맵)을 반환합니다."""
+    top = heapq.nlargest(count, (word for word in freq_map if word in word_set), key=freq_map.get)
+    return set(top), {word: freq_map[word] for word in top}
+
+def compile_snapshot(dict_path, freq_path, out_path, with_index=False, max_distance=2, top=None):
+    """
+    사전 파일과 단어 빈도 파일을 읽어 스냅샷 파일을 생성합니다. 성공하면 True를 반환합니다.
+    top이 주어지면 빈도 상위 top개 단어만 저장합니다.
+    """
+    word_set = load_words(dict_path)
+    freq_map = load_frequency_map(freq_path)
+    if not word_set or not freq_map:
+        return False
+    if top:
+        word_set, freq_map = top_words(word_set, freq_map, top)
+    index = build_suggestion_index(word_set, freq_map, max_distance) if with_index else None
+    write_snapshot(out_path, word_set, freq_map, index)
+    return True
+
+def _bisect(count, key, item_at):
+    """정렬된 bytes 항목들에서 key의 위치를 찾습니다. 없으면 -1을 반환합니다."""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        item = item_at(mid)
+        if item < key:
+            lo = mid + 1
+        elif item > key:
+            hi = mid
+        else:
+            return mid
+    return -1
+
+class DictionarySnapshot:
+    """
+    mmap으로 연 사전 스냅샷. 여러 서버 프로세스가 같은 파일을 열면 페이지 캐시를 공유합니다.
+    words와 frequencies는 각각 word_set(set)과 freq_map(dict) 대신 사용할 수 있는 읽기 전용 뷰입니다.
+    """
+
+    def __init__(self, file_path):
+        if sys.byteorder != 'little':
+            raise ValueError("사전 스냅샷은 리틀 엔디언 환경에서만 열 수 있습니다.")
+        with open(file_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, flags, count, word_count, freq_count, blob_len,
+         max_distance, key_count, posting_count, key_blob_len) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"사전 스냅샷 형식이 올바르지 않습니다: {file_path}")
+
+        self.path = file_path
+        self.count = count
+        view = memoryview(self._mmap)
+        position = HEADER.size
+
+        def section(size, typecode=None):
+            nonlocal position
+            data = view[position:position + size]
+            position += size + _padding(size)
+            return data.cast(typecode) if typecode else data
+
+        self._offsets = section(8 * (count + 1), 'Q')
+        self._freqs = section(8 * count, 'q')
+        self._flags = section(count)
+        self._blob = section(blob_len)
+
+        self.words = SnapshotWordSet(self, word_count)
+        self.frequencies = SnapshotFrequencyMap(self, freq_count)
+        self.index = None
+        if flags & FLAG_HAS_INDEX:
+            table = MappedDeleteTable(self, key_count,
+                                      section(8 * (key_count + 1), 'Q'),
+                                      section(8 * (key_count + 1), 'Q'),
+                                      section(4 * posting_count, 'I'),
+                                      section(key_blob_len))
+            self.index = SuggestionIndex(self.frequencies, max_distance)
+            self.index.deletes = table
+
+    def word_bytes(self, entry_id):
+        return bytes(self._blob[self._offsets[entry_id]:self._offsets[entry_id + 1]])
+
+    def word_at(self, entry_id):
+        return self.word_bytes(entry_id).decode('utf-8')
+
+    def find(self, word):
+        """단어의 항목 번호를 이진 탐색으로 찾습니다. 없으면 -1을 반환합니다."""
+        return _bisect(self.count, word.encode('utf-8'), self.word_bytes)
+
+    def has_flag(self, entry_id, flag):
+        return bool(self._flags[entry_id] & flag)
+
+    def frequency_at(self, entry_id):
+        return self._freqs[entry_id]
+
+    def entries(self, flag):
+        for entry_id in range(self.count):
+            if self._flags[entry_id] & flag:
+                yield entry_id
+
+class SnapshotWordSet:
+    """스냅샷의 사전 단어를 set처럼 조회하는 뷰. (O(log n) 포함 여부 검사)"""
+
+    def __init__(self, snapshot, size):
+        self.snapshot = snapshot
+        self._size = size
+
+    @property
+    def suggestion_index(self):
+        """스냅샷에 함께 저장된 추천 단어 인덱스. 없으면 None."""
+        return self.snapshot.index
+
+    def __contains__(self, word):
+        entry_id = self.snapshot.find(word)
+        return entry_id >= 0 and self.snapshot.has_flag(entry_id, ENTRY_IN_WORDS)
+
+    def __iter__(self):
+        for entry_id in self.snapshot.entries(ENTRY_IN_WORDS):
+            yield self.snapshot.word_at(entry_id)
+
+    def __len__(self):
+        return self._size
+
+class SnapshotFrequencyMap:
+    """스냅샷의 단어 빈도를 dict처럼 조회하는 뷰. (O(log n) 조회)"""
+
+    def __init__(self, snapshot, size):
+        self.snapshot = snapshot
+        self._size = size
+
+    def _entry(self, word):
+        entry_id = self.snapshot.find(word)
+        if entry_id >= 0 and self.snapshot.has_flag(entry_id, ENTRY_HAS_FREQ):
+            return entry_id
+        return -1
+
+    def get(self, word, default=None):
+        entry_id = self._entry(word)
+        return self.snapshot.frequency_at(entry_id) if entry_id >= 0 else default
+
+    def __getitem__(self, word):
+        entry_id = self._entry(word)
+        if entry_id < 0:
+            raise KeyError(word)
+        return self.snapshot.frequency_at(entry_id)
+
+    def __contains__(self, word):
+        return self._entry(word) >= 0
+
+    def __iter__(self):
+        for entry_id in self.snapshot.entries(ENTRY_HAS_FREQ):
+            yield self.snapshot.word_at(entry_id)
+
+    def items(self):
+        for entry_id in self.snapshot.entries(ENTRY_HAS_FREQ):
+            yield self.snapshot.word_at(entry_id), self.snapshot.frequency_at(entry_id)
+
+    def __len__(self):
+        return self._size
+
+class MappedDeleteTable:
+    """스냅샷에 저장된 삭제 변형 테이블. SuggestionIndex.deletes 대신 사용됩니다."""
+
+    def __init__(self, snapshot, key_count, key_offsets, posting_offsets, postings, key_blob):
+        self.snapshot = snapshot
+        self._key_count = key_count
+        self._key_offsets = key_offsets
+        self._posting_offsets = posting_offsets
+        self._postings = postings
+        self._key_blob = key_blob
+
+    def _key_at(self, position):
+        return bytes(self._key_blob[self._key_offsets[position]:self._key_offsets[position + 1]])
+
+    def get(self, deleted, default=None):
+        position = _bisect(self._key_count, deleted.encode('utf-8'), self._key_at)
+        if position < 0:
+            return default
+        start, end = self._posting_offsets[position], self._posting_offsets[position + 1]
+        return [self.snapshot.word_at(entry_id) for entry_id in self._postings[start:end]]
+
+    def __len__(self):
+        return self._key_count
+
+_open_snapshots = {}
+
+def open_snapshot(file_path, fresh=False):
+    """
+    스냅샷을 엽니다. 같은 경로는 한 번만 매핑하여 load_words와 load_frequency_map이 공유합니다.
+    fresh이면 파일을 다시 열어 매핑하고 공유하는 스냅샷을 교체합니다. (다시 컴파일한 사전을 읽을 때)
+    """
+    snapshot = _open_snapshots.get(file_path)
+    if snapshot is None or fresh:
+        snapshot = _open_snapshots[file_path] = DictionarySnapshot(file_path)
+    return snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description="사전 파일을 mmap 스냅샷으로 컴파일합니다.")
+    parser.add_argument('dict_path')
+    parser.add_argument('freq_path')
+    parser.add_argument('out_path')
+    parser.add_argument('--index', action='store_true', help="추천 단어 삭제 인덱스를 함께 저장합니다.")
+    parser.add_argument('--max-distance', type=int, default=2)
+    parser.add_argument('--top', type=int, help="빈도가 가장 높은 N개 단어만 저장합니다.")
+    args = parser.parse_args()
+
+    print(f"'{args.dict_path}', '{args.freq_path}'을(를) 컴파일하는 중...")
+    if compile_snapshot(args.dict_path, args.freq_path, args.out_path, args.index, args.max_distance, args.top):
+        print(f"스냅샷 저장 완료: {args.out_path}")
+    else:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# dictionary_warmup.py
+"""
+서버 시작 시 맞춤법 검사 사전 준비(warm-up)의 진행 상황.
+
+사전 로드와 추천 인덱스 생성은 백그라운드에서 진행되고 서버는 그동안에도 연결을 받아 채팅을 중계합니다.
+단계(단어 목록, 빈도, 인덱스 ...)마다 걸린 시간을 기록해 로그와 STATS로 알려 주며,
+준비가 끝나기 전의 맞춤법 검사 요청에는 describe()의 안내 문구로 답합니다.
+"""
+import time
+from threading import Lock
+
+from server_log import get_logger
+
+log = get_logger('system')
+
+class WarmupProgress:
+    """사전 준비 진행 상황. (스레드 안전)"""
+
+    def __init__(self):
+        self.state = 'pending'  # 'pending' -> 'loading' -> 'ready' 또는 'failed'
+        self.stage = None
+        self._started = None
+        self._stage_started = None
+        self._elapsed = None
+        self._stages = {}  # { 단계 이름: 걸린 시간(초) } (진행 순서대로)
+        self._lock = Lock()
+
+    @property
+    def finished(self):
+        """준비가 끝났는지 여부. 실패했어도 끝난 것입니다. (사전 없이 원문을 돌려주는 기존 동작)"""
+        return self.state in ('ready', 'failed')
+
+    def start(self):
+        with self._lock:
+            self.state = 'loading'
+            self._started = time.monotonic()
+        log.info("맞춤법 검사 사전 준비를 시작합니다.")
+
+    def _close_stage(self, now):
+        if self.stage is not None:
+            self._stages[self.stage] = round(now - self._stage_started, 3)
+
+    def begin_stage(self, name):
+        """새 단계를 시작합니다. 이전 단계는 여기서 끝난 것으로 기록합니다."""
+        with self._lock:
+            now = time.monotonic()
+            self._close_stage(now)
+            self.stage, self._stage_started = name, now
+
+    def finish(self, ok):
+        with self._lock:
+            now = time.monotonic()
+            self._close_stage(now)
+            self.stage = None
+            self._elapsed = round(now - self._started, 3) if self._started is not None else 0.0
+            self.state = 'ready' if ok else 'failed'
+            stages = ', '.join(f"{name} {seconds:.2f}초" for name, seconds in self._stages.items())
+        if ok:
+            log.info("맞춤법 검사 사전 준비 완료: %.2f초 (%s)", self._elapsed, stages or '-')
+        else:
+            log.warning("맞춤법 검사 사전 준비 실패: %.2f초 (%s)", self._elapsed, stages or '-')
+
+    def elapsed(self):
+        with self._lock:
+            if self._elapsed is not None:
+                return self._elapsed
+            return round(time.monotonic() - self._started, 3) if self._started is not None else 0.0
+
+    def describe(self):
+        """준비 중일 때 클라이언트에게 보낼 안내 문구"""
+        stage = self.stage or '대기'
+        return f"맞춤법 검사 사전을 준비하는 중입니다. ({stage} 단계, {self.elapsed():.1f}초 경과) 잠시 후에 다시 시도하세요."
+
+    def snapshot(self):
+        elapsed = self.elapsed()
+        with self._lock:
+            return {
+                'state': self.state,
+                'stage': self.stage,
+                'elapsed': elapsed,
+                'stages': dict(self._stages),
+            }
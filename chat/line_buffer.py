@@ -0,0 +1,102 @@
+# line_buffer.py
+"""
+개행문자(\n)로 구분되는 프로토콜 메시지를 바이트 단위로 모아 완성된 줄만 꺼내 주는 수신 버퍼.
+
+recv()로 받은 조각을 바로 decode()하면 여러 바이트로 된 UTF-8 문자나 한 줄이 조각 경계에서
+잘려 깨지거나 사라지므로, 바이트를 bytearray에 그대로 쌓아 두고 개행문자를 찾은 줄만 한 번 decode합니다.
+소켓은 memoryview로 버퍼의 빈 공간에 직접 받아 쓰며(recv_into), asyncio.BufferedProtocol의
+get_buffer()/buffer_updated()에도 그대로 연결할 수 있습니다.
+"""
+
+DEFAULT_MAX_LINE_LENGTH = 1024 * 1024
+INITIAL_CAPACITY = 4096
+
+class LineTooLongError(ValueError):
+    """개행문자 없이 max_line_length 바이트를 넘는 줄을 받았을 때 발생합니다."""
+
+class LineBuffer:
+    """
+    사용 예:
+        n = buffer.recv_from(sock)   # 0이면 연결 종료
+        while (line := buffer.next_line()) is not None:
+            handle(line)
+
+    버퍼는 작게 시작해 필요할 때만 max_line_length까지 두 배씩 늘어나므로, 대기 중인 연결은 메모리를 거의 쓰지 않습니다.
+    줄을 꺼내지 않는 동안은 버퍼가 비지 않으므로, 처리가 밀리면 읽기를 멈추는 것으로 흐름 제어를 할 수 있습니다.
+    """
+
+    def __init__(self, max_line_length=DEFAULT_MAX_LINE_LENGTH, encoding='utf-8'):
+        self.max_line_length = max_line_length
+        self.encoding = encoding
+        self._buffer = bytearray(min(INITIAL_CAPACITY, max_line_length + 1))
+        self._start = 0  # 아직 꺼내지 않은 데이터의 시작 위치
+        self._end = 0    # 받은 데이터의 끝 위치
+        self._scan = 0   # 이 위치 앞에는 개행문자가 없음 (같은 바이트를 다시 검색하지 않기 위함)
+
+    def __len__(self):
+        """버퍼에 남아 있는 (아직 꺼내지 않은) 바이트 수"""
+        return self._end - self._start
+
+    def get_buffer(self, sizehint=-1):
+        """다음 데이터를 받을 빈 공간을 memoryview로 반환합니다. 한 줄이 너무 길면 LineTooLongError를 발생시킵니다."""
+        if self._end == len(self._buffer):
+            self._make_room()
+        return memoryview(self._buffer)[self._end:]
+
+    def buffer_updated(self, nbytes):
+        """get_buffer()로 받은 공간에 nbytes가 기록되었음을 알립니다."""
+        self._end += nbytes
+
+    def recv_from(self, sock):
+        """소켓에서 한 번 읽어 버퍼에 추가하고 읽은 바이트 수를 반환합니다. (0이면 연결 종료)"""
+        with self.get_buffer() as view:
+            nbytes = sock.recv_into(view)
+        self.buffer_updated(nbytes)
+        return nbytes
+
+    def next_line(self):
+        """완성된 줄 하나를 개행문자를 뺀 문자열로 반환합니다. 완성된 줄이 없으면 None."""
+        newline = self._buffer.find(b'\n', self._scan, self._end)
+        if newline < 0:
+            self._scan = self._end
+            if self._end - self._start > self.max_line_length:
+                raise LineTooLongError(f"한 줄이 최대 길이({self.max_line_length} 바이트)를 넘었습니다.")
+            return None
+        with memoryview(self._buffer) as view:
+            line = str(view[self._start:newline], self.encoding, 'replace')
+        self._start = self._scan = newline + 1
+        if self._start == self._end:
+            self._start = self._end = self._scan = 0
+        return line
+
+    def lines(self):
+        """지금 버퍼에 있는 완성된 줄을 모두 꺼냅니다."""
+        while True:
+            line = self.next_line()
+            if line is None:
+                return
+            yield line
+
+    def take_pending(self):
+        """아직 꺼내지 않은 바이트를 모두 꺼내고 버퍼를 비웁니다. (다른 형식의 수신 버퍼로 넘길 때 사용)"""
+        pending = bytes(self._buffer[self._start:self._end])
+        self._start = self._end = self._scan = 0
+        return pending
+
+    def _make_room(self):
+        pending = self._end - self._start
+        if self._start > 0:
+            # 이미 꺼낸 줄이 차지하던 앞부분을 비웁니다. (크기가 같으므로 버퍼를 새로 만들지 않습니다)
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._scan -= self._start
+            self._start, self._end = 0, pending
+            if pending < len(self._buffer):
+                return
+        if pending > self.max_line_length:
+            raise LineTooLongError(f"한 줄이 최대 길이({self.max_line_length} 바이트)를 넘었습니다.")
+        capacity = min(len(self._buffer) * 2, self.max_line_length + 1)
+        if capacity <= len(self._buffer):
+            raise LineTooLongError(f"한 줄이 최대 길이({self.max_line_length} 바이트)를 넘었습니다.")
+        grown = bytearray(capacity)
+        grown[:pending] = self._buffer[:pending]
+        self._buffer = grown
@@ -0,0 +1,87 @@
+# outbound_queue.py
+from collections import deque
+from threading import Condition
+
+OVERFLOW_POLICIES = ('disconnect', 'drop_oldest')
+
+class OutboundQueue:
+    """
+    연결 하나로 보낼 메시지를 모아 두는 크기 제한 송신 큐. (스레드 안전)
+    메시지를 보내는 쪽은 큐에 넣기만 하고 바로 돌아가므로, 받는 쪽이 느려도 보내는 스레드는 멈추지 않습니다.
+    쓰기 담당(전용 스레드 또는 이벤트 루프)은 쌓인 메시지를 한 번에 꺼내 하나의 쓰기로 보냅니다.
+
+    대기 중인 바이트가 max_bytes를 넘으면 policy에 따라
+    'disconnect': 큐를 비우고 닫은 뒤 on_overflow()를 한 번 호출합니다. (연결을 끊는 데 사용)
+    'drop_oldest': 가장 오래된 메시지부터 버립니다.
+    """
+
+    def __init__(self, max_bytes, policy='disconnect', on_ready=None, on_overflow=None):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"알 수 없는 송신 큐 정책입니다: {policy}")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.on_ready = on_ready  # 빈 큐에 메시지가 들어왔을 때 호출 (이벤트 루프에 쓰기를 예약할 때 사용)
+        self.on_overflow = on_overflow
+        self._messages = deque()
+        self._size = 0
+        self._closed = False
+        self._ready = Condition()
+        self.dropped = 0  # drop_oldest로 버린 메시지 수
+
+    def put(self, data):
+        """메시지를 큐에 넣습니다. 닫힌 큐에 넣은 메시지는 버려집니다."""
+        with self._ready:
+            if self._closed:
+                return
+            if self._size + len(data) > self.max_bytes and self.policy == 'disconnect':
+                self._closed = True
+                self._messages.clear()
+                self._size = 0
+                self._ready.notify_all()
+                overflowed = True
+            else:
+                while self._messages and self._size + len(data) > self.max_bytes:
+                    self._size -= len(self._messages.popleft())
+                    self.dropped += 1
+                was_empty = not self._messages
+                self._messages.append(data)
+                self._size += len(data)
+                self._ready.notify()
+                overflowed = False
+        if overflowed:
+            if self.on_overflow:
+                self.on_overflow()
+        elif was_empty and self.on_ready:
+            self.on_ready()
+
+    def take(self):
+        """쌓인 메시지를 모두 꺼내 하나로 합쳐 반환합니다. 비어 있으면 b''."""
+        with self._ready:
+            return self._take()
+
+    def get(self):
+        """메시지가 들어올 때까지 기다렸다가 모두 꺼내 반환합니다. 큐가 닫히고 비었으면 b''."""
+        with self._ready:
+            while not self._messages and not self._closed:
+                self._ready.wait()
+            return self._take()
+
+    def close(self):
+        """더 이상 메시지를 받지 않습니다. 이미 들어온 메시지는 계속 꺼낼 수 있습니다."""
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+
+    def _take(self):
+        data = b''.join(self._messages)
+        self._messages.clear()
+        self._size = 0
+        return data
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __len__(self):
+        """대기 중인 바이트 수"""
+        return self._size
@@ -0,0 +1,56 @@
+# presence.py
+from threading import Lock, Timer
+
+from protocol import Message
+
+class PresenceNotifier:
+    """
+    접속자 변화를 USER_JOIN / USER_LEAVE 변경분으로 알립니다.
+    전체 목록(USER_LIST)은 로그인한 사용자에게만 한 번 보내고, 이후에는 바뀐 ID만 보내므로
+    N명이 한꺼번에 접속해도 매번 N명 전체 목록을 모두에게 다시 보내지 않습니다.
+
+    window가 0보다 크면 그 시간(초) 동안의 변화를 모아 한 번에 보냅니다.
+    같은 사용자가 창 안에서 접속했다가 나가면 마지막 상태만 보냅니다. 클라이언트는 이미 아는 ID의
+    USER_JOIN이나 모르는 ID의 USER_LEAVE를 무시하면 되므로, 로그인 시점의 목록과 겹쳐도 상관없습니다.
+    """
+
+    def __init__(self, broadcast, window=0.0):
+        self.broadcast = broadcast  # broadcast(message, sender=None)
+        self.window = window
+        self._pending = {}  # { 'id': 'join' | 'leave' } (들어온 순서 유지)
+        self._timer = None
+        self._lock = Lock()
+
+    def joined(self, user_id, session=None):
+        """user_id가 접속했음을 알립니다. 바로 보낼 때는 session(본인)에게는 보내지 않습니다."""
+        if self.window <= 0:
+            self.broadcast(Message('USER_JOIN', trailing=user_id), sender=session)
+        else:
+            self._add(user_id, 'join')
+
+    def left(self, user_id):
+        if self.window <= 0:
+            self.broadcast(Message('USER_LEAVE', trailing=user_id))
+        else:
+            self._add(user_id, 'leave')
+
+    def _add(self, user_id, action):
+        with self._lock:
+            self._pending.pop(user_id, None)
+            self._pending[user_id] = action
+            if self._timer is None:
+                self._timer = Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """모아 둔 변화를 보냅니다."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._timer = None
+        leaves = [user_id for user_id, action in pending.items() if action == 'leave']
+        joins = [user_id for user_id, action in pending.items() if action == 'join']
+        if leaves:
+            self.broadcast(Message('USER_LEAVE', trailing=','.join(leaves)))
+        if joins:
+            self.broadcast(Message('USER_JOIN', trailing=','.join(joins)))
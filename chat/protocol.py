@@ -0,0 +1,256 @@
+# protocol.py
+"""
+채팅 프로토콜 메시지의 텍스트/바이너리 인코딩.
+
+텍스트 형식(버전 1)은 "COMMAND param1 param2 ... :trailing\\n" 한 줄입니다.
+바이너리 형식(버전 2)은 길이가 앞에 붙은 프레임입니다.
+
+    +----------------+--------+--------+---------+---------------------------------+
+    | 본문 길이 (4)   | 명령 (1) | 플래그 (1) | 인자 수 (1) | 본문: 인자들과 trailing을 \\0으로 연결 |
+    +----------------+--------+--------+---------+---------------------------------+
+
+- 길이는 big-endian 부호 없는 정수이며 MAX_FRAME_BYTES 미만입니다. (그래서 첫 바이트는 항상 0입니다)
+- 명령은 COMMAND_CODES의 번호입니다. 0이면 첫 번째 인자가 명령 이름입니다. (표에 없는 명령)
+- 플래그 FLAG_TRAILING이면 마지막 필드가 trailing이고, FLAG_COMPRESSED이면 본문이 zlib으로 압축되어 있습니다.
+- 인자에는 \\0이 들어갈 수 없지만 trailing에는 \\0과 개행문자가 들어가도 됩니다.
+
+클라이언트가 "LOGIN <id> 2"로 버전 2를 제안하면 서버는 LOGIN_SUCCESS/LOGIN_FAIL부터 프레임으로 답하고,
+이후 양쪽 모두 프레임만 보냅니다. 버전 2를 모르는 서버는 추가 인자를 무시하고 텍스트로 답하므로,
+클라이언트는 첫 응답의 첫 바이트(프레임이면 0)로 서버가 받아들였는지 알 수 있습니다.
+"""
+import struct
+import zlib
+
+from line_buffer import LineBuffer, LineTooLongError, INITIAL_CAPACITY
+
+PROTOCOL_TEXT = 1
+PROTOCOL_BINARY = 2
+
+COMMAND_CODES = {
+    # 클라이언트 -> 서버
+    'LOGIN': 1, 'SPELL_CHECK': 2, 'SPELL_CHECK_BATCH': 3, 'SPELL_CHECK_STREAM': 4,
+    'QUIZ': 5, 'QUIZ_ANSWER': 6, 'P_MSG': 7, 'JOIN_ROOM': 8, 'LEAVE_ROOM': 9, 'ROOM_MSG': 10,
+    'QUIT': 11, 'STATS': 12, 'PROFILE': 13,
+    # 서버 -> 클라이언트
+    'LOGIN_SUCCESS': 64, 'LOGIN_FAIL': 65, 'SPELL_RESULT': 66, 'SPELL_RESULT_PART': 67,
+    'SPELL_RESULT_END': 68, 'SPELL_RESULT_BATCH': 69, 'MSG_RECV': 70, 'JOIN_SUCCESS': 71,
+    'ROOM_MSG_RECV': 72, 'USER_LIST': 73, 'USER_JOIN': 74, 'USER_LEAVE': 75, 'STATS_RESULT': 76,
+    'SPELL_BUSY': 77, 'PROFILE_RESULT': 78,
+}
+COMMAND_NAMES = {code: name for name, code in COMMAND_CODES.items()}
+
+HEADER = struct.Struct('!IBBB')
+FLAG_COMPRESSED = 0x01
+FLAG_TRAILING = 0x02
+MAX_FRAME_BYTES = 1 << 24
+# 본문이 이 크기(바이트) 이상이면 zlib으로 압축합니다. 0이면 압축하지 않습니다. (서버/클라이언트가 설정)
+compress_threshold = 1024
+COMPRESS_LEVEL = 1  # 채팅/맞춤법 텍스트는 낮은 레벨로도 충분히 줄어들고 CPU를 적게 씁니다.
+
+def parse_message(msg_str):
+    """텍스트 프로토콜 메시지 파싱: CMD param1 ... :trailing"""
+    msg_str = msg_str.strip()
+    if ' :' in msg_str:
+        parts, trailing = msg_str.split(' :', 1)
+    else:
+        parts, trailing = msg_str, None
+    tokens = parts.split()
+    command = tokens[0].upper()
+    params = tokens[1:]
+    return command, params, trailing
+
+def encode_text(command, params=(), trailing=None):
+    line = ' '.join((command, *params)) if params else command
+    if trailing is not None:
+        line = f"{line} :{trailing}"
+    if '\n' in line or '\r' in line:
+        # 바이너리 프레임으로 받은 여러 줄 텍스트를 텍스트 클라이언트에게 보낼 때는 한 줄로 만듭니다.
+        line = line.replace('\r', ' ').replace('\n', ' ')
+    return (line + '\n').encode()
+
+def encode_frame(command, params=(), trailing=None):
+    code = COMMAND_CODES.get(command, 0)
+    fields = list(params) if code else [command, *params]
+    flags = 0
+    if trailing is not None:
+        fields.append(trailing)
+        flags |= FLAG_TRAILING
+    body = '\0'.join(fields).encode()
+    if compress_threshold and len(body) >= compress_threshold:
+        compressed = zlib.compress(body, COMPRESS_LEVEL)
+        if len(compressed) < len(body):
+            body = compressed
+            flags |= FLAG_COMPRESSED
+    nparams = len(fields) - (1 if trailing is not None else 0)
+    if nparams > 255:
+        raise ValueError(f"인자가 너무 많습니다: {nparams}개")
+    if len(body) >= MAX_FRAME_BYTES:
+        raise ValueError(f"프레임이 너무 큽니다: {len(body)} 바이트")
+    return HEADER.pack(len(body), code, flags, nparams) + body
+
+class Message:
+    """
+    서버가 보내는 메시지 하나. 텍스트 줄과 바이너리 프레임은 처음 필요할 때 한 번만 만들어
+    같은 메시지를 받는 모든 연결이 함께 씁니다. (방송할 때 연결마다 다시 인코딩하지 않습니다)
+    """
+    __slots__ = ('command', 'params', 'trailing', '_text', '_frame')
+
+    def __init__(self, command, *params, trailing=None):
+        self.command = command
+        self.params = params
+        self.trailing = trailing
+        self._text = None
+        self._frame = None
+
+    @classmethod
+    def parse(cls, line):
+        command, params, trailing = parse_message(line)
+        return cls(command, *params, trailing=trailing)
+
+    def to_fields(self):
+        """JSON으로 보낼 수 있는 [command, params, trailing] (서버 워커 사이의 메시지 버스에 사용)"""
+        return [self.command, list(self.params), self.trailing]
+
+    @classmethod
+    def from_fields(cls, fields):
+        command, params, trailing = fields
+        return cls(command, *params, trailing=trailing)
+
+    def text(self):
+        if self._text is None:
+            self._text = encode_text(self.command, self.params, self.trailing)
+        return self._text
+
+    def frame(self):
+        if self._frame is None:
+            self._frame = encode_frame(self.command, self.params, self.trailing)
+        return self._frame
+
+    def encode(self, binary):
+        return self.frame() if binary else self.text()
+
+    def __str__(self):
+        return self.text().decode().rstrip('\n')
+
+class FrameBuffer:
+    """
+    바이너리 프레임 수신 버퍼. LineBuffer와 같은 방식(get_buffer/buffer_updated/recv_from)으로 받고,
+    완성된 프레임을 (command, params, trailing)으로 꺼냅니다.
+    """
+
+    def __init__(self, max_frame_length=MAX_FRAME_BYTES, initial=b''):
+        self.max_frame_length = min(max_frame_length, MAX_FRAME_BYTES - 1)
+        self._buffer = bytearray(max(INITIAL_CAPACITY, len(initial)))
+        self._buffer[:len(initial)] = initial
+        self._start = 0
+        self._end = len(initial)
+
+    def __len__(self):
+        return self._end - self._start
+
+    def get_buffer(self, sizehint=-1):
+        if self._end == len(self._buffer):
+            self._make_room()
+        return memoryview(self._buffer)[self._end:]
+
+    def buffer_updated(self, nbytes):
+        self._end += nbytes
+
+    def recv_from(self, sock):
+        with self.get_buffer() as view:
+            nbytes = sock.recv_into(view)
+        self.buffer_updated(nbytes)
+        return nbytes
+
+    def _frame_length(self):
+        """다음 프레임 본문 길이. 헤더가 아직 다 오지 않았으면 None."""
+        if self._end - self._start < HEADER.size:
+            return None
+        length = HEADER.unpack_from(self._buffer, self._start)[0]
+        if length > self.max_frame_length:
+            raise LineTooLongError(f"프레임이 최대 길이({self.max_frame_length} 바이트)를 넘었습니다.")
+        return length
+
+    def next_frame(self):
+        """완성된 프레임 하나를 (command, params, trailing)으로 반환합니다. 없으면 None."""
+        length = self._frame_length()
+        if length is None or self._end - self._start < HEADER.size + length:
+            return None
+        _, code, flags, nparams = HEADER.unpack_from(self._buffer, self._start)
+        body_start = self._start + HEADER.size
+        body = bytes(self._buffer[body_start:body_start + length])
+        self._start = body_start + length
+        if self._start == self._end:
+            self._start = self._end = 0
+        if flags & FLAG_COMPRESSED:
+            decompressor = zlib.decompressobj()
+            body = decompressor.decompress(body, self.max_frame_length + 1)
+            if len(body) > self.max_frame_length or decompressor.unconsumed_tail:
+                raise LineTooLongError(f"압축을 푼 프레임이 최대 길이({self.max_frame_length} 바이트)를 넘었습니다.")
+        fields = body.decode('utf-8', 'replace').split('\0', nparams)
+        trailing = fields.pop() if flags & FLAG_TRAILING else None
+        params = fields[:nparams]
+        command = COMMAND_NAMES.get(code) if code else (params.pop(0).upper() if params else '')
+        return command or '', params, trailing
+
+    def frames(self):
+        while True:
+            frame = self.next_frame()
+            if frame is None:
+                return
+            yield frame
+
+    def _make_room(self):
+        pending = self._end - self._start
+        if self._start > 0:
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._start, self._end = 0, pending
+            if pending < len(self._buffer):
+                return
+        # 다음 프레임 전체가 들어갈 만큼 늘립니다. (최대 길이를 넘는 프레임은 _frame_length에서 거부)
+        length = self._frame_length()
+        needed = HEADER.size + (length if length is not None else 0)
+        capacity = max(len(self._buffer) * 2, needed)
+        grown = bytearray(capacity)
+        grown[:pending] = self._buffer[:pending]
+        self._buffer = grown
+
+class MessageReader:
+    """
+    연결 하나의 수신 버퍼. 처음에는 텍스트 줄을 읽고, switch_to_binary() 이후에는 프레임을 읽습니다.
+    (이미 받았지만 아직 처리하지 않은 바이트는 프레임 버퍼로 넘어갑니다)
+    """
+
+    def __init__(self, max_length):
+        self.max_length = max_length
+        self.binary = False
+        self._buffer = LineBuffer(max_length)
+
+    def get_buffer(self, sizehint=-1):
+        return self._buffer.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes):
+        self._buffer.buffer_updated(nbytes)
+
+    def recv_from(self, sock):
+        return self._buffer.recv_from(sock)
+
+    def next_message(self):
+        """
+        완성된 메시지 하나를 (command, params, trailing, raw)로 반환합니다. 없으면 None.
+        raw는 받은 텍스트 줄이며 프레임이면 None입니다. 빈 줄은 건너뜁니다.
+        """
+        if self.binary:
+            frame = self._buffer.next_frame()
+            return None if frame is None else (*frame, None)
+        while True:
+            line = self._buffer.next_line()
+            if line is None:
+                return None
+            if line.strip():
+                return (*parse_message(line), line)
+
+    def switch_to_binary(self):
+        if not self.binary:
+            self._buffer = FrameBuffer(self.max_length, self._buffer.take_pending())
+            self.binary = True
@@ -0,0 +1,199 @@
+# server_log.py
+"""
+서버 로그를 호출한 스레드에서 바로 쓰지 않고 큐에 넣어 두면 백그라운드 스레드 하나가 콘솔과 파일에 기록합니다.
+
+메시지 중계 경로에서 print()를 부르면 모든 연결 스레드가 stdout 잠금을 기다리며 줄을 섰지만,
+이제 호출한 쪽은 LogRecord를 큐에 넣기만 하고 문자열 포맷도 기록 스레드에서 합니다.
+큐가 가득 차면(기록이 밀리면) 기다리지 않고 레코드를 버립니다.
+
+로그는 카테고리별 로거(chat.system, chat.recv ...)로 남기며, 콘솔에는 기존처럼 "[SYSTEM] 메시지" 형식으로,
+파일에는 한 줄에 JSON 하나(JSON Lines)로 기록하고 크기가 넘으면 파일을 교체(rotate)합니다.
+수신 메시지처럼 양이 많은 카테고리는 SampledLogger로 N개 중 하나만, 초당 최대 개수까지만 남길 수 있습니다.
+"""
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+LOGGER_NAME = 'chat'
+
+_listener = None
+_listener_pid = None
+_queue_handler = None
+_console = True
+
+def get_logger(category):
+    """카테고리 로거를 반환합니다. 콘솔에는 [CATEGORY] 태그로 표시됩니다."""
+    return logging.getLogger(f'{LOGGER_NAME}.{category}')
+
+def _category(record):
+    return record.name.rsplit('.', 1)[-1]
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        text = f"[{_category(record).upper()}] {record.getMessage()}"
+        if record.exc_info:
+            text += '\n' + self.formatException(record.exc_info)
+        return text
+
+class JsonLinesFormatter(logging.Formatter):
+    """레코드 하나를 JSON 한 줄로 만듭니다. extra={'fields': {...}}로 넘긴 값은 그대로 필드가 됩니다."""
+
+    def format(self, record):
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created))
+                    + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'category': _category(record),
+            'message': record.getMessage(),
+            'pid': record.process,
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    레코드를 포맷하지 않고 그대로 큐에 넣습니다. (포맷은 기록 스레드에서 합니다)
+    큐가 가득 차 있으면 기다리지 않고 버리고 dropped만 늘립니다.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # 큐가 가득 차 있어도 종료 신호는 버리지 않습니다.
+        self.queue.put(self._sentinel)
+
+class Sampler:
+    """
+    N개 중 하나만 통과시키는 샘플링과 초당 최대 개수 제한.
+    잠금 없이 카운터만 세므로 여러 스레드가 동시에 부르면 개수는 대략적입니다.
+    """
+
+    def __init__(self, every=1, rate=0):
+        self.every = max(1, every)
+        self.rate = rate  # 초당 최대 개수 (0이면 제한 없음)
+        self._counter = itertools.count()
+        self._second = 0
+        self._passed = 0
+        self.suppressed = 0  # 초당 제한으로 버려진 뒤 아직 보고하지 않은 개수
+
+    def allow(self):
+        if self.every > 1 and next(self._counter) % self.every:
+            return False
+        if self.rate > 0:
+            second = int(time.monotonic())
+            if second != self._second:
+                self._second, self._passed = second, 0
+            if self._passed >= self.rate:
+                self.suppressed += 1
+                return False
+            self._passed += 1
+        return True
+
+class SampledLogger:
+    """
+    Sampler를 통과한 호출만 로그로 남깁니다. 레코드를 만들기 전에 검사하므로 버려지는 호출은 비용이 거의 없습니다.
+    초당 제한으로 버려진 로그가 있으면 다음에 남기는 레코드의 suppressed 필드로 알려 줍니다.
+    """
+
+    def __init__(self, category, every=1, rate=0):
+        self.logger = get_logger(category)
+        self.sampler = Sampler(every, rate)
+
+    def log(self, level, msg, *args, fields=None):
+        if not self.logger.isEnabledFor(level) or not self.sampler.allow():
+            return
+        suppressed, self.sampler.suppressed = self.sampler.suppressed, 0
+        if suppressed:
+            fields = dict(fields or {}, suppressed=suppressed)
+        self.logger.log(level, msg, *args, extra={'fields': fields})
+
+    def debug(self, msg, *args, fields=None):
+        self.log(logging.DEBUG, msg, *args, fields=fields)
+
+    def info(self, msg, *args, fields=None):
+        self.log(logging.INFO, msg, *args, fields=fields)
+
+def setup_logging(level='INFO', console=True, path=None, max_bytes=10 * 1024 * 1024, backups=5,
+                  queue_size=10000):
+    """
+    chat 로거에 큐 핸들러를 달고 기록 스레드를 시작합니다.
+    fork한 자식 프로세스에서는 부모의 기록 스레드가 없으므로 다시 호출해 새 큐와 스레드를 만들어야 합니다.
+    """
+    global _listener, _listener_pid, _queue_handler, _console
+    logger = logging.getLogger(LOGGER_NAME)
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    _console = console
+
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(ConsoleFormatter())
+        handlers.append(console_handler)
+    if path:
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                            encoding='utf-8')
+        file_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(file_handler)
+
+    log_queue = queue.Queue(queue_size)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    logger.addHandler(_queue_handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+    _listener = _QueueListener(log_queue, *handlers)
+    _listener_pid = os.getpid()
+    _listener.start()
+
+def _reset_after_fork():
+    """
+    fork한 자식 프로세스에는 기록 스레드가 없으므로 큐 핸들러를 떼고,
+    setup_logging()을 다시 부를 때까지(맞춤법 검사 워커처럼 부르지 않으면 계속) 콘솔에 바로 씁니다.
+    """
+    global _listener, _queue_handler
+    if _queue_handler is None:
+        return
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.removeHandler(_queue_handler)
+    _listener = _queue_handler = None
+    if _console:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(ConsoleFormatter())
+        logger.addHandler(handler)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 기록하고 기록 스레드를 멈춥니다."""
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+    _listener = None
+
+def dropped_records():
+    """큐가 가득 차 버려진 로그 레코드 수"""
+    return _queue_handler.dropped if _queue_handler else 0
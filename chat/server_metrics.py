@@ -0,0 +1,104 @@
+# server_metrics.py
+"""
+서버 동작 지표(카운터와 지연 시간 히스토그램)를 메모리에 모읍니다.
+
+운영 중에도 켜 둘 수 있도록 기록은 잠금 한 번과 정수 덧셈만 합니다.
+히스토그램은 고정된 구간(버킷)별 개수만 세므로 관측값을 저장하지 않고,
+백분위수는 조회할 때 버킷 경계로 추정합니다.
+"""
+import bisect
+import time
+from threading import Lock
+
+# 지연 시간 버킷의 상한(초). 마지막 버킷은 그보다 긴 모든 값입니다.
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+class LatencyHistogram:
+    """지연 시간 히스토그램. (스레드 안전)"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.labels = [f'{bound * 1000:g}' for bound in bounds] + ['inf']  # 버킷 상한(밀리초)
+        self._counts = [0] * (len(bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = Lock()
+
+    def observe(self, seconds):
+        bucket = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self._counts[bucket] += 1
+            self._count += 1
+            self._sum += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    def _percentile(self, counts, total, max_time, fraction):
+        """fraction 위치의 값이 들어 있는 버킷의 상한(밀리초). 마지막 버킷이면 최댓값."""
+        rank = fraction * total
+        seen = 0
+        for bucket, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                bound = self.bounds[bucket] if bucket < len(self.bounds) else max_time
+                return round(min(bound, max_time) * 1000, 3)
+        return round(max_time * 1000, 3)
+
+    def snapshot(self):
+        with self._lock:
+            counts, total, total_time, max_time = list(self._counts), self._count, self._sum, self._max
+        if not total:
+            return {'count': 0}
+        return {
+            'count': total,
+            'mean_ms': round(total_time / total * 1000, 3),
+            'p50_ms': self._percentile(counts, total, max_time, 0.50),
+            'p95_ms': self._percentile(counts, total, max_time, 0.95),
+            'p99_ms': self._percentile(counts, total, max_time, 0.99),
+            'max_ms': round(max_time * 1000, 3),
+            # { '상한(밀리초)': 개수 } (비어 있는 버킷은 생략)
+            'buckets': {label: count for label, count in zip(self.labels, counts) if count},
+        }
+
+class Metrics:
+    """
+    이름별 카운터와 지연 시간 히스토그램 모음. (스레드 안전)
+    이름은 코드에서 정한 고정된 값만 써야 합니다. (클라이언트가 보낸 값을 그대로 쓰면 항목이 끝없이 늘어납니다)
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._counters = {}
+        self._histograms = {}
+        self._lock = Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def histogram(self, name):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def observe(self, name, seconds):
+        """name 히스토그램에 지연 시간(초)을 기록합니다."""
+        self.histogram(name).observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = dict(self._histograms)
+        return {
+            'time': time.time(),
+            'uptime': round(time.time() - self.started, 1),
+            'counters': counters,
+            'latency': {name: histogram.snapshot() for name, histogram in sorted(histograms.items())},
+        }
@@ -0,0 +1,194 @@
+# server_profiler.py
+"""
+운영 중인 서버를 재시작하지 않고 정해진 시간 동안만 프로파일링합니다.
+
+샘플링 방식입니다. 프로파일링하는 동안만 도는 스레드가 SAMPLE_INTERVAL마다 sys._current_frames()로
+모든 스레드(연결 스레드, asyncio 이벤트 루프, 맞춤법 검사 스레드 ...)의 호출 스택을 읽어 셉니다.
+다른 스레드에 훅을 걸지 않으므로 꺼져 있을 때는 비용이 없습니다.
+(cProfile은 Python 3.12 미만에서 켠 스레드만 측정하므로 모든 연결 스레드를 볼 수 없습니다)
+
+벽시계 기준 샘플이라 잠금이나 소켓을 기다리는 스레드도 셉니다. 맨 위 프레임은 줄 번호까지 기록하므로
+어느 `with lock:`이나 recv에서 기다렸는지 알 수 있습니다.
+
+결과 파일 (output_dir 아래, 이름에 PID와 시작 시각이 붙습니다. 최근 keep번의 실행 결과만 남기고 지웁니다)
+- profile-*.folded: "스레드;함수;...;함수 샘플 수" 형식의 접힌 스택 (flamegraph.pl, speedscope에서 열 수 있음)
+- profile-*.txt: 함수별 자체/누적 샘플 비율과 스레드별 샘플 수
+- memory-*.txt: (trace_memory) 프로파일링하는 동안 할당되어 끝날 때 남아 있는 메모리의 할당 위치 상위 목록
+"""
+import os
+import re
+import sys
+import time
+import threading
+import tracemalloc
+from collections import Counter
+
+from server_log import get_logger
+
+log = get_logger('system')
+
+SAMPLE_INTERVAL = 0.01  # 초 (100Hz)
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 30
+RESULT_FILE = re.compile(r'^(?:profile|memory)-(\d+-\d{8}-\d{6})\.(?:folded|txt)$')  # 실행 하나의 결과 파일
+
+class ProfilerBusy(Exception):
+    """이미 프로파일링 중입니다."""
+
+def thread_group(name):
+    """스레드 이름에서 번호를 뗀 이름 (spell_0, Thread-12 (client_communication_thread) 같은 스레드를 함께 셉니다)"""
+    if name.startswith('Thread-') and '(' in name:
+        return name[name.index('(') + 1:].rstrip(')')
+    return name.rstrip('0123456789_-') or name
+
+class SamplingProfiler:
+    """한 번에 하나의 프로파일링만 실행합니다. (스레드 안전)"""
+
+    def __init__(self, output_dir, keep=10, interval=SAMPLE_INTERVAL):
+        self.output_dir = output_dir
+        self.keep = max(1, keep)
+        self.interval = interval
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, seconds, trace_memory=False, on_finished=None):
+        """
+        seconds초 동안 프로파일링을 시작하고 바로 돌아갑니다. 이미 실행 중이면 ProfilerBusy.
+        끝나면 결과 파일을 쓰고 on_finished(result)를 호출합니다. (result: 파일 경로와 요약이 담긴 dict)
+        """
+        with self._lock:
+            if self._thread is not None:
+                raise ProfilerBusy("이미 프로파일링 중입니다.")
+            self._thread = threading.Thread(target=self._run, args=(seconds, trace_memory, on_finished),
+                                            name='profiler', daemon=True)
+            self._thread.start()
+
+    def _run(self, seconds, trace_memory, on_finished):
+        try:
+            result = self._profile(seconds, trace_memory)
+        except Exception as e:
+            log.exception("프로파일링 실패")
+            result = {'error': str(e)}
+        finally:
+            with self._lock:
+                self._thread = None
+        if on_finished:
+            on_finished(result)
+
+    def _profile(self, seconds, trace_memory):
+        log.info("프로파일링 시작: %.1f초%s", seconds, " (메모리 할당 추적 포함)" if trace_memory else "")
+        # 이미 PYTHONTRACEMALLOC 등으로 추적 중이면 그대로 두고 스냅샷만 찍습니다.
+        started_memory = trace_memory and not tracemalloc.is_tracing()
+        if started_memory:
+            tracemalloc.start()
+        try:
+            stacks, samples, elapsed = self._sample(seconds)
+            snapshot = tracemalloc.take_snapshot() if trace_memory else None
+        finally:
+            if started_memory:
+                tracemalloc.stop()
+        result = self._write_results(stacks, samples, elapsed, snapshot)
+        log.info("프로파일링 완료: 샘플 %d회, %s", samples, ', '.join(result['files']))
+        self._prune()
+        return result
+
+    def _prune(self):
+        """output_dir에 최근 keep번의 실행 결과만 남깁니다. (실행 하나 = 같은 PID-시각의 파일들)"""
+        runs = {}  # { 'PID-시각': [경로, ...] }
+        for name in os.listdir(self.output_dir):
+            match = RESULT_FILE.match(name)
+            if match:
+                runs.setdefault(match.group(1), []).append(os.path.join(self.output_dir, name))
+        if len(runs) <= self.keep:
+            return
+        newest_first = sorted(runs.values(), key=lambda paths: max(os.path.getmtime(path) for path in paths),
+                              reverse=True)
+        for paths in newest_first[self.keep:]:
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    log.warning("이전 프로파일 결과 삭제 실패: %s", e)
+
+    def _sample(self, seconds):
+        """
+        { ((스레드, 바깥 함수, ..., 맨 위 함수), 맨 위 줄 번호): 샘플 수 }, 샘플링 횟수, 걸린 시간(초)
+        함수 이름은 "함수 (파일)" 형식입니다.
+        """
+        me = threading.get_ident()
+        labels = {}  # 코드 객체 -> 함수 이름
+        stacks = Counter()
+        samples = 0
+        started = time.monotonic()
+        deadline = started + seconds
+        while True:
+            names = {thread.ident: thread_group(thread.name) for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                line = frame.f_lineno
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)})"
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(names.get(ident, 'unknown'))
+                stacks[tuple(reversed(stack)), line] += 1
+            samples += 1
+            now = time.monotonic()
+            if now >= deadline:
+                return stacks, samples, now - started
+            time.sleep(min(self.interval, deadline - now))
+
+    def _write_results(self, stacks, samples, elapsed, snapshot):
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = f"{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}"
+        folded_path = os.path.join(self.output_dir, f"profile-{prefix}.folded")
+        summary_path = os.path.join(self.output_dir, f"profile-{prefix}.txt")
+        total = sum(stacks.values())
+        own, inclusive, threads = Counter(), Counter(), Counter()
+        with open(folded_path, 'w', encoding='utf-8') as f:
+            for (stack, line), count in stacks.most_common():
+                leaf = f"{stack[-1][:-1]}:{line})"  # "함수 (파일:줄)"
+                f.write(f"{';'.join(stack[:-1])};{leaf} {count}\n")
+                threads[stack[0]] += count
+                own[stack[-1]] += count
+                for label in set(stack[1:]):
+                    inclusive[label] += count
+        top = [{'function': label, 'own': round(count / total * 100, 1) if total else 0.0,
+                'total': round(inclusive[label] / total * 100, 1) if total else 0.0}
+               for label, count in own.most_common(TOP_FUNCTIONS)]
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(f"# 샘플링 프로파일: {elapsed:.1f}초, {samples}회 x 스레드 = 스택 {total}개 "
+                    f"({self.interval * 1000:g}ms 간격, 벽시계 기준)\n\n")
+            f.write("## 함수별 샘플 (자체% / 누적%)\n")
+            for entry in top:
+                f.write(f"{entry['own']:6.1f} {entry['total']:6.1f}  {entry['function']}\n")
+            f.write("\n## 누적 샘플 상위 함수 (누적%)\n")
+            for label, count in inclusive.most_common(TOP_FUNCTIONS):
+                f.write(f"{count / total * 100 if total else 0:6.1f}  {label}\n")
+            f.write("\n## 스레드별 샘플\n")
+            for name, count in threads.most_common():
+                f.write(f"{count:8d}  {name}\n")
+        files = [folded_path, summary_path]
+        result = {'seconds': round(elapsed, 2), 'samples': samples, 'files': files, 'top': top[:10]}
+        if snapshot is not None:
+            memory_path = os.path.join(self.output_dir, f"memory-{prefix}.txt")
+            # 프로파일러가 샘플을 모으느라 할당한 메모리는 빼고 봅니다.
+            snapshot = snapshot.filter_traces([tracemalloc.Filter(False, __file__),
+                                               tracemalloc.Filter(False, tracemalloc.__file__)])
+            statistics = snapshot.statistics('lineno')
+            with open(memory_path, 'w', encoding='utf-8') as f:
+                f.write(f"# 메모리 할당 위치 상위 {TOP_ALLOCATIONS}개: 프로파일링하는 동안 할당되어 남아 있는 메모리 "
+                        f"{sum(stat.size for stat in statistics) / 1024:.1f} KiB\n\n")
+                for stat in statistics[:TOP_ALLOCATIONS]:
+                    f.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d}개  {stat.traceback}\n")
+            files.append(memory_path)
+        return result
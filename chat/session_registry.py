@@ -0,0 +1,131 @@
+# session_registry.py
+import socket
+from threading import Lock
+
+from outbound_queue import OutboundQueue
+from server_log import get_logger
+
+log = get_logger('system')
+
+class Session:
+    """연결 하나의 상태. 접속자 수만큼 만들어지므로 __slots__로 인스턴스 크기를 줄입니다."""
+    __slots__ = ('sock', 'addr', 'user_id', 'rooms', 'outbox', 'binary', 'spell_bucket')
+
+    def __init__(self, sock, addr, max_outbound_bytes, overflow_policy, on_ready=None):
+        self.sock = sock
+        self.addr = addr
+        self.user_id = None   # LOGIN 전에는 None
+        self.rooms = set()    # 입장한 채팅방 이름
+        # 보낼 메시지는 송신 큐에 쌓이고 쓰기 담당(전용 스레드 또는 이벤트 루프)이 비웁니다.
+        self.outbox = OutboundQueue(max_outbound_bytes, overflow_policy, on_ready, self._overflow)
+        self.binary = False   # LOGIN에서 바이너리 프레임(프로토콜 버전 2)을 협상했는지 여부
+        self.spell_bucket = None  # 맞춤법 검사 요청 속도 제한용 TokenBucket (첫 요청 때 생성)
+
+    def send(self, message):
+        """메시지(protocol.Message)를 이 연결의 프로토콜로 인코딩해 송신 큐에 넣고 바로 돌아갑니다."""
+        self.outbox.put(message.encode(self.binary))
+
+    def _overflow(self):
+        log.warning("송신 큐 초과: %s의 연결을 끊습니다.", self.user_id or self.addr)
+        try:
+            # 읽기 중인 스레드도 깨어나도록 close() 대신 shutdown()을 사용합니다.
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+class SessionRegistry:
+    """
+    접속 중인 세션을 소켓과 사용자 ID 양쪽으로 찾을 수 있게 보관하고, 채팅방 멤버도 함께 관리합니다. (스레드 안전)
+    조회, 로그인, 연결 종료 정리가 모두 전체 사용자 수나 채팅방 수와 무관하게 O(1)입니다.
+    (연결 종료 시에는 그 사용자가 입장한 채팅방만 정리합니다.)
+    """
+
+    def __init__(self, max_outbound_bytes, overflow_policy='disconnect'):
+        self.max_outbound_bytes = max_outbound_bytes
+        self.overflow_policy = overflow_policy
+        self._by_sock = {}  # { socket: Session }
+        self._by_id = {}    # { 'id': Session } (로그인한 세션만)
+        self._rooms = {}    # { 'room_name': {Session, ...} }
+        self._lock = Lock()
+
+    def add(self, sock, addr, on_ready=None):
+        """새 연결의 세션을 만듭니다. on_ready는 송신 큐에 보낼 메시지가 생겼을 때 호출됩니다."""
+        session = Session(sock, addr, self.max_outbound_bytes, self.overflow_policy, on_ready)
+        with self._lock:
+            self._by_sock[sock] = session
+        return session
+
+    def get(self, sock):
+        return self._by_sock.get(sock)
+
+    def find(self, user_id):
+        """사용자 ID로 로그인한 세션을 찾습니다. 없으면 None."""
+        return self._by_id.get(user_id)
+
+    def login(self, session, user_id):
+        """세션에 사용자 ID를 부여합니다. 이미 사용 중인 ID면 False를 반환합니다."""
+        with self._lock:
+            if user_id in self._by_id:
+                return False
+            session.user_id = user_id
+            self._by_id[user_id] = session
+        return True
+
+    def remove(self, sock):
+        """연결이 끊긴 세션을 사용자 목록과 입장한 채팅방에서 제거하고 반환합니다."""
+        with self._lock:
+            session = self._by_sock.pop(sock, None)
+            if session is None:
+                return None
+            if session.user_id is not None:
+                self._by_id.pop(session.user_id, None)
+            for room_name in session.rooms:
+                self._leave(session, room_name)
+        return session
+
+    def join(self, session, room_name):
+        with self._lock:
+            self._rooms.setdefault(room_name, set()).add(session)
+            session.rooms.add(room_name)
+
+    def leave(self, session, room_name):
+        """채팅방에서 퇴장시킵니다. 입장해 있지 않았다면 False를 반환합니다."""
+        with self._lock:
+            if room_name not in session.rooms:
+                return False
+            session.rooms.discard(room_name)
+            self._leave(session, room_name)
+        return True
+
+    def _leave(self, session, room_name):
+        members = self._rooms.get(room_name)
+        if members is not None:
+            members.discard(session)
+            if not members:
+                del self._rooms[room_name]
+
+    def room_members(self, room_name):
+        with self._lock:
+            return list(self._rooms.get(room_name, ()))
+
+    def room_sizes(self):
+        """{ '채팅방 이름': 멤버 수 }"""
+        with self._lock:
+            return {room_name: len(members) for room_name, members in self._rooms.items()}
+
+    def sessions(self):
+        """로그인한 세션 목록 (복사본)"""
+        with self._lock:
+            return list(self._by_id.values())
+
+    def user_ids(self):
+        with self._lock:
+            return list(self._by_id)
+
+    def connections(self):
+        """로그인 여부와 관계없이 연결된 모든 소켓 (복사본)"""
+        with self._lock:
+            return list(self._by_sock)
+
+    def __len__(self):
+        return len(self._by_id)
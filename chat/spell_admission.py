@@ -0,0 +1,87 @@
+# spell_admission.py
+"""
+맞춤법 검사 요청의 입장 제어(admission control).
+
+추천 단어 계산은 CPU를 오래 쓰므로, 검사를 시작하기 전에 다음을 확인하고 넘으면 바로 거절합니다.
+거절된 요청은 대기열에 쌓이지 않으므로 검사 요청이 몰려도 채팅 중계는 CPU와 GIL을 계속 얻을 수 있습니다.
+
+- 텍스트 크기: 요청 하나의 텍스트 합계(바이트)
+- 모르는 단어 수: 요청 하나에서 사전에 없는(추천을 계산해야 하는) 서로 다른 단어 수
+- 세션별 속도: 토큰 버킷 (요청 하나에 토큰 하나)
+- 전체 동시 실행 수: 서버 전체에서 동시에 실행하거나 워커 풀에 보낸 검사 수
+"""
+import time
+from threading import Lock
+
+class SpellRejected(Exception):
+    """요청을 받아들이지 않은 이유. reason은 지표와 SPELL_BUSY에 쓰는 고정된 이름, 메시지는 클라이언트에게 보냅니다."""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+class TokenBucket:
+    """초당 rate개씩, 최대 burst개까지 채워지는 토큰 버킷. (스레드 안전)"""
+    __slots__ = ('rate', 'burst', '_tokens', '_updated', '_lock')
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def take(self, amount=1):
+        """토큰을 꺼내고 0을 반환합니다. 부족하면 꺼내지 않고 토큰이 찰 때까지 기다려야 할 시간(초)을 반환합니다."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0
+            return (amount - self._tokens) / self.rate
+
+class SpellAdmission:
+    """
+    맞춤법 검사 요청의 입장 제어. admit()이 통과하면 검사가 끝난 뒤 반드시 release()를 불러야 합니다.
+    0인 제한은 검사하지 않습니다.
+    """
+
+    def __init__(self, max_concurrent=0, rate=0, burst=1, max_text_bytes=0, max_unknown_words=0):
+        self.max_concurrent = max_concurrent
+        self.rate = rate
+        self.burst = burst
+        self.max_text_bytes = max_text_bytes
+        self.max_unknown_words = max_unknown_words
+        self.active = 0  # 실행 중이거나 워커 풀에 보낸 검사 수
+        self._lock = Lock()
+
+    def admit(self, session, texts, dictionary=None):
+        """
+        요청을 받아들이면 동시 실행 자리를 하나 차지하고, 아니면 SpellRejected를 발생시킵니다.
+        세션별 토큰 버킷은 session.spell_bucket에 처음 요청할 때 만듭니다.
+        """
+        if self.max_text_bytes:
+            size = sum(len(text.encode()) for text in texts)
+            if size > self.max_text_bytes:
+                raise SpellRejected('too_large', f"검사할 텍스트가 너무 깁니다. ({size}/{self.max_text_bytes} 바이트)")
+        if self.max_unknown_words and dictionary:
+            unknown = len(dictionary.unknown_words(texts))
+            if unknown > self.max_unknown_words:
+                raise SpellRejected('too_many_words',
+                                    f"사전에 없는 단어가 너무 많습니다. ({unknown}/{self.max_unknown_words}개)")
+        if self.rate > 0:
+            if session.spell_bucket is None:
+                session.spell_bucket = TokenBucket(self.rate, self.burst)
+            wait = session.spell_bucket.take()
+            if wait:
+                raise SpellRejected('rate_limited', f"맞춤법 검사 요청이 너무 잦습니다. {wait:.1f}초 후에 다시 시도하세요.")
+        with self._lock:
+            if self.max_concurrent and self.active >= self.max_concurrent:
+                raise SpellRejected('overloaded', "서버가 바쁩니다. 잠시 후에 다시 시도하세요.")
+            self.active += 1
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
@@ -1,10 +1,29 @@
 import time
 import re
+import bisect
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+def _open_if_snapshot(file_path):
+    """파일이 사전 스냅샷이면 연 스냅샷을, 아니면 None을 반환합니다."""
+    from dict_snapshot import is_snapshot, open_snapshot  # 순환 import 방지
+    if is_snapshot(file_path):
+        return open_snapshot(file_path)
+    return None
 
 def load_words(file_path):
     """
     사전 파일을 읽어 단어들을 set으로 반환합니다.
+    사전 스냅샷(dict_snapshot.py로 컴파일한 파일)이면 mmap 기반의 읽기 전용 단어 집합을 반환합니다.
     """
+    snapshot = _open_if_snapshot(file_path)
+    if snapshot is not None:
+        return snapshot.words
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             words = {line.strip() for line in f}
@@ -16,7 +35,11 @@ def load_words(file_path):
 def load_frequency_map(file_path):
     """
     단어 빈도 파일을 읽어 {단어: 빈도수} 딕셔너리를 반환합니다.
+    사전 스냅샷이면 mmap 기반의 읽기 전용 빈도 맵을 반환합니다.
     """
+    snapshot = _open_if_snapshot(file_path)
+    if snapshot is not None:
+        return snapshot.frequencies
     freq_map = {}
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
@@ -57,25 +80,430 @@ def levenshtein_distance(s1, s2):
         previous_row = current_row
     return previous_row[-1]
 
-def get_suggestions(word, word_set, freq_map, max_distance=2, limit=3):
+def bounded_levenshtein_distance(s1, s2, max_distance, transpositions=False):
+    """
+    max_distance 이하의 거리만 정확히 계산하는 레벤슈타인 거리입니다.
+    대각선 주변 max_distance 폭의 띠(band)만 채우고, 한 행의 최솟값이 max_distance를 넘으면 바로 종료합니다.
+    거리가 max_distance를 넘으면 max_distance + 1을 반환합니다.
+    transpositions가 True이면 인접 문자 교환을 1회 편집으로 계산합니다. (Damerau, OSA)
+    """
+    cap = max_distance + 1
+    len1, len2 = len(s1), len(s2)
+    if abs(len1 - len2) > max_distance:
+        return cap
+    if len1 == 0 or len2 == 0:
+        return max(len1, len2)
+
+    previous_row = [j if j <= max_distance else cap for j in range(len2 + 1)]
+    before_previous_row = None
+    for i in range(1, len1 + 1):
+        c1 = s1[i - 1]
+        current_row = [cap] * (len2 + 1)
+        if i <= max_distance:
+            current_row[0] = i
+        row_min = current_row[0]
+        for j in range(max(1, i - max_distance), min(len2, i + max_distance) + 1):
+            c2 = s2[j - 1]
+            dist = min(previous_row[j - 1] + (c1 != c2),  # 치환
+                       current_row[j - 1] + 1,            # 삽입
+                       previous_row[j] + 1)               # 삭제
+            if (transpositions and i > 1 and j > 1 and c1 != c2
+                    and c1 == s2[j - 2] and s1[i - 2] == c2):
+                dist = min(dist, before_previous_row[j - 2] + 1)
+            if dist > cap:
+                dist = cap
+            current_row[j] = dist
+            if dist < row_min:
+                row_min = dist
+        if row_min > max_distance:
+            return cap
+        before_previous_row, previous_row = previous_row, current_row
+    return previous_row[len2]
+
+def _encode_words(words, length):
+    """같은 길이의 단어 목록을 (단어 수, 길이) 모양의 유니코드 코드 포인트 배열로 변환합니다."""
+    codes = np.frombuffer(''.join(words).encode('utf-32-le'), dtype=np.uint32)
+    return codes.reshape(len(words), length)
+
+def batch_levenshtein_distance(word, codes, max_distance, transpositions=False):
+    """
+    길이가 같은 여러 후보 단어(codes 배열의 각 행)와 word 사이의 거리를 NumPy로 한 번에 계산합니다.
+    행 단위로 DP를 진행하며, 최솟값이 max_distance를 넘은 후보는 즉시 계산에서 제외합니다.
+    거리가 max_distance를 넘는 후보는 max_distance + 1로 채워진 배열을 반환합니다.
+    """
+    cap = max_distance + 1
+    count, length = codes.shape
+    distances = np.full(count, cap, dtype=np.int32)
+    if abs(len(word) - length) > max_distance:
+        return distances
+    if not word:
+        distances[:] = length
+        return distances
+
+    query = _encode_words([word], len(word))[0]
+    offsets = np.arange(length + 1, dtype=np.int32)
+    alive = np.arange(count)
+    previous_rows = np.broadcast_to(np.minimum(offsets, cap), (count, length + 1))
+    before_previous_rows = None
+    for i in range(1, len(word) + 1):
+        matches = codes == query[i - 1]
+        # 치환과 삭제는 이전 행만으로 한 번에 계산합니다.
+        best = np.minimum(previous_rows[:, :-1] + ~matches, previous_rows[:, 1:] + 1)
+        if transpositions and i > 1 and length > 1:
+            swapped = (~matches[:, 1:]
+                       & (codes[:, :-1] == query[i - 1])
+                       & (codes[:, 1:] == query[i - 2]))
+            best[:, 1:] = np.where(swapped,
+                                   np.minimum(best[:, 1:], before_previous_rows[:, :-2] + 1),
+                                   best[:, 1:])
+        # 삽입은 같은 행의 왼쪽 값에 의존하므로 누적 최솟값으로 전파합니다:
+        # current[j] = min_{t <= j}(base[t] + j - t)
+        base = np.empty((len(alive), length + 1), dtype=np.int32)
+        base[:, 0] = i
+        base[:, 1:] = best
+        current_rows = np.minimum(np.minimum.accumulate(base - offsets, axis=1) + offsets, cap)
+
+        keep = current_rows.min(axis=1) <= max_distance
+        if not keep.all():
+            alive, codes = alive[keep], codes[keep]
+            current_rows, previous_rows = current_rows[keep], previous_rows[keep]
+            if not len(alive):
+                return distances
+        before_previous_rows, previous_rows = previous_rows, current_rows
+    distances[alive] = previous_rows[:, length]
+    return distances
+
+class ArrayDictionary:
+    """
+    길이별로 묶은 사전 단어를 NumPy 배열로 인코딩해 두고, 같은 길이의 후보를 한 번에 채점하는 추천 백엔드.
+    인덱스를 만들 수 없는 환경에서 전체 사전 검색을 대신합니다.
+    """
+
+    def __init__(self, word_set, freq_map, transpositions=False):
+        self.freq_map = freq_map
+        self.transpositions = transpositions
+        self.buckets = {}  # { 길이: (['단어', ...], 코드 포인트 배열) }
+        by_length = {}
+        for word in word_set:
+            by_length.setdefault(len(word), []).append(word)
+        for length, words in by_length.items():
+            words.sort()
+            self.buckets[length] = (words, _encode_words(words, length))
+
+    def supports(self, max_distance):
+        return True
+
+    def add_word(self, word):
+        """단어가 속한 길이 묶음만 다시 인코딩합니다. 묶음은 통째로 교체되므로 검색 중인 스레드에 안전합니다."""
+        words, _ = self.buckets.get(len(word), ([], None))
+        position = bisect.bisect_left(words, word)
+        if position < len(words) and words[position] == word:
+            return
+        words = words[:position] + [word] + words[position:]
+        self.buckets[len(word)] = (words, _encode_words(words, len(word)))
+
+    def remove_word(self, word):
+        bucket = self.buckets.get(len(word))
+        if bucket is None:
+            return
+        words, codes = bucket
+        position = bisect.bisect_left(words, word)
+        if position < len(words) and words[position] == word:
+            words = words[:position] + words[position + 1:]
+            self.buckets[len(word)] = (words, np.delete(codes, position, axis=0))
+
+    def suggest(self, word, max_distance=2, limit=3):
+        """get_suggestions와 동일한 (거리, -빈도) 순서로 추천 단어를 반환합니다."""
+        suggestions = []
+        for length in range(max(0, len(word) - max_distance), len(word) + max_distance + 1):
+            bucket = self.buckets.get(length)
+            if bucket is None:
+                continue
+            words, codes = bucket
+            distances = batch_levenshtein_distance(word, codes, max_distance, self.transpositions)
+            for position in np.flatnonzero(distances <= max_distance):
+                correct_word = words[position]
+                frequency = self.freq_map.get(correct_word, 0)
+                suggestions.append((correct_word, int(distances[position]), frequency))
+
+        suggestions.sort(key=lambda x: (x[1], -x[2], x[0]))
+        return [s[0] for s in suggestions[:limit]]
+
+def build_array_dictionary(word_set, freq_map, transpositions=False):
+    """
+    NumPy 배열로 인코딩된 사전을 생성합니다. NumPy가 없으면 None을 반환합니다.
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    return ArrayDictionary(word_set, freq_map, transpositions)
+
+def generate_deletes(word, max_distance):
+    """
+    단어에서 최대 max_distance개의 문자를 삭제해 만들 수 있는 모든 변형을 반환합니다. (원본 포함)
+    """
+    deletes = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for variant in frontier:
+            for i in range(len(variant)):
+                deleted = variant[:i] + variant[i + 1:]
+                if deleted not in deletes:
+                    deletes.add(deleted)
+                    next_frontier.add(deleted)
+        frontier = next_frontier
+    return deletes
+
+class SuggestionIndex:
+    """
+    SymSpell 방식의 대칭 삭제(symmetric delete) 인덱스.
+    사전의 모든 단어에 대해 삭제 변형을 미리 계산해 두고, 오타의 삭제 변형과 겹치는 단어만 후보로 검사합니다.
+    """
+
+    def __init__(self, freq_map, max_distance=2):
+        self.freq_map = freq_map
+        self.max_distance = max_distance
+        self.deletes = {}  # { '삭제 변형': ['단어1', '단어2', ...] }
+
+    def supports(self, max_distance):
+        return max_distance <= self.max_distance
+
+    def add_word(self, word):
+        for deleted in generate_deletes(word, self.max_distance):
+            self.deletes.setdefault(deleted, []).append(word)
+
+    def remove_word(self, word):
+        for deleted in generate_deletes(word, self.max_distance):
+            bucket = self.deletes.get(deleted)
+            if bucket and word in bucket:
+                bucket.remove(word)
+                if not bucket:
+                    del self.deletes[deleted]
+
+    def candidates(self, word, max_distance):
+        """word와의 거리가 max_distance 이하일 수 있는 후보 단어 집합을 반환합니다."""
+        found = set()
+        for deleted in generate_deletes(word, max_distance):
+            bucket = self.deletes.get(deleted)
+            if bucket:
+                found.update(bucket)
+        return found
+
+    def suggest(self, word, max_distance=2, limit=3):
+        """get_suggestions와 동일한 (거리, -빈도) 순서로 추천 단어를 반환합니다."""
+        suggestions = []
+        for correct_word in self.candidates(word, max_distance):
+            dist = bounded_levenshtein_distance(word, correct_word, max_distance)
+            if dist <= max_distance:
+                frequency = self.freq_map.get(correct_word, 0)
+                suggestions.append((correct_word, dist, frequency))
+
+        suggestions.sort(key=lambda x: (x[1], -x[2], x[0]))
+        return [s[0] for s in suggestions[:limit]]
+
+def build_suggestion_index(word_set, freq_map, max_distance=2):
+    """
+    사전 단어 집합과 빈도 정보로 추천 단어 인덱스를 한 번 생성합니다.
+    """
+    index = SuggestionIndex(freq_map, max_distance)
+    for word in word_set:
+        index.add_word(word)
+    return index
+
+def get_suggestions(word, word_set, freq_map, max_distance=2, limit=3, index=None, cache=None):
     """
     오타에 대한 추천 단어 목록을 빈도를 고려하여 반환합니다.
+    index(SuggestionIndex, ArrayDictionary 등)가 주어지고 max_distance를 지원하면
+    전체 사전을 순회하지 않고 인덱스로 후보를 찾습니다.
+    word_set이 자체 인덱스를 가진 사전(스냅샷, DAWG)이면 index를 생략해도 그 인덱스를 사용합니다.
+    cache(SuggestionCache)가 주어지면 같은 (단어, max_distance, limit)의 결과를 재사용합니다.
     """
+    if cache is not None:
+        key = cache.make_key(word, max_distance, limit)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        # 계산 도중 사전이 바뀌면 이전 사전의 결과를 캐시에 넣지 않도록 세대를 함께 넘깁니다.
+        generation = cache.generation
+        suggestions = get_suggestions(word, word_set, freq_map, max_distance, limit, index)
+        cache.put(key, suggestions, generation)
+        return suggestions
+
+    if index is None:
+        index = getattr(word_set, 'suggestion_index', None)
+    if index is not None and index.supports(max_distance):
+        return index.suggest(word, max_distance, limit)
+
     suggestions = []
     for correct_word in word_set:
         if abs(len(word) - len(correct_word)) > max_distance:
             continue
             
-        dist = levenshtein_distance(word, correct_word)
+        dist = bounded_levenshtein_distance(word, correct_word, max_distance)
         if dist <= max_distance:
             # 단어의 빈도를 가져옵니다. 목록에 없으면 0으로 처리.
             frequency = freq_map.get(correct_word, 0)
             suggestions.append((correct_word, dist, frequency))
     
-    # 1순위: 거리(오름차순), 2순위: 빈도(내림차순)로 정렬
-    suggestions.sort(key=lambda x: (x[1], -x[2]))
+    # 1순위: 거리(오름차순), 2순위: 빈도(내림차순), 3순위: 단어(사전순)로 정렬
+    suggestions.sort(key=lambda x: (x[1], -x[2], x[0]))
     return [s[0] for s in suggestions[:limit]]
 
+class SpellDictionary:
+    """
+    단어 집합, 빈도 맵, 추천 인덱스를 한 묶음으로 관리합니다.
+    사전을 새로 읽을 때는 이 객체를 통째로 바꾸므로, 진행 중인 검사는 이전 사전으로 끝까지 실행됩니다.
+    단어 추가/삭제와 빈도 변경은 다시 만들지 않고 기존 구조와 인덱스를 그 자리에서 고칩니다.
+    """
+
+    def __init__(self, words, freqs, index=None):
+        self.words = words
+        self.freqs = freqs
+        self.index = index
+
+    def __bool__(self):
+        return bool(self.words) and bool(self.freqs)
+
+    def add_word(self, word, frequency=None):
+        if not hasattr(self.words, 'add'):
+            raise ValueError("읽기 전용 사전(스냅샷, DAWG)에는 단어를 추가할 수 없습니다. 사전을 다시 로드하세요.")
+        if frequency is not None:
+            self.set_frequency(word, frequency)
+        if word in self.words:
+            return
+        if self.index is None:
+            # 전체 사전 순회 중인 스레드가 있을 수 있으므로 set은 복사해서 바꿉니다.
+            self.words = self.words | {word}
+            return
+        self.words.add(word)
+        self.index.add_word(word)
+
+    def remove_word(self, word):
+        if not hasattr(self.words, 'discard'):
+            raise ValueError("읽기 전용 사전(스냅샷, DAWG)에서는 단어를 삭제할 수 없습니다. 사전을 다시 로드하세요.")
+        if word not in self.words:
+            return False
+        if self.index is None:
+            self.words = self.words - {word}
+            return True
+        self.words.discard(word)
+        self.index.remove_word(word)
+        return True
+
+    def set_frequency(self, word, frequency):
+        if hasattr(self.freqs, 'set_frequency'):
+            self.freqs.set_frequency(word, frequency)
+        elif hasattr(self.freqs, '__setitem__'):
+            # 인덱스는 같은 빈도 맵을 참조하므로 따로 고칠 필요가 없습니다.
+            self.freqs[word] = frequency
+        else:
+            raise ValueError("읽기 전용 빈도 정보(스냅샷)는 바꿀 수 없습니다. 사전을 다시 로드하세요.")
+
+    def apply_edit(self, action, word, frequency=None):
+        """'add', 'remove', 'freq' 수정 하나를 적용합니다. 삭제할 단어가 없으면 False를 반환합니다."""
+        if action == 'add':
+            self.add_word(word, frequency)
+        elif action == 'remove':
+            return self.remove_word(word)
+        elif action == 'freq':
+            self.set_frequency(word, frequency)
+        else:
+            raise ValueError(f"알 수 없는 사전 수정 명령입니다: {action}")
+        return True
+
+    def unknown_words(self, texts):
+        return unknown_words(texts, self.words)
+
+    def correct_text(self, text, cache=None):
+        return correct_text(text, self.words, self.freqs, index=self.index, cache=cache)
+
+    def correct_texts(self, texts, cache=None):
+        return correct_texts(texts, self.words, self.freqs, index=self.index, cache=cache)
+
+    def iter_corrected_chunks(self, text, chunk_words=50, cache=None):
+        return iter_corrected_chunks(text, self.words, self.freqs, chunk_words, index=self.index, cache=cache)
+
+WORD_PATTERN = re.compile(r'([a-zA-Z]+)')
+# 추천 단어 계산 한 번에 걸린 시간(초)을 받을 함수. 서버가 지표를 모을 때 설정합니다. (None이면 측정하지 않음)
+suggestion_timer = None
+
+def match_case(original_word, suggestion):
+    """
+    원래 단어의 대소문자 형태(전부 대문자, 첫 글자만 대문자, 소문자)를 추천 단어에 적용합니다.
+    """
+    if original_word.isupper():
+        return suggestion.upper()
+    if original_word.istitle():
+        return suggestion.title()
+    return suggestion.lower()
+
+def unknown_words(texts, word_set):
+    """
+    텍스트들에서 사전에 없는 단어(소문자, 중복 제거)의 집합. correct_texts가 추천을 계산할 단어와 같습니다.
+    """
+    return {lowered for text in texts for word in WORD_PATTERN.findall(text)
+            if (lowered := word.lower()) not in word_set}
+
+def correct_texts(texts, word_set, freq_map, max_distance=2, index=None, cache=None):
+    """
+    여러 텍스트를 한 번에 교정합니다.
+    모든 텍스트를 한 번씩 토큰화한 뒤 사전에 없는 단어를 배치 전체에서 중복 제거하여
+    단어마다 한 번만 추천을 계산하고, 원래 대소문자를 살려 각 텍스트를 다시 조립합니다.
+    """
+    # split 결과는 [단어 아닌 부분, 단어, 단어 아닌 부분, ...] 순서로 번갈아 나옵니다.
+    tokenized = [WORD_PATTERN.split(text) for text in texts]
+
+    corrections = {}  # { '소문자 오타': '추천 단어' 또는 None }
+    for pieces in tokenized:
+        for word in pieces[1::2]:
+            lowered = word.lower()
+            if lowered not in corrections and lowered not in word_set:
+                corrections[lowered] = None
+    timer = suggestion_timer
+    for lowered in corrections:
+        if timer:
+            start = time.perf_counter()
+        suggestions = get_suggestions(lowered, word_set, freq_map, max_distance, limit=1,
+                                      index=index, cache=cache)
+        if timer:
+            timer(time.perf_counter() - start)
+        if suggestions:
+            corrections[lowered] = suggestions[0]
+
+    return [apply_corrections(pieces, corrections) for pieces in tokenized]
+
+def apply_corrections(pieces, corrections):
+    """
+    WORD_PATTERN.split()으로 나눈 텍스트의 단어를 corrections { '소문자 오타': '추천 단어' 또는 None }대로 바꿔
+    다시 이어 붙입니다. 원래 대소문자를 살리며, corrections에 없거나 None인 단어는 그대로 둡니다.
+    """
+    for i in range(1, len(pieces), 2):
+        suggestion = corrections.get(pieces[i].lower())
+        if suggestion:
+            pieces[i] = match_case(pieces[i], suggestion)
+    return ''.join(pieces)
+
+def correct_text(text, word_set, freq_map, max_distance=2, index=None, cache=None):
+    """
+    텍스트의 철자가 틀린 단어를 가장 적합한 추천 단어로 바꾼 결과를 반환합니다.
+    """
+    return correct_texts([text], word_set, freq_map, max_distance, index, cache)[0]
+
+def iter_corrected_chunks(text, word_set, freq_map, chunk_words=50, max_distance=2, index=None, cache=None):
+    """
+    긴 텍스트를 앞에서부터 chunk_words 단어씩 교정하여 조각(chunk) 단위로 내보내는 제너레이터.
+    텍스트는 필요한 만큼만 토큰화되며, 각 조각은 앞쪽 공백을 포함하고 공백이 아닌 문자로 끝납니다.
+    (모든 조각을 이어 붙이면 끝의 공백을 제외한 correct_text 결과와 같습니다.)
+    """
+    pieces = []
+    for match in re.finditer(r'\s*\S+', text):
+        pieces.append(match.group(0))
+        if len(pieces) >= chunk_words:
+            yield correct_text(''.join(pieces), word_set, freq_map, max_distance, index, cache)
+            pieces = []
+    if pieces:
+        yield correct_text(''.join(pieces), word_set, freq_map, max_distance, index, cache)
+
 def main():
     """
     메인 함수
@@ -90,7 +518,12 @@ def main():
     freq_map = load_frequency_map(freq_path)
 
     if word_set and freq_map:
-        print(f"로드 완료! 총 {len(word_set):,}개의 단어와 {len(freq_map):,}개의 빈도 정보를 로드했습니다.\n")
+        print(f"로드 완료! 총 {len(word_set):,}개의 단어와 {len(freq_map):,}개의 빈도 정보를 로드했습니다.")
+
+        print("추천 단어 인덱스를 생성하는 중...")
+        start = time.time()
+        index = build_suggestion_index(word_set, freq_map)
+        print(f"인덱스 생성 완료! ({time.time() - start:.2f}초)\n")
         
         # 철자 검사 및 추천 테스트
         sample_text = "Thiss is a smaple text to check for misspelled wurds like 'zzxykw'."
@@ -101,7 +534,7 @@ def main():
         if misspelled:
             print("발견된 오타 및 개선된 추천 단어:")
             for word in misspelled:
-                suggestions = get_suggestions(word, word_set, freq_map)
+                suggestions = get_suggestions(word, word_set, freq_map, index=index)
                 if suggestions:
                     print(f"- {word}: (추천: {', '.join(suggestions)})")
                 else:
@@ -0,0 +1,162 @@
+# spell_worker_pool.py
+import os
+import sys
+import multiprocessing
+from threading import BoundedSemaphore, Lock, Thread
+
+from suggestion_cache import SuggestionCache
+from server_log import get_logger
+
+log = get_logger('system')
+
+# 수정 기록이 이만큼 쌓이면 수정을 모두 반영한 부모 사전으로 워커를 새로 fork합니다.
+MAX_EDIT_LOG = 256
+
+# --- 워커 프로세스 전역 변수 ---
+_dictionary = None  # SpellDictionary
+_cache = None
+_applied_edits = 0  # 풀을 만든 뒤의 수정 중 사전에 이미 반영된 개수 (부모에서는 지금까지 기록한 수)
+
+def _init_worker(loader):
+    """워커 프로세스 초기화. fork로 시작했다면 부모가 로드한 사전을 그대로 물려받습니다."""
+    global _dictionary, _cache
+    if _dictionary is None:
+        _dictionary = loader()
+    _cache = SuggestionCache()
+
+def _sync_dictionary(start, edits):
+    """
+    부모에서 단어를 수정했다면 워커의 사전에도 반영합니다.
+    edits는 풀을 만든 뒤의 수정 중 start번째부터이며, start는 모든 워커가 이미 반영한 개수 이하입니다.
+    """
+    global _applied_edits
+    end = start + len(edits)
+    if end > _applied_edits:
+        for action, word, frequency in edits[_applied_edits - start:]:
+            _dictionary.apply_edit(action, word, frequency)
+        _applied_edits = end
+        _cache.invalidate()
+
+def _run_correct_texts(texts, start, edits):
+    """(워커 PID, 반영한 수정 수, 교정된 텍스트 목록)을 반환합니다."""
+    _sync_dictionary(start, edits)
+    if not _dictionary:
+        return os.getpid(), _applied_edits, list(texts)
+    return os.getpid(), _applied_edits, _dictionary.correct_texts(texts, cache=_cache)
+
+def _detach_stdin():
+    """
+    multiprocessing은 fork한 자식에서 sys.stdin.close()를 호출합니다. 콘솔 스레드가 input()으로 stdin 잠금을
+    잡고 있을 때 fork하면 자식이 그 잠금에 걸려 멈추므로, 자식에서는 stdin을 쓰지 않도록 떼어 냅니다.
+    (사전을 다시 로드할 때나 죽은 워커를 대신할 때는 서버가 콘솔 입력을 기다리는 중에 워커를 fork합니다)
+    """
+    sys.stdin = None
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_detach_stdin)
+
+class SpellWorkerPool:
+    """
+    맞춤법 검사를 별도 프로세스 풀에서 실행합니다.
+    GIL을 잡고 있는 추천 단어 계산이 채팅 중계 스레드를 멈추지 않도록, 작업은 비동기로 보내고
+    결과는 풀의 결과 처리 스레드에서 callback으로 돌려받습니다.
+
+    fork된 워커는 부모의 사전을 copy-on-write로 공유합니다. 사전을 다시 로드하면 새 사전으로 워커를 새로 fork하고,
+    이전 워커는 맡은 작업을 끝낸 뒤 종료합니다. 부모 사전에 적용한 단어 수정은 기록해 두었다가 작업과 함께 보내되,
+    모든 워커가 이미 반영한 부분은 빼고 보냅니다. 기록이 MAX_EDIT_LOG개 쌓이면 수정을 모두 반영한 부모 사전으로
+    워커를 새로 fork해 기록을 비웁니다.
+    """
+
+    def __init__(self, workers, queue_depth, dictionary, loader):
+        """
+        dictionary: 부모 프로세스에서 이미 로드한 SpellDictionary (수정은 이 객체에 그 자리에서 적용되어야 함)
+        loader: 워커가 사전을 직접 로드할 때 호출할 함수 (fork를 쓸 수 없는 환경에서는 pickle 가능해야 함)
+        """
+        self._fork = 'fork' in multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context('fork' if self._fork else None)
+        self._loader = loader
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._slots = BoundedSemaphore(queue_depth)
+        self._lock = Lock()
+        self.pending = 0  # 보냈지만 아직 결과가 오지 않은 작업 수
+        self._start_pool(dictionary)
+
+    def _start_pool(self, dictionary):
+        """dictionary로 워커를 새로 fork합니다. (self._lock을 잡고 호출하거나 시작할 때 호출)"""
+        global _dictionary, _applied_edits
+        if self._fork:
+            _dictionary = dictionary
+            _applied_edits = 0
+        self._dictionary = dictionary
+        self._edits = []  # 풀을 만든 뒤 부모 사전에 적용한 수정
+        self._applied = {}  # { 워커 PID: 반영한 수정 수 } (결과를 돌려준 워커만)
+        self._pool = self._context.Pool(self.workers, _init_worker, (self._loader,))
+
+    def _restart(self, dictionary):
+        """워커를 새로 fork하고 이전 풀은 남은 작업을 끝낸 뒤 정리합니다. (self._lock을 잡고 호출)"""
+        old_pool = self._pool
+        self._start_pool(dictionary)
+        old_pool.close()
+        Thread(target=old_pool.join, name='spell_pool_retire', daemon=True).start()
+
+    def reload(self, dictionary):
+        """새로 로드한 사전으로 워커를 바꿉니다. 이미 보낸 작업은 이전 워커가 이전 사전으로 끝냅니다."""
+        with self._lock:
+            self._restart(dictionary)
+
+    def record_edit(self, action, word, frequency=None):
+        """부모 사전에 적용한 수정을 워커들에게도 전달되도록 기록합니다."""
+        global _applied_edits
+        with self._lock:
+            self._edits.append((action, word, frequency))
+            if self._fork:
+                # 지금부터 fork되는 워커(죽은 워커를 대신하는 워커)는 이 수정까지 반영된 사전을 물려받습니다.
+                _applied_edits = len(self._edits)
+                if len(self._edits) >= MAX_EDIT_LOG:
+                    # 부모 사전에는 이미 반영되어 있으므로 새로 fork한 워커에는 기록이 필요 없습니다.
+                    self._restart(self._dictionary)
+
+    def _unsynced_edits(self):
+        """(모든 워커가 반영한 수정 수, 그 뒤의 수정 목록) (self._lock을 잡고 호출)"""
+        start = 0
+        if self._fork and len(self._applied) >= self.workers:
+            start = min(self._applied.values())
+        return start, self._edits[start:]
+
+    def submit(self, texts, callback):
+        """
+        texts 교정 작업을 워커에 보냅니다. 완료되면 callback(교정된 텍스트 목록)을,
+        실패하면 callback(None)을 호출합니다.
+        대기 중인 작업이 queue_depth만큼 쌓여 있으면 자리가 날 때까지 호출한 스레드를 멈춥니다.
+        """
+        self._slots.acquire()
+
+        def on_done(result):
+            pid, applied, corrected_texts = result
+            self._finished(pool, pid, applied)
+            callback(corrected_texts)
+
+        def on_error(error):
+            self._finished(pool, None, 0)
+            log.error("맞춤법 검사 워커 오류: %s", error)
+            callback(None)
+
+        with self._lock:
+            pool = self._pool
+            start, edits = self._unsynced_edits()
+            self.pending += 1
+            pool.apply_async(_run_correct_texts, (list(texts), start, edits),
+                             callback=on_done, error_callback=on_error)
+
+    def _finished(self, pool, pid, applied):
+        with self._lock:
+            self.pending -= 1
+            # 이전 풀의 워커가 늦게 돌려준 결과는 지금 풀의 수정 기록과 관계없습니다.
+            if pid is not None and pool is self._pool:
+                self._applied[pid] = max(applied, self._applied.get(pid, 0))
+        self._slots.release()
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
@@ -0,0 +1,77 @@
+# suggestion_cache.py
+import time
+from collections import OrderedDict
+from threading import Lock
+
+_MISSING = object()
+
+class SuggestionCache:
+    """
+    추천 단어 결과를 저장하는 크기 제한 LRU 캐시. (스레드 안전)
+    키는 (소문자 단어, max_distance, limit)이며, 추천 단어가 없는 결과(빈 목록)도 함께 저장해
+    같은 오타가 다시 들어왔을 때 사전 검색을 반복하지 않습니다.
+    """
+
+    def __init__(self, max_size=10000, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl  # 초 단위 유효 시간, None이면 만료되지 않음
+        self._entries = OrderedDict()  # { key: (만료 시각, 추천 단어 튜플) }
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0  # 사전이 바뀔 때마다 증가
+
+    @staticmethod
+    def make_key(word, max_distance, limit):
+        return (word.lower(), max_distance, limit)
+
+    def get(self, key, default=None):
+        """캐시된 추천 단어 목록을 반환합니다. 없거나 만료되었으면 default를 반환합니다."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return list(value)
+
+    def put(self, key, suggestions, generation=None):
+        """
+        결과를 저장합니다. generation이 주어졌는데 그 사이 invalidate()가 호출되었다면
+        이전 사전으로 계산한 결과이므로 저장하지 않습니다.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (expires_at, tuple(suggestions))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """사전이 바뀌었을 때 저장된 모든 결과를 버립니다."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._entries)
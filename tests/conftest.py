@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# 서버/클라이언트 모듈은 chat/ 안에서 `from protocol import ...`처럼 서로를 가져옵니다.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'chat'))
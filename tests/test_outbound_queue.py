@@ -0,0 +1,80 @@
+# test_outbound_queue.py
+"""송신 큐가 크기 제한을 넘었을 때 정책('disconnect', 'drop_oldest')대로 동작하는지 확인합니다."""
+import threading
+
+import pytest
+
+from outbound_queue import OutboundQueue
+
+def test_messages_are_joined_in_order():
+    queue = OutboundQueue(100)
+    for data in (b'a', b'bc', b'def'):
+        queue.put(data)
+    assert len(queue) == 6
+    assert queue.take() == b'abcdef'
+    assert queue.take() == b''
+    assert len(queue) == 0
+
+def test_disconnect_policy_closes_queue_once():
+    overflows = []
+    queue = OutboundQueue(10, 'disconnect', on_overflow=lambda: overflows.append(True))
+    queue.put(b'12345')
+    queue.put(b'67890')
+    assert not queue.closed
+    queue.put(b'x')
+    assert queue.closed
+    assert overflows == [True]
+    # 넘친 뒤에는 쌓여 있던 메시지도 버리고 새 메시지도 받지 않습니다.
+    queue.put(b'y' * 20)
+    assert overflows == [True]
+    assert queue.take() == b''
+    assert queue.get() == b''
+
+def test_drop_oldest_policy_keeps_newest_messages():
+    overflows = []
+    queue = OutboundQueue(10, 'drop_oldest', on_overflow=lambda: overflows.append(True))
+    for data in (b'aaaa', b'bbbb', b'cccc', b'dd'):
+        queue.put(data)
+    assert not queue.closed
+    assert overflows == []
+    assert queue.dropped == 1
+    assert len(queue) <= 10
+    assert queue.take() == b'bbbbccccdd'
+
+def test_drop_oldest_policy_keeps_message_larger_than_limit():
+    queue = OutboundQueue(4, 'drop_oldest')
+    queue.put(b'ab')
+    queue.put(b'0123456789')
+    assert queue.dropped == 1
+    assert queue.take() == b'0123456789'
+
+def test_on_ready_is_called_when_queue_becomes_non_empty():
+    ready = []
+    queue = OutboundQueue(100, on_ready=lambda: ready.append(True))
+    queue.put(b'a')
+    queue.put(b'b')
+    assert len(ready) == 1
+    queue.take()
+    queue.put(b'c')
+    assert len(ready) == 2
+
+def test_closed_queue_drops_new_messages_but_keeps_queued_ones():
+    queue = OutboundQueue(100)
+    queue.put(b'kept')
+    queue.close()
+    queue.put(b'dropped')
+    assert queue.get() == b'kept'
+    assert queue.get() == b''
+
+def test_get_waits_for_message():
+    queue = OutboundQueue(100)
+    received = []
+    reader = threading.Thread(target=lambda: received.append(queue.get()))
+    reader.start()
+    queue.put(b'hello')
+    reader.join(5)
+    assert received == [b'hello']
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        OutboundQueue(10, 'block')
@@ -0,0 +1,178 @@
+# test_protocol.py
+"""
+수신 버퍼(LineBuffer, FrameBuffer, MessageReader)가 읽기 경계와 관계없이 메시지를 그대로 복원하는지,
+zlib으로 압축한 프레임과 최대 길이를 넘는 입력을 올바르게 처리하는지 확인합니다.
+"""
+import random
+import struct
+import zlib
+
+import pytest
+
+import protocol
+from line_buffer import LineBuffer, LineTooLongError, INITIAL_CAPACITY
+from protocol import FrameBuffer, MessageReader, Message, encode_frame, FLAG_COMPRESSED, HEADER
+
+SEED = 20240518
+
+def feed(buffer, data, chunk_sizes):
+    """get_buffer()/buffer_updated()로 data를 chunk_sizes 크기씩 나눠 넣고, 넣을 때마다 완성된 항목을 꺼냅니다."""
+    items = []
+    position = 0
+    sizes = iter(chunk_sizes)
+    while position < len(data):
+        with buffer.get_buffer() as view:
+            count = min(len(view), next(sizes), len(data) - position)
+            view[:count] = data[position:position + count]
+        buffer.buffer_updated(count)
+        position += count
+        items.extend(drain(buffer))
+    return items
+
+def drain(buffer):
+    if isinstance(buffer, LineBuffer):
+        return list(buffer.lines())
+    if isinstance(buffer, FrameBuffer):
+        return list(buffer.frames())
+    messages = []
+    while (message := buffer.next_message()) is not None:
+        messages.append(message)
+    return messages
+
+def byte_by_byte():
+    while True:
+        yield 1
+
+def random_chunks(rng, max_size=64):
+    while True:
+        yield rng.randint(1, max_size)
+
+def random_text(rng, max_length=40):
+    # 여러 바이트로 된 UTF-8 문자가 읽기 경계에서 잘리도록 한글을 섞습니다.
+    return ''.join(rng.choice('abc xyz가나다:') for _ in range(rng.randint(0, max_length)))
+
+def random_messages(rng, count=200):
+    commands = ['MSG_RECV', 'SPELL_RESULT', 'ROOM_MSG', 'LOGIN', 'UNKNOWN_COMMAND']
+    messages = []
+    for _ in range(count):
+        params = [random_text(rng, 8).replace(' ', '_').replace(':', '') or 'p' for _ in range(rng.randint(0, 3))]
+        trailing = None
+        if rng.random() < 0.8:
+            # 프레임의 trailing에는 \0과 개행문자도 들어갈 수 있습니다.
+            trailing = random_text(rng, rng.choice((10, 3000))) + rng.choice(('', '\0', '\n', '\r\n'))
+        messages.append((rng.choice(commands), params, trailing))
+    return messages
+
+# --- LineBuffer ---
+
+@pytest.mark.parametrize('chunks', ['byte', 'random'])
+def test_line_buffer_reassembles_lines_across_reads(chunks):
+    rng = random.Random(SEED)
+    lines = [random_text(rng, rng.choice((20, 6000))).replace('\n', '') for _ in range(300)]
+    data = ''.join(line + '\n' for line in lines).encode()
+    sizes = byte_by_byte() if chunks == 'byte' else random_chunks(rng, 9000)
+    assert feed(LineBuffer(), data, sizes) == lines
+
+def test_line_buffer_keeps_partial_line():
+    buffer = LineBuffer()
+    assert feed(buffer, 'first\n두 번'.encode(), byte_by_byte()) == ['first']
+    assert len(buffer) == len('두 번'.encode())
+    assert feed(buffer, '째\n'.encode(), byte_by_byte()) == ['두 번째']
+    assert len(buffer) == 0
+
+def test_line_buffer_rejects_too_long_line():
+    buffer = LineBuffer(max_line_length=16)
+    assert feed(buffer, b'short\n', byte_by_byte()) == ['short']
+    with pytest.raises(LineTooLongError):
+        feed(buffer, b'x' * 100, random_chunks(random.Random(SEED), 8))
+
+def test_line_buffer_accepts_line_of_max_length():
+    buffer = LineBuffer(max_line_length=INITIAL_CAPACITY * 2)
+    line = 'y' * (INITIAL_CAPACITY * 2)
+    assert feed(buffer, (line + '\n').encode(), random_chunks(random.Random(SEED), 1000)) == [line]
+
+def test_line_buffer_take_pending():
+    buffer = LineBuffer()
+    feed(buffer, b'done\nrest', byte_by_byte())
+    assert buffer.take_pending() == b'rest'
+    assert len(buffer) == 0
+
+# --- FrameBuffer ---
+
+@pytest.mark.parametrize('threshold', [0, 64])
+@pytest.mark.parametrize('chunks', ['byte', 'random'])
+def test_frame_buffer_reassembles_frames_across_reads(monkeypatch, threshold, chunks):
+    monkeypatch.setattr(protocol, 'compress_threshold', threshold)
+    rng = random.Random(SEED + threshold)
+    messages = random_messages(rng)
+    data = b''.join(encode_frame(command, params, trailing) for command, params, trailing in messages)
+    sizes = byte_by_byte() if chunks == 'byte' else random_chunks(rng, 5000)
+    frames = feed(FrameBuffer(), data, sizes)
+    assert frames == [(command, params, trailing) for command, params, trailing in messages]
+
+def test_compressed_frame_round_trip(monkeypatch):
+    monkeypatch.setattr(protocol, 'compress_threshold', 16)
+    text = '맞춤법 검사 결과 ' * 2000
+    frame = Message('SPELL_RESULT', '7', trailing=text).frame()
+    length, _, flags, _ = HEADER.unpack_from(frame)
+    assert flags & FLAG_COMPRESSED
+    assert length < len(text.encode())
+    assert feed(FrameBuffer(), frame, random_chunks(random.Random(SEED), 100)) == [('SPELL_RESULT', ['7'], text)]
+
+def test_frame_buffer_skips_compression_that_does_not_help(monkeypatch):
+    monkeypatch.setattr(protocol, 'compress_threshold', 1)
+    frame = encode_frame('MSG_RECV', ['a'], 'x')
+    assert not HEADER.unpack_from(frame)[2] & FLAG_COMPRESSED
+    assert feed(FrameBuffer(), frame, byte_by_byte()) == [('MSG_RECV', ['a'], 'x')]
+
+def test_frame_buffer_rejects_too_long_frame():
+    frame = encode_frame('MSG_RECV', [], 'z' * 100)
+    with pytest.raises(LineTooLongError):
+        feed(FrameBuffer(max_frame_length=50), frame, byte_by_byte())
+
+def test_frame_buffer_rejects_compressed_frame_that_expands_too_much():
+    body = zlib.compress(b'z' * 10000)
+    frame = HEADER.pack(len(body), protocol.COMMAND_CODES['MSG_RECV'], FLAG_COMPRESSED | protocol.FLAG_TRAILING, 0) + body
+    with pytest.raises(LineTooLongError):
+        feed(FrameBuffer(max_frame_length=1000), frame, byte_by_byte())
+
+def test_frame_length_prefix_starts_with_zero_byte():
+    # 클라이언트는 첫 바이트가 0인지로 서버가 바이너리 프레임을 받아들였는지 판단합니다.
+    assert encode_frame('LOGIN_SUCCESS', [], 'ok')[0] == 0
+    assert struct.unpack('!I', encode_frame('MSG_RECV', [], 'a' * 300)[:4])[0] > 255
+
+# --- MessageReader ---
+
+def test_message_reader_parses_text_lines():
+    reader = MessageReader(1024)
+    data = b'LOGIN alice\n\n  \nP_MSG bob :hi there\nquit\n'
+    messages = feed(reader, data, byte_by_byte())
+    assert messages == [
+        ('LOGIN', ['alice'], None, 'LOGIN alice'),
+        ('P_MSG', ['bob'], 'hi there', 'P_MSG bob :hi there'),
+        ('QUIT', [], None, 'quit'),
+    ]
+
+@pytest.mark.parametrize('split', [0, 5, 13, 20])
+def test_message_reader_switches_to_binary_with_pending_bytes(split):
+    """LOGIN 줄 뒤에 이미 받아 둔 프레임 바이트는 바이너리로 바꾼 뒤 프레임으로 읽혀야 합니다."""
+    frames = encode_frame('ROOM_MSG', ['room'], '첫 번째\n줄') + encode_frame('QUIT')
+    data = b'LOGIN alice 2\n' + frames
+    reader = MessageReader(1024)
+    with reader.get_buffer() as view:
+        view[:len(data) - split] = data[:len(data) - split]
+    reader.buffer_updated(len(data) - split)
+    assert reader.next_message() == ('LOGIN', ['alice', '2'], None, 'LOGIN alice 2')
+    reader.switch_to_binary()
+    messages = drain(reader) + feed(reader, data[len(data) - split:], byte_by_byte())
+    assert messages == [('ROOM_MSG', ['room'], '첫 번째\n줄', None), ('QUIT', [], None, None)]
+
+def test_message_reader_rejects_too_long_line():
+    reader = MessageReader(32)
+    with pytest.raises(LineTooLongError):
+        feed(reader, b'ROOM_MSG room :' + b'a' * 100, byte_by_byte())
+
+def test_message_text_encoding_round_trip():
+    message = Message('MSG_RECV', '[SYSTEM]', trailing='여러\n줄')
+    assert message.text() == 'MSG_RECV [SYSTEM] :여러 줄\n'.encode()
+    assert Message.parse(message.text().decode()).to_fields() == ['MSG_RECV', ['[SYSTEM]'], '여러 줄']
@@ -0,0 +1,242 @@
+# test_spell_checker.py
+"""
+추천 단어 백엔드(대칭 삭제 인덱스, NumPy 배열 사전, DAWG, mmap 스냅샷)와 거리 계산 커널이
+기준 구현(levenshtein_distance, 전체 사전을 순회하는 get_suggestions)과 같은 결과를 내는지
+무작위 입력으로 확인합니다.
+"""
+import random
+
+import pytest
+
+from spell_checker_v2 import (levenshtein_distance, bounded_levenshtein_distance, get_suggestions,
+                              build_suggestion_index, load_words, load_frequency_map)
+from dawg_dictionary import DawgDictionary, build_dawg_dictionary
+from dict_snapshot import write_snapshot, open_snapshot
+
+# 작은 알파벳을 써야 서로 가까운 단어가 많이 생겨 추천 후보와 동점이 충분히 나옵니다.
+ALPHABET = 'abcde'
+SEED = 20240518
+
+def random_word(rng, min_length=0, max_length=8):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(min_length, max_length)))
+
+def random_dictionary(rng, size=300):
+    """(단어 집합, 빈도 맵). 빈도가 없는 단어와 사전에 없는 빈도 항목도 섞습니다."""
+    words = {random_word(rng, 1) for _ in range(size)}
+    freqs = {word: rng.randint(1, 50) for word in words if rng.random() < 0.8}
+    freqs.update({random_word(rng, 1): rng.randint(1, 50) for _ in range(size // 10)})
+    return words, freqs
+
+def typos(rng, words, count=150):
+    """사전 단어를 조금 바꾼 오타와 아무 단어를 섞은 질의"""
+    words = sorted(words)
+    queries = []
+    for _ in range(count):
+        word = list(rng.choice(words))
+        for _ in range(rng.randint(0, 3)):
+            position = rng.randint(0, len(word))
+            edit = rng.choice(('insert', 'delete', 'replace', 'swap'))
+            if edit == 'insert':
+                word.insert(position, rng.choice(ALPHABET))
+            elif word and edit == 'delete':
+                del word[min(position, len(word) - 1)]
+            elif word and edit == 'replace':
+                word[min(position, len(word) - 1)] = rng.choice(ALPHABET)
+            elif len(word) > 1:
+                position = min(position, len(word) - 2)
+                word[position], word[position + 1] = word[position + 1], word[position]
+        queries.append(''.join(word))
+    queries.extend(random_word(rng) for _ in range(count // 3))
+    return queries
+
+def osa_distance(s1, s2):
+    """인접 문자 교환을 1회 편집으로 세는 OSA 거리의 전체 DP 계산 (기준 구현)"""
+    rows = [[0] * (len(s2) + 1) for _ in range(len(s1) + 1)]
+    for i in range(len(s1) + 1):
+        rows[i][0] = i
+    for j in range(len(s2) + 1):
+        rows[0][j] = j
+    for i in range(1, len(s1) + 1):
+        for j in range(1, len(s2) + 1):
+            cost = s1[i - 1] != s2[j - 1]
+            rows[i][j] = min(rows[i - 1][j] + 1, rows[i][j - 1] + 1, rows[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and s1[i - 1] == s2[j - 2] and s1[i - 2] == s2[j - 1]:
+                rows[i][j] = min(rows[i][j], rows[i - 2][j - 2] + 1)
+    return rows[-1][-1]
+
+def brute_force(word, words, freqs, max_distance, limit):
+    """인덱스 없이 사전 전체를 순회하는 기준 추천"""
+    return get_suggestions(word, set(words), freqs, max_distance, limit)
+
+@pytest.fixture(scope='module')
+def dictionary():
+    rng = random.Random(SEED)
+    words, freqs = random_dictionary(rng)
+    return words, freqs, typos(rng, words)
+
+# --- 거리 계산 ---
+
+@pytest.mark.parametrize('max_distance', [0, 1, 2, 3])
+def test_bounded_levenshtein_matches_full_distance(max_distance):
+    rng = random.Random(SEED + max_distance)
+    for _ in range(2000):
+        s1, s2 = random_word(rng), random_word(rng)
+        expected = min(levenshtein_distance(s1, s2), max_distance + 1)
+        assert bounded_levenshtein_distance(s1, s2, max_distance) == expected, (s1, s2)
+
+@pytest.mark.parametrize('max_distance', [0, 1, 2, 3])
+def test_bounded_osa_matches_reference(max_distance):
+    rng = random.Random(SEED + 10 + max_distance)
+    for _ in range(2000):
+        s1 = random_word(rng)
+        s2 = list(s1)
+        if len(s2) > 1:
+            position = rng.randint(0, len(s2) - 2)
+            s2[position], s2[position + 1] = s2[position + 1], s2[position]
+        s2 = ''.join(s2) if rng.random() < 0.5 else random_word(rng)
+        expected = min(osa_distance(s1, s2), max_distance + 1)
+        assert bounded_levenshtein_distance(s1, s2, max_distance, transpositions=True) == expected, (s1, s2)
+
+def test_levenshtein_distance_known_values():
+    assert levenshtein_distance('kitten', 'sitting') == 3
+    assert levenshtein_distance('', 'abc') == 3
+    assert levenshtein_distance('abc', 'abc') == 0
+    assert osa_distance('ca', 'ac') == 1
+    assert bounded_levenshtein_distance('ca', 'ac', 2) == 2
+    assert bounded_levenshtein_distance('ca', 'ac', 2, transpositions=True) == 1
+
+# --- NumPy 배열 사전 ---
+
+@pytest.mark.parametrize('transpositions', [False, True])
+def test_batch_kernel_matches_bounded_distance(transpositions):
+    np = pytest.importorskip('numpy')
+    from spell_checker_v2 import batch_levenshtein_distance, _encode_words
+    rng = random.Random(SEED + 20)
+    for length in range(1, 7):
+        candidates = sorted({''.join(rng.choice(ALPHABET) for _ in range(length)) for _ in range(60)})
+        codes = _encode_words(candidates, length)
+        for _ in range(40):
+            word = random_word(rng, 0, length + 3)
+            for max_distance in (1, 2):
+                distances = batch_levenshtein_distance(word, codes, max_distance, transpositions)
+                expected = [bounded_levenshtein_distance(word, candidate, max_distance, transpositions)
+                            for candidate in candidates]
+                assert np.array_equal(distances, expected), (word, max_distance)
+
+def test_array_dictionary_matches_brute_force(dictionary):
+    pytest.importorskip('numpy')
+    from spell_checker_v2 import build_array_dictionary
+    words, freqs, queries = dictionary
+    array_dictionary = build_array_dictionary(words, freqs)
+    for word in queries:
+        for max_distance in (1, 2):
+            assert array_dictionary.suggest(word, max_distance, 5) == brute_force(word, words, freqs, max_distance, 5)
+
+def test_array_dictionary_add_and_remove(dictionary):
+    pytest.importorskip('numpy')
+    from spell_checker_v2 import build_array_dictionary
+    words, freqs, queries = dictionary
+    words = set(words)
+    array_dictionary = build_array_dictionary(words, freqs)
+    rng = random.Random(SEED + 30)
+    for word in rng.sample(sorted(words), 30):
+        words.discard(word)
+        array_dictionary.remove_word(word)
+    for _ in range(30):
+        word = random_word(rng, 1)
+        words.add(word)
+        array_dictionary.add_word(word)
+    for word in queries:
+        assert array_dictionary.suggest(word, 2, 5) == brute_force(word, words, freqs, 2, 5)
+
+# --- 대칭 삭제 인덱스 ---
+
+def test_suggestion_index_matches_brute_force(dictionary):
+    words, freqs, queries = dictionary
+    index = build_suggestion_index(words, freqs, 2)
+    for word in queries:
+        for max_distance in (0, 1, 2):
+            assert get_suggestions(word, words, freqs, max_distance, 5, index=index) == \
+                brute_force(word, words, freqs, max_distance, 5), (word, max_distance)
+
+def test_suggestion_index_add_and_remove(dictionary):
+    words, freqs, queries = dictionary
+    words = set(words)
+    index = build_suggestion_index(words, freqs, 2)
+    rng = random.Random(SEED + 40)
+    for word in rng.sample(sorted(words), 30):
+        words.discard(word)
+        index.remove_word(word)
+    for _ in range(30):
+        word = random_word(rng, 1)
+        if word not in words:
+            words.add(word)
+            index.add_word(word)
+    for word in queries:
+        assert index.suggest(word, 2, 5) == brute_force(word, words, freqs, 2, 5), word
+
+def test_suggestion_index_falls_back_beyond_max_distance(dictionary):
+    words, freqs, queries = dictionary
+    index = build_suggestion_index(words, freqs, 1)
+    for word in queries[:30]:
+        assert get_suggestions(word, words, freqs, 2, 5, index=index) == brute_force(word, words, freqs, 2, 5)
+
+# --- DAWG ---
+
+def test_dawg_matches_word_set_and_frequencies(dictionary):
+    words, freqs, _ = dictionary
+    dawg = build_dawg_dictionary(words, freqs)
+    assert len(dawg) == len(words)
+    assert sorted(dawg) == sorted(words)
+    for word in words:
+        assert word in dawg
+        assert dawg.get(word) == freqs.get(word)
+    for word in typos(random.Random(SEED + 50), words, 100):
+        assert (word in dawg) == (word in words)
+
+def test_dawg_suggestions_match_brute_force(dictionary):
+    words, freqs, queries = dictionary
+    dawg = build_dawg_dictionary(words, freqs)
+    for word in queries:
+        for max_distance in (1, 2):
+            assert get_suggestions(word, dawg, dawg, max_distance, 5) == \
+                brute_force(word, words, freqs, max_distance, 5), (word, max_distance)
+
+def test_dawg_save_and_load(dictionary, tmp_path):
+    words, freqs, queries = dictionary
+    path = str(tmp_path / 'dictionary.dawg')
+    build_dawg_dictionary(words, freqs).save(path)
+    dawg = DawgDictionary.load(path)
+    assert sorted(dawg) == sorted(words)
+    for word in queries[:50]:
+        assert dawg.suggest(word, 2, 5) == brute_force(word, words, freqs, 2, 5)
+
+# --- mmap 스냅샷 ---
+
+@pytest.mark.parametrize('with_index', [False, True])
+def test_snapshot_round_trip(dictionary, tmp_path, with_index):
+    words, freqs, queries = dictionary
+    path = str(tmp_path / 'dictionary.snap')
+    write_snapshot(path, words, freqs, build_suggestion_index(words, freqs, 2) if with_index else None)
+    snapshot_words, snapshot_freqs = load_words(path), load_frequency_map(path)
+    assert len(snapshot_words) == len(words)
+    assert sorted(snapshot_words) == sorted(words)
+    assert dict(snapshot_freqs.items()) == freqs
+    for word in typos(random.Random(SEED + 60), words, 100):
+        assert (word in snapshot_words) == (word in words)
+        assert snapshot_freqs.get(word) == freqs.get(word)
+    assert (snapshot_words.suggestion_index is not None) == with_index
+    for word in queries:
+        assert get_suggestions(word, snapshot_words, snapshot_freqs, 2, 5) == brute_force(word, words, freqs, 2, 5)
+
+def test_snapshot_rewrite_keeps_existing_mapping(dictionary, tmp_path):
+    """다시 컴파일해도 이미 연 스냅샷은 이전 내용을 그대로 보고, fresh로 다시 열면 새 내용을 봅니다."""
+    words, freqs, _ = dictionary
+    path = str(tmp_path / 'dictionary.snap')
+    write_snapshot(path, words, freqs)
+    old = open_snapshot(path, fresh=True)
+    write_snapshot(path, {'zzz'}, {'zzz': 1})
+    assert sorted(old.words) == sorted(words)
+    assert open_snapshot(path) is old
+    new = open_snapshot(path, fresh=True)
+    assert sorted(new.words) == ['zzz']